@@ -0,0 +1,120 @@
+"""
+比較系統目錄查詢：information_schema 視圖（舊） vs pg_catalog 與 regclass（新）
+
+會在資料庫中建立（並在結束時刪除）一個含有大量表格的 schema。
+
+    PYTHONPATH=. python benchmarks/bench_catalog.py --tables 20000
+"""
+import argparse
+import time
+
+from psql.pg import DESCRIBE_TABLE_SQL, LIST_TABLES_SQL, PG, SCHEMA_EXISTS_SQL, TABLE_EXISTS_SQL
+
+SCHEMA_NAME = "bench_catalog"
+CREATE_BATCH = 500
+
+# 改寫前使用的 information_schema 查詢
+OLD_QUERIES = {
+    "schema_exists": """
+        SELECT EXISTS (
+            SELECT FROM information_schema.schemata
+            WHERE schema_name = '{schema_name}'
+        )
+    """,
+    "table_exists": """
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables
+            WHERE table_schema = '{schema_name}'
+            AND table_name = '{table_name}'
+        )
+    """,
+    "describe_table": """
+        SELECT column_name, data_type, is_nullable, column_default,
+               character_maximum_length, numeric_precision, numeric_scale
+        FROM information_schema.columns
+        WHERE table_schema = '{schema_name}'
+        AND table_name = '{table_name}'
+        ORDER BY ordinal_position;
+    """,
+    "list_tables": """
+        SELECT table_name, table_type
+        FROM information_schema.tables
+        WHERE table_schema = '{schema_name}'
+        ORDER BY table_name;
+    """,
+}
+
+NEW_QUERIES = {
+    "schema_exists": SCHEMA_EXISTS_SQL,
+    "table_exists": TABLE_EXISTS_SQL,
+    "describe_table": DESCRIBE_TABLE_SQL,
+    "list_tables": LIST_TABLES_SQL,
+}
+
+
+def run_ddl(pg: PG, first: int, last: int, template: str) -> None:
+    """以單一 DO 區塊對第 first..last 個表格執行 DDL"""
+    pg.query(f"""
+        DO $$
+        BEGIN
+            FOR i IN {first}..{last} LOOP
+                EXECUTE format('{template}', i);
+            END LOOP;
+        END $$
+    """)
+
+
+def bench(pg: PG, sql: str, repeat: int, params: bool = False) -> float:
+    """舊查詢以字串內插名稱，新查詢以查詢參數傳入"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        names = {"schema_name": SCHEMA_NAME, "table_name": f"t_{i * 7919 % repeat}"}
+        if params:
+            pg.query(sql, names)
+        else:
+            pg.query(sql.format(**names))
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--describe", type=int, default=3000, help="tables described for describe_tables")
+    args = parser.parse_args()
+
+    pg = PG()
+    pg.query(f"DROP SCHEMA IF EXISTS {SCHEMA_NAME} CASCADE; CREATE SCHEMA {SCHEMA_NAME};")
+    for first in range(0, args.tables, CREATE_BATCH):
+        last = min(first + CREATE_BATCH, args.tables) - 1
+        run_ddl(pg, first, last, f"CREATE TABLE {SCHEMA_NAME}.t_%s (id int, name text, value numeric(10, 2))")
+    print(f"{args.tables:,} tables in schema {SCHEMA_NAME}, {args.repeat} calls each (ms per call)")
+    print(f"{'':<16} {'information_schema':>18} {'pg_catalog':>12} {'prepared':>10}")
+
+    try:
+        unprepared = PG(prepare_threshold=None)
+        prepared = PG(prepare_threshold=0)
+        for name in OLD_QUERIES:
+            old = bench(pg, OLD_QUERIES[name], args.repeat)
+            new = bench(unprepared, NEW_QUERIES[name], args.repeat, params=True)
+            reused = bench(prepared, NEW_QUERIES[name], args.repeat, params=True)
+            print(f"{name:<16} {old:18.2f} {new:12.2f} {reused:10.2f}")
+
+        names = [f"{SCHEMA_NAME}.t_{i}" for i in range(min(args.describe, args.tables))]
+        start = time.perf_counter()
+        for name in names:
+            pg.describe_table(name)
+        one_by_one = time.perf_counter() - start
+        start = time.perf_counter()
+        pg.describe_tables(names)
+        bulk = time.perf_counter() - start
+        print(f"\n{len(names):,} tables: describe_table one by one {one_by_one:.2f} s, describe_tables {bulk:.2f} s")
+    finally:
+        for first in range(0, args.tables, CREATE_BATCH):
+            last = min(first + CREATE_BATCH, args.tables) - 1
+            run_ddl(pg, first, last, f"DROP TABLE IF EXISTS {SCHEMA_NAME}.t_%s")
+        pg.query(f"DROP SCHEMA IF EXISTS {SCHEMA_NAME} CASCADE;")
+
+
+if __name__ == "__main__":
+    main()
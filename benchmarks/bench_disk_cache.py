@@ -0,0 +1,57 @@
+"""
+比較重新執行查詢 vs 從磁碟快取（disk_cache_dir）讀回結果
+
+每次讀取都使用新的 PG 實例，模擬共用快取目錄的短生命週期批次進程。
+會在資料庫中建立（並在結束時刪除）測試表格，快取寫在暫存目錄中。
+
+    PYTHONPATH=. python benchmarks/bench_disk_cache.py --rows 2000000
+"""
+import argparse
+import tempfile
+import time
+
+from psql.pg import PG
+
+TABLE_NAME = "bench_disk_cache"
+
+
+def bench(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed:8.3f} s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    pg = PG()
+    pg.query(f"""
+        DROP TABLE IF EXISTS {TABLE_NAME};
+        CREATE TABLE {TABLE_NAME} AS
+        SELECT g AS id, TIMESTAMPTZ '2024-01-01' + g * INTERVAL '1 second' AS ts,
+               random() AS a, random() AS b, g % 1000 AS bucket, 'item ' || (g % 5000) AS label
+        FROM generate_series(1, {args.rows}) g;
+    """)
+    sql = f"SELECT * FROM {TABLE_NAME}"
+    print(f"{args.rows:,} rows x 6 columns")
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            before = bench("query", lambda: PG().query(sql))
+            for disk_format in ("feather", "parquet"):
+                def cached_query():
+                    return PG(disk_cache_dir=directory, disk_cache_format=disk_format).query(sql)
+
+                bench(f"{disk_format} miss + write", cached_query)
+                after = bench(f"{disk_format} hit", cached_query)
+                print(f"{disk_format} speedup: {before / after:.1f}x")
+    finally:
+        pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+比較大型 SELECT 的讀取速度：PG.query vs PG.export（COPY TO，CSV / text / binary）
+
+會在資料庫中建立（並在結束時刪除）一個測試表格。
+
+    PYTHONPATH=. python benchmarks/bench_export.py --rows 10000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from psql.pg import PG
+
+TABLE_NAME = "bench_export"
+
+
+def bench(label: str, func, n_rows: int) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:8.2f} s  {n_rows / elapsed:12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pg = PG()
+    pg.query(f"""
+        DROP TABLE IF EXISTS {TABLE_NAME};
+        CREATE TABLE {TABLE_NAME} AS
+        SELECT
+            g AS id,
+            random() AS value,
+            TIMESTAMPTZ '2024-01-01' + g * INTERVAL '1 second' AS created_at,
+            'name_' || (g % 1000) AS name
+        FROM generate_series(1, {args.rows}) g;
+    """)
+    sql = f"SELECT * FROM {TABLE_NAME}"
+    print(f"{args.rows:,} rows x 4 columns (bigint, float8, timestamptz, text)")
+
+    try:
+        bench("query", lambda: pg.query(sql), args.rows)
+        for fmt in ("csv", "text", "binary"):
+            bench(
+                f"export {fmt}",
+                lambda: pd.concat(pg.export(sql, format=fmt, chunksize=args.chunksize)),
+                args.rows,
+            )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.csv")
+            bench("export csv file", lambda: pg.export(sql, path=path), args.rows)
+    finally:
+        pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+比較 _insert_dataframe_batch 的批次數據準備：逐格處理（舊） vs 以列向量化（新）
+
+不需要連線資料庫，只測量 Python 端把 DataFrame 轉成參數元組的速度。
+
+    PYTHONPATH=. python benchmarks/bench_prepare_rows.py --rows 1000000 --cols 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from psql.pg import PG
+
+
+def make_frame(n_rows: int, n_cols: int) -> pd.DataFrame:
+    """產生整數、浮點、文字、日期時間輪流出現且含有缺失值的 DataFrame"""
+    rng = np.random.default_rng(0)
+    data = {}
+    for i in range(n_cols):
+        kind = i % 4
+        if kind == 0:
+            data[f"int_{i}"] = rng.integers(0, 1_000_000, n_rows)
+        elif kind == 1:
+            values = rng.standard_normal(n_rows)
+            values[rng.random(n_rows) < 0.05] = np.nan
+            data[f"float_{i}"] = values
+        elif kind == 2:
+            values = rng.integers(0, 1000, n_rows).astype(str).astype(object)
+            values[rng.random(n_rows) < 0.05] = None
+            data[f"text_{i}"] = values
+        else:
+            data[f"ts_{i}"] = pd.Timestamp("2024-01-01") + pd.to_timedelta(
+                rng.integers(0, 86400 * 365, n_rows), unit="s"
+            )
+    return pd.DataFrame(data)
+
+
+def prepare_rows_per_cell(df: pd.DataFrame) -> list:
+    """原本的實作：iterrows 加上逐格 pd.isna()"""
+    values = []
+    for _, row in df.iterrows():
+        row_values = []
+        for val in row:
+            if pd.isna(val):
+                row_values.append(None)
+            else:
+                row_values.append(val)
+        values.append(tuple(row_values))
+    return values
+
+
+def bench(label: str, func, df: pd.DataFrame, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(df), batch_size):
+        func(df.iloc[i : i + batch_size])
+    elapsed = time.perf_counter() - start
+    rate = len(df) / elapsed
+    print(f"{label:<12} {elapsed:8.2f} s  {rate:12,.0f} rows/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols)
+    print(f"DataFrame: {args.rows:,} x {args.cols}, batch_size={args.batch_size}")
+
+    pg = PG()
+    before = bench("per-cell", prepare_rows_per_cell, df, args.batch_size)
+    after = bench("vectorized", pg._prepare_rows, df, args.batch_size)
+    print(f"speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
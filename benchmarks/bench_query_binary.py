@@ -0,0 +1,51 @@
+"""
+比較 PG.query 的結果格式：文字格式（預設） vs 二進位格式（binary=True）
+
+使用以 double precision 為主並帶有 timestamptz 的指標表格，會在資料庫中建立（並在結束時刪除）測試表格。
+
+    PYTHONPATH=. python benchmarks/bench_query_binary.py --rows 1000000 --cols 9
+"""
+import argparse
+import time
+
+from psql.pg import PG
+
+TABLE_NAME = "bench_query_binary"
+
+
+def bench(label: str, func, n_rows: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    rate = n_rows / elapsed
+    print(f"{label:<8} {elapsed:8.2f} s  {rate:12,.0f} rows/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=9, help="double precision 列數")
+    args = parser.parse_args()
+
+    pg = PG()
+    value_columns = ", ".join(f"random() AS value_{i}" for i in range(args.cols))
+    pg.query(f"""
+        DROP TABLE IF EXISTS {TABLE_NAME};
+        CREATE TABLE {TABLE_NAME} AS
+        SELECT TIMESTAMPTZ '2024-01-01' + g * INTERVAL '1 second' AS ts, {value_columns}
+        FROM generate_series(1, {args.rows}) g;
+    """)
+    sql = f"SELECT * FROM {TABLE_NAME}"
+    print(f"{args.rows:,} rows x (1 timestamptz + {args.cols} double precision)")
+
+    try:
+        before = bench("text", lambda: pg.query(sql), args.rows)
+        after = bench("binary", lambda: pg.query(sql, binary=True), args.rows)
+        print(f"speedup: {after / before:.1f}x")
+    finally:
+        pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+
+
+if __name__ == "__main__":
+    main()
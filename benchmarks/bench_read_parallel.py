@@ -0,0 +1,60 @@
+"""
+比較整表讀取：PG.query（單一連線） vs PG.read_table_parallel（依鍵值或 ctid 區間並行讀取）
+
+會在資料庫中建立（並在結束時刪除）一個測試表格。並行讀取的效果取決於用戶端與伺服器的 CPU 核心數。
+
+    PYTHONPATH=. python benchmarks/bench_read_parallel.py --rows 5000000 --workers 4
+"""
+import argparse
+import time
+
+from psql.pg import PG
+
+TABLE_NAME = "bench_read_parallel"
+
+
+def bench(label: str, func, n_rows: int) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:8.2f} s  {n_rows / elapsed:12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    pg = PG()
+    pg.query(f"""
+        DROP TABLE IF EXISTS {TABLE_NAME};
+        CREATE TABLE {TABLE_NAME} AS
+        SELECT
+            g AS id,
+            random() AS value,
+            TIMESTAMPTZ '2024-01-01' + g * INTERVAL '1 second' AS created_at,
+            'name_' || (g % 1000) AS name
+        FROM generate_series(1, {args.rows}) g;
+    """)
+    sql = f"SELECT * FROM {TABLE_NAME}"
+    print(f"{args.rows:,} rows x 4 columns, {args.workers} workers")
+
+    try:
+        bench("query", lambda: pg.query(sql, binary=True), args.rows)
+        bench(
+            "parallel key",
+            lambda: pg.read_table_parallel(TABLE_NAME, "id", n_workers=args.workers, binary=True),
+            args.rows,
+        )
+        bench(
+            "parallel ctid",
+            lambda: pg.read_table_parallel(TABLE_NAME, n_workers=args.workers, binary=True),
+            args.rows,
+        )
+    finally:
+        pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+比較重複執行同一個唯讀查詢：不快取 vs 結果快取（result_cache_ttl）
+
+模擬儀表板反覆送出相同的彙總查詢，會在資料庫中建立（並在結束時刪除）測試表格。
+
+    PYTHONPATH=. python benchmarks/bench_result_cache.py --rows 1000000 --calls 200
+"""
+import argparse
+import time
+
+from psql.pg import PG
+
+TABLE_NAME = "bench_result_cache"
+
+
+def bench(label: str, pg: PG, sql: str, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        pg.query(sql)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed:8.2f} s  {elapsed / calls * 1000:8.2f} ms/call")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    pg = PG()
+    pg.query(f"""
+        DROP TABLE IF EXISTS {TABLE_NAME};
+        CREATE TABLE {TABLE_NAME} AS
+        SELECT g % 100 AS region, random() AS amount
+        FROM generate_series(1, {args.rows}) g;
+    """)
+    sql = f"SELECT region, count(*) AS n, sum(amount) AS total FROM {TABLE_NAME} GROUP BY region ORDER BY region"
+    print(f"{args.rows:,} rows, {args.calls} calls of a GROUP BY over 100 regions")
+
+    try:
+        before = bench("uncached", pg, sql, args.calls)
+        cached = PG(result_cache_ttl=60)
+        after = bench("cached", cached, sql, args.calls)
+        print(f"speedup: {before / after:.1f}x  {cached.result_cache.stats()}")
+    finally:
+        pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+
+
+if __name__ == "__main__":
+    main()
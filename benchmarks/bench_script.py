@@ -0,0 +1,46 @@
+"""
+比較多語句 query：每個語句一次往返（預設） vs 整個腳本一次往返（script=True）
+
+會在資料庫中建立（並在結束時刪除）測試表格。
+
+    PYTHONPATH=. python benchmarks/bench_script.py --statements 2000
+"""
+import argparse
+import time
+
+from psql.pg import PG
+
+TABLE_NAME = "bench_script"
+
+
+def bench(label: str, func, n_statements: int) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {elapsed:8.3f} s  {elapsed / n_statements * 1000:8.3f} ms/statement")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--statements", type=int, default=2000)
+    args = parser.parse_args()
+
+    pg = PG()
+    pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME}; CREATE TABLE {TABLE_NAME} (id int, note text);")
+    script = "".join(
+        f"INSERT INTO {TABLE_NAME} VALUES ({i}, 'row {i}; ok');\n" for i in range(args.statements)
+    ) + f"SELECT count(*) AS n FROM {TABLE_NAME};"
+    print(f"{args.statements:,} INSERT statements + 1 SELECT")
+
+    try:
+        before = bench("per-statement", lambda: pg.query(script), args.statements)
+        pg.query(f"TRUNCATE {TABLE_NAME}")
+        after = bench("script", lambda: pg.query(script, script=True), args.statements)
+        print(f"speedup: {before / after:.1f}x")
+    finally:
+        pg.query(f"DROP TABLE IF EXISTS {TABLE_NAME};")
+
+
+if __name__ == "__main__":
+    main()
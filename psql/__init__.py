@@ -1,3 +1,4 @@
 from psql.pg import PG
+from psql.async_pg import AsyncPG
 
 pg = PG()
@@ -0,0 +1,570 @@
+"""
+PG 的 asyncio 版本，以 psycopg.AsyncConnection 實作
+
+名稱解析、類型映射、批次切分與數據準備等不涉及連線的邏輯直接沿用 PG 的實作。
+每次呼叫結束時都會提交（沒有 auto_commit 開關）；同一個 task 中的巢狀呼叫共用同一條連線。
+"""
+import asyncio
+import itertools
+import weakref
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional, Tuple
+
+import pandas as pd
+import psycopg as pg
+
+from psql import pgcopy
+from psql.pg import (
+    COLUMN_TYPES_SQL,
+    DESCRIBE_TABLE_SQL,
+    PG,
+    PG_DBNAME,
+    PG_HOST,
+    PG_PASSWORD,
+    PG_PORT,
+    PG_USER,
+    SCHEMA_EXISTS_SQL,
+    TABLE_EXISTS_SQL,
+)
+from psql.pool import get_async_pool
+from psql.results import ResultBuilder, register_raw_loaders
+from psql.sqlsplit import split_statements
+
+# 目前 task 中各 AsyncPG 實例正在使用的連線：{id(實例): 連線}
+_current_connections: ContextVar[dict] = ContextVar("psql_async_connections", default={})
+
+
+class AsyncPG:
+    # 與 PG 共用不涉及連線的輔助方法
+    _parse_table_name = PG._parse_table_name
+    _escape_identifier = PG._escape_identifier
+    _check_output = PG._check_output
+    _build_result = PG._build_result
+    _get_pg_types = PG._get_pg_types
+    _map_binary_copy_types = PG._map_binary_copy_types
+    _map_unnest_types = PG._map_unnest_types
+    _iter_batches = PG._iter_batches
+    _estimate_row_bytes = PG._estimate_row_bytes
+    _prepare_rows = PG._prepare_rows
+    _prepare_columns = PG._prepare_columns
+    _configure_connection = PG._configure_connection
+    _single_statement = PG._single_statement
+
+    def __init__(
+        self,
+        dbname=PG_DBNAME,
+        host=PG_HOST,
+        port=PG_PORT,
+        user=PG_USER,
+        password=PG_PASSWORD,
+        pool: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_max_idle: float = 600.0,
+        pool_max_lifetime: float = 3600.0,
+        prepare_threshold: Optional[int] = 5,
+        prepared_max: int = 100,
+    ):
+        """
+        Args:
+            dbname, host, port, user, password: 連線參數，預設讀取 PG_* 環境變數
+            pool: 是否從同一 DSN 共用的非同步連線池借用連線（需要 psycopg_pool），
+                  讓多個 task 可以同時呼叫；否則所有呼叫依序共用一條連線
+            pool_min_size, pool_max_size, pool_max_idle, pool_max_lifetime: 同 PG
+            prepare_threshold, prepared_max: 伺服器端預備語句設定，同 PG
+        """
+        self.host = host
+        self.port = port
+        self.dbname = dbname
+        self.user = user
+        self.password = password
+        self.prepare_threshold = prepare_threshold
+        self.prepared_max = prepared_max
+        self._conn = None
+        self._lock = None
+        self._lock_owner = None
+        self._lock_iterator = None
+        self._cursor_ids = itertools.count()
+        self._pool = None
+        self._pool_options = None
+        if pool:
+            self._pool_options = {
+                "min_size": pool_min_size,
+                "max_size": pool_max_size,
+                "max_idle": pool_max_idle,
+                "max_lifetime": pool_max_lifetime,
+            }
+
+    async def connect(self) -> pg.AsyncConnection:
+        return self._configure_connection(await pg.AsyncConnection.connect(
+            host=self.host,
+            port=self.port,
+            dbname=self.dbname,
+            user=self.user,
+            password=self.password,
+        ))
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[pg.AsyncConnection]:
+        """
+        取得本次呼叫使用的連線；同一個 task 中的巢狀呼叫沿用外層的連線
+        """
+        current = _current_connections.get()
+        conn = current.get(id(self))
+        if conn is not None:
+            yield conn
+            return
+
+        async with self._acquire() as conn:
+            token = _current_connections.set({**current, id(self): conn})
+            try:
+                yield conn
+            finally:
+                _current_connections.reset(token)
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[pg.AsyncConnection]:
+        """
+        從連線池借出連線，或鎖定此實例的單一連線；結束時回滾未提交的交易
+        """
+        if self._pool_options is not None:
+            if self._pool is None:
+                conninfo = pg.conninfo.make_conninfo(
+                    host=self.host,
+                    port=self.port,
+                    dbname=self.dbname,
+                    user=self.user,
+                    password=self.password,
+                )
+                self._pool = await get_async_pool(conninfo, **self._pool_options)
+            async with self._pool.connection() as conn:
+                try:
+                    yield self._configure_connection(conn)
+                finally:
+                    await self._end_transaction(conn)
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        task = asyncio.current_task()
+        iterator = self._lock_iterator() if self._lock_iterator is not None else None
+        if self._lock.locked() and self._lock_owner is task and iterator is not None:
+            # query_iter 持有連線時把控制權交回了同一個 task，等待鎖會永遠阻塞；
+            # 已被丟棄的迭代器（弱參照已失效）會在其關閉工作執行後釋放鎖，照常等待即可
+            raise RuntimeError(
+                "this AsyncPG instance's connection is held by an unfinished query_iter "
+                "in the same task; finish or close the iterator first, or use pool=True"
+            )
+        async with self._lock:
+            self._lock_owner = task
+            try:
+                if self._conn is None or self._conn.closed:
+                    self._conn = await self.connect()
+                try:
+                    yield self._conn
+                finally:
+                    await self._end_transaction(self._conn)
+            finally:
+                self._lock_owner = None
+                self._lock_iterator = None
+
+    async def _end_transaction(self, conn: pg.AsyncConnection) -> None:
+        """回滾呼叫結束時仍未提交的交易（例如提前停止的 query_iter）"""
+        if not conn.closed and conn.info.transaction_status != pg.pq.TransactionStatus.IDLE:
+            await conn.rollback()
+
+    # === Schema 與表格 ===
+
+    async def create_schema(self, schema_name: str) -> None:
+        """
+        創建新的 schema
+
+        Args:
+            schema_name: schema 的名稱
+        """
+        escaped_schema = self._escape_identifier(schema_name)
+        await self.query(f"CREATE SCHEMA IF NOT EXISTS {escaped_schema};")
+
+    async def schema_exists(self, schema_name: str) -> bool:
+        """
+        檢查 schema 是否存在
+
+        Args:
+            schema_name: schema 名稱
+
+        Returns:
+            True 如果 schema 存在，否則 False
+        """
+        result = await self.query(SCHEMA_EXISTS_SQL, {"schema_name": schema_name})
+        return result.iloc[0, 0] if result is not None else False
+
+    async def describe_table(self, table_name: str, schema_name: Optional[str] = None) -> pd.DataFrame:
+        """
+        獲取表格的詳細信息
+
+        Args:
+            table_name: 表格名稱，可以是 'table' 或 'schema.table' 格式
+            schema_name: schema 名稱（如果 table_name 中已包含則忽略此參數）
+
+        Returns:
+            包含列信息的 DataFrame
+        """
+        if schema_name is None:
+            schema_name, table_name = self._parse_table_name(table_name)
+
+        return await self.query(
+            DESCRIBE_TABLE_SQL, {"schema_name": schema_name, "table_name": table_name}
+        )
+
+    async def table_exists(self, table_name: str, schema_name: Optional[str] = None) -> bool:
+        """
+        檢查表格是否存在
+
+        Args:
+            table_name: 表格名稱，可以是 'table' 或 'schema.table' 格式
+            schema_name: schema 名稱（如果 table_name 中已包含則忽略此參數）
+
+        Returns:
+            True 如果表格存在，否則 False
+        """
+        if schema_name is None:
+            schema_name, table_name = self._parse_table_name(table_name)
+
+        result = await self.query(
+            TABLE_EXISTS_SQL, {"schema_name": schema_name, "table_name": table_name}
+        )
+        return result.iloc[0, 0] if result is not None else False
+
+    # === 查詢 ===
+
+    async def query(
+        self,
+        query: str,
+        params=None,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+    ) -> pd.DataFrame | None:
+        """
+        Execute a SQL query or multiple SQL statements separated by semicolons.
+
+        Same as PG.query: multiple statements run in a single transaction and
+        only the result of the last statement is returned.
+
+        Args:
+            query: SQL query or multiple SQL statements separated by semicolons
+            params: parameters for a single statement, as in PG.query
+            output: 'pandas' or 'arrow', as in PG.query
+            dtype_backend: 'numpy' or 'pyarrow', as in PG.query
+            binary: request binary-format results, as in PG.query
+
+        Returns:
+            pandas DataFrame (or pyarrow.Table) for SELECT queries, None for other queries
+        """
+        self._check_output(output, dtype_backend)
+
+        statements = split_statements(query)
+        if not statements:
+            return None
+        if params is not None and len(statements) > 1:
+            raise ValueError("params can only be used with a single statement")
+
+        result = None
+        async with self._connection() as conn:
+            async with self._cursor(conn, binary=binary) as cur:
+                try:
+                    for i, stmt in enumerate(statements):
+                        await cur.execute(stmt, params)
+
+                        if i == len(statements) - 1 and cur.description:
+                            result = await self._fetch_result(conn, cur, output, dtype_backend, binary)
+
+                    await conn.commit()
+                except Exception as e:
+                    await conn.rollback()
+                    if len(statements) == 1:
+                        raise
+                    raise Exception(f"Error executing statement {i + 1}: {str(e)}")
+
+        return result
+
+    sql = query
+
+    def query_iter(
+        self,
+        query: str,
+        chunksize: int = 10000,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+        params=None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Stream the result of a single SELECT statement as DataFrame chunks.
+
+        Same as PG.query_iter, consumed with ``async for``. The connection is
+        held until the iterator is exhausted or closed; without a pool, other
+        tasks' calls on the same instance wait until then, and calls from the
+        iterating task itself raise RuntimeError instead of deadlocking. Use
+        ``pool=True`` to query while iterating.
+
+        Args:
+            query: a single SELECT statement
+            chunksize: maximum number of rows per yielded DataFrame
+            output: 'pandas' or 'arrow', as in PG.query
+            dtype_backend: 'numpy' or 'pyarrow', as in PG.query
+            binary: request binary-format results, as in PG.query
+            params: parameters of the statement, as in PG.query
+
+        Yields:
+            pandas DataFrames with at most ``chunksize`` rows. A query returning
+            no rows yields one empty DataFrame with the result columns.
+        """
+        # 持有連線期間以弱參照記錄迭代器，_acquire 據此區分仍在迭代與已被丟棄
+        holder = []
+        iterator = self._query_iter(holder, query, chunksize, output, dtype_backend, binary, params)
+        holder.append(weakref.ref(iterator))
+        return iterator
+
+    async def _query_iter(
+        self,
+        holder: list,
+        query: str,
+        chunksize: int,
+        output: str,
+        dtype_backend: str,
+        binary: bool,
+        params,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """query_iter 的非同步產生器本體；holder[0] 為指向產生器本身的弱參照"""
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be positive: {chunksize}")
+        self._check_output(output, dtype_backend)
+
+        statement = self._single_statement(query)
+        cursor_name = f"psql_iter_{next(self._cursor_ids)}"
+
+        # 不登記為目前 task 的連線：迭代器可能在其他 context 中被關閉
+        async with self._acquire() as conn:
+            if self._pool is None:
+                self._lock_iterator = holder[0]
+            async with self._cursor(conn, name=cursor_name, binary=binary) as cur:
+                await cur.execute(statement, params)
+
+                empty = True
+                while True:
+                    rows = await cur.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    empty = False
+                    builder = ResultBuilder(cur.description, conn.info.timezone, binary, cur)
+                    builder.append(rows)
+                    yield self._build_result(builder, output, dtype_backend)
+
+                if empty:
+                    builder = ResultBuilder(cur.description, conn.info.timezone, binary, cur)
+                    yield self._build_result(builder, output, dtype_backend)
+
+            await conn.commit()
+
+    async def _fetch_result(
+        self,
+        conn: pg.AsyncConnection,
+        cur,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+        chunksize: int = 10000,
+    ):
+        """
+        Fetch the remaining rows of a cursor into a DataFrame or Arrow table.
+
+        Args:
+            conn: connection the cursor belongs to
+            cur: cursor that has executed a statement returning rows
+            output: 'pandas' or 'arrow'
+            dtype_backend: 'numpy' or 'pyarrow'
+            binary: whether the cursor was opened by _cursor(binary=True)
+            chunksize: number of rows converted per fetch
+
+        Returns:
+            pandas DataFrame or pyarrow.Table
+        """
+        builder = ResultBuilder(cur.description, conn.info.timezone, binary, cur)
+        while True:
+            rows = await cur.fetchmany(chunksize)
+            if not rows:
+                break
+            builder.append(rows)
+        return self._build_result(builder, output, dtype_backend)
+
+    def _cursor(self, conn: pg.AsyncConnection, name: Optional[str] = None, binary: bool = False):
+        """
+        Open a cursor on conn, optionally returning binary-format results (see PG._cursor).
+        """
+        if name is None:
+            cur = conn.cursor(binary=binary)
+        else:
+            cur = conn.cursor(name=name, binary=binary)
+        if binary:
+            register_raw_loaders(cur)
+        return cur
+
+    # === 數據插入 ===
+
+    async def insert_pg(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        overwrite: bool = False,
+        method: str = "insert",
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        將 pandas DataFrame 插入到 PostgreSQL 表格中
+
+        Args:
+            df: 要插入的 pandas DataFrame
+            table_name: 目標表格名稱，支援 'schema.table' 格式
+            overwrite: 如果為 True，會刪除並重新創建表格；否則清空既有表格
+            method: 數據傳輸方式，'insert'、'copy'、'binary' 或 'unnest'（同 PG.insert_pg）
+            batch_size: 固定每批次的行數；未指定時自動決定
+            batch_bytes: 固定每批次的位元組預算
+        """
+        if method not in ("insert", "copy", "binary", "unnest"):
+            raise ValueError(f"不支援的插入方式: {method}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size 必須大於 0: {batch_size}")
+        if batch_bytes is not None and batch_bytes < 1:
+            raise ValueError(f"batch_bytes 必須大於 0: {batch_bytes}")
+
+        if df.empty:
+            return
+
+        async with self._connection() as conn:
+            full_table_name, pg_types = await self._prepare_table(df, table_name, overwrite, method)
+
+            escaped_columns = [self._escape_identifier(col) for col in df.columns]
+            columns_str = ", ".join(escaped_columns)
+            batches = self._iter_batches(df, batch_size, batch_bytes)
+
+            if method in ("copy", "binary"):
+                await self._copy_dataframe(conn, batches, full_table_name, columns_str, pg_types, method)
+                return
+
+            if method == "unnest":
+                arrays = ", ".join([f"%s::{pg_types[col]}[]" for col in df.columns])
+                insert_query = f"INSERT INTO {full_table_name} ({columns_str}) SELECT * FROM unnest({arrays})"
+            else:
+                placeholders = ", ".join(["%s" for _ in range(len(df.columns))])
+                insert_query = f"INSERT INTO {full_table_name} ({columns_str}) VALUES ({placeholders})"
+
+            for batch_number, batch in enumerate(batches, start=1):
+                async with conn.cursor() as cur:
+                    try:
+                        if method == "unnest":
+                            params = [values.tolist() for values in self._prepare_columns(batch)]
+                            await cur.execute(insert_query, params)
+                        else:
+                            await cur.executemany(insert_query, self._prepare_rows(batch))
+                        await conn.commit()
+                    except Exception as e:
+                        await conn.rollback()
+                        raise Exception(f"Error inserting batch {batch_number}: {str(e)}")
+
+    async def _copy_dataframe(
+        self,
+        conn: pg.AsyncConnection,
+        batches,
+        full_table_name: str,
+        columns_str: str,
+        pg_types: Optional[dict],
+        method: str,
+    ) -> None:
+        """
+        以 COPY ... FROM STDIN（文字或二進位格式）把批次串流寫入表格，最後提交一次
+
+        Args:
+            conn: 使用的連線
+            batches: _iter_batches 產生的 DataFrame 批次
+            full_table_name: 完整的表格名稱（包含 schema）
+            columns_str: 已轉義並以逗號連接的列名
+            pg_types: 列名到 PostgreSQL 類型的映射（'binary' 需要）
+            method: 'copy' 或 'binary'
+        """
+        options = " (FORMAT BINARY)" if method == "binary" else ""
+        copy_query = f"COPY {full_table_name} ({columns_str}) FROM STDIN{options}"
+
+        async with conn.cursor() as cur:
+            try:
+                async with cur.copy(copy_query) as copy:
+                    if method == "binary":
+                        await copy.write(pgcopy.PGCOPY_HEADER)
+                        for batch in batches:
+                            await copy.write(pgcopy.encode_rows(batch, pg_types))
+                        await copy.write(pgcopy.PGCOPY_TRAILER)
+                    else:
+                        for batch in batches:
+                            for row in self._prepare_rows(batch):
+                                await copy.write_row(row)
+                await conn.commit()
+            except Exception as e:
+                await conn.rollback()
+                raise Exception(f"Error copying data into {full_table_name}: {str(e)}")
+
+    async def _prepare_table(
+        self, df: pd.DataFrame, table_name: str, overwrite: bool, method: str
+    ) -> Tuple[str, Optional[dict]]:
+        """
+        確保 schema 與目標表格就緒（創建、覆蓋或清空），並決定傳輸時使用的類型映射
+
+        與 PG._prepare_table 相同。
+
+        Returns:
+            (完整表格名稱, 類型映射) 的元組；不需要類型映射的傳輸方式為 None
+        """
+        schema_name, parsed_table_name = self._parse_table_name(table_name)
+
+        if not await self.schema_exists(schema_name):
+            await self.create_schema(schema_name)
+
+        table_exists = await self.table_exists(parsed_table_name, schema_name)
+
+        escaped_schema = self._escape_identifier(schema_name)
+        escaped_table = self._escape_identifier(parsed_table_name)
+        full_table_name = f"{escaped_schema}.{escaped_table}"
+
+        pg_types = None
+        if table_exists and not overwrite:
+            # 在清空之前確認既有表格能接收這些數據
+            if method == "binary":
+                table_info = await self.describe_table(parsed_table_name, schema_name)
+                pg_types = self._map_binary_copy_types(df, table_info, parsed_table_name, schema_name)
+                pgcopy.check_values(df, pg_types)
+            elif method == "unnest":
+                column_types = await self.query(
+                    COLUMN_TYPES_SQL, {"schema_name": schema_name, "table_name": parsed_table_name}
+                )
+                pg_types = self._map_unnest_types(df, column_types, parsed_table_name, schema_name)
+
+            await self.query(f"TRUNCATE TABLE {full_table_name};")
+            return full_table_name, pg_types
+
+        pg_types = self._get_pg_types(df)
+        columns = ", ".join([
+            f"{self._escape_identifier(col)} {pg_types[col]}"
+            for col in df.columns
+        ])
+        await self.query(f"""
+            DROP TABLE IF EXISTS {full_table_name};
+            CREATE TABLE {full_table_name} ({columns});
+        """)
+        return full_table_name, pg_types
+
+    async def close(self) -> None:
+        """關閉此實例的連線（連線池模式下連線池由 close_async_pools 關閉）"""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
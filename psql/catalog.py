@@ -0,0 +1,157 @@
+"""
+schema / 表格元數據的進程內快取
+
+快取 schema_exists、table_exists 與 describe_table 的結果，讓重複載入同一批表格時不必
+每次都查詢系統目錄。快取依 conninfo 在同一進程的 PG 實例間共用，每筆紀錄依查詢時
+指定的 TTL 過期；經由 PG.query 執行的 CREATE / DROP / ALTER 會使相關紀錄失效。
+"""
+import re
+import threading
+import time
+from typing import Any
+
+MISSING = object()
+
+_IDENTIFIER = r'(?:"(?:[^"]|"")+"|[^\s.,;()"]+)'
+_NAME = rf"({_IDENTIFIER}(?:\s*\.\s*{_IDENTIFIER})?)"
+_IF_EXISTS = r"(?:\s+IF(?:\s+NOT)?\s+EXISTS)?"
+
+_DDL_RE = re.compile(r"^\s*(?:CREATE|DROP|ALTER)\b", re.IGNORECASE)
+_SCHEMA_DDL_RE = re.compile(
+    rf"^\s*(CREATE|DROP|ALTER)\s+SCHEMA{_IF_EXISTS}\s+{_NAME}(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_TABLE_DDL_RE = re.compile(
+    r"^\s*(?:CREATE(?:\s+OR\s+REPLACE)?(?:\s+(?:GLOBAL|LOCAL))?(?:\s+(?:TEMP|TEMPORARY|UNLOGGED))?|DROP|ALTER)"
+    rf"\s+(?:TABLE|VIEW|MATERIALIZED\s+VIEW|FOREIGN\s+TABLE){_IF_EXISTS}(?:\s+ONLY)?\s+{_NAME}(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_catalog_cache(conninfo: str) -> "CatalogCache":
+    """
+    取得 conninfo 對應的共用元數據快取，不存在時建立
+
+    Args:
+        conninfo: 連線字串
+
+    Returns:
+        CatalogCache
+    """
+    with _caches_lock:
+        cache = _caches.get(conninfo)
+        if cache is None:
+            cache = _caches[conninfo] = CatalogCache()
+        return cache
+
+
+def _split_name(name: str) -> tuple:
+    """
+    把 SQL 中的 [schema.]name 拆成 (schema, name)；未加引號的識別符轉為小寫，未指定 schema 時為 'public'
+    """
+    parts = re.findall(_IDENTIFIER, name)
+    parts = [p[1:-1].replace('""', '"') if p.startswith('"') else p.lower() for p in parts]
+    if len(parts) == 1:
+        return "public", parts[0]
+    return parts[0], parts[1]
+
+
+class CatalogCache:
+    """
+    以 (種類, schema[, table]) 為鍵的元數據快取
+
+    - ("schema", schema)：schema_exists 的結果
+    - ("table", schema, table)：table_exists 的結果
+    - ("columns", schema, table)：describe_table 的結果
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, ttl: float) -> Any:
+        """
+        讀取快取紀錄
+
+        Args:
+            key: 紀錄的鍵
+            ttl: 紀錄的有效秒數
+
+        Returns:
+            快取的值；不存在或已過期時為 MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        value, cached_at = entry
+        if time.monotonic() - cached_at > ttl:
+            return MISSING
+        return value
+
+    def set(self, key: tuple, value: Any) -> None:
+        """寫入快取紀錄"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+
+    def invalidate_schema(self, schema_name: str) -> None:
+        """使 schema 本身以及其中所有表格的紀錄失效（名稱不分大小寫比對）"""
+        schema_name = schema_name.lower()
+        with self._lock:
+            for key in [k for k in self._entries if k[1].lower() == schema_name]:
+                del self._entries[key]
+
+    def invalidate_table(self, schema_name: str, table_name: str) -> None:
+        """使表格的紀錄失效（名稱不分大小寫比對）"""
+        schema_name, table_name = schema_name.lower(), table_name.lower()
+        with self._lock:
+            for key in [
+                k for k in self._entries
+                if len(k) == 3 and k[1].lower() == schema_name and k[2].lower() == table_name
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """清除所有紀錄"""
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate_statements(self, statements: list) -> None:
+        """
+        依已執行的 SQL 語句使受影響的紀錄失效
+
+        能辨識目標的 schema / 表格 / 檢視 DDL 只使該目標失效；
+        其他 CREATE / DROP / ALTER（CASCADE、RENAME、一次刪除多個物件等）清除整個快取。
+
+        Args:
+            statements: 已執行的語句列表
+        """
+        for statement in statements:
+            if not _DDL_RE.match(statement):
+                continue
+
+            match = _SCHEMA_DDL_RE.match(statement)
+            if match:
+                action, name, rest = match.groups()
+                if action.upper() == "CREATE":
+                    # CREATE SCHEMA 可以附帶建立表格，因此使整個 schema 失效
+                    self.invalidate_schema(_split_name(name)[1])
+                    continue
+                if action.upper() == "DROP" and not rest.strip().startswith(","):
+                    self.invalidate_schema(_split_name(name)[1])
+                    continue
+                self.clear()
+                continue
+
+            match = _TABLE_DDL_RE.match(statement)
+            if match:
+                name, rest = match.groups()
+                affects_others = re.search(r"\b(?:CASCADE|RENAME)\b", rest, re.IGNORECASE)
+                if not affects_others and not rest.strip().startswith(","):
+                    self.invalidate_table(*_split_name(name))
+                    continue
+
+            self.clear()
@@ -0,0 +1,337 @@
+"""
+PG.query 結果的磁碟快取，可由多個進程共用
+
+每個結果以 Feather（未壓縮的 Arrow IPC 檔案，可直接記憶體映射）或 Parquet 檔案
+存放在快取目錄中，檔名為鍵的 SHA-256。寫入先寫到同目錄的暫存檔再以 os.replace
+原子地改名，因此並行的寫入者不會產生半寫的檔案，讀取者總是看到完整的舊檔或新檔。
+紀錄依檔案修改時間的 TTL 過期；目錄總大小超過上限時，依最後讀取時間淘汰最久未使用的檔案。
+每個檔案的 metadata 記錄產生結果的語句所引用的名稱，寫入表格時可刪除引用該表格的檔案；
+其他進程的寫入只能等 TTL 過期。需要 pyarrow。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Optional
+from zoneinfo import ZoneInfo
+
+from psql.catalog import MISSING
+from psql.result_cache import referenced_names, written_tables
+
+FORMATS = {"feather": ".arrow", "parquet": ".parquet"}
+
+# 記錄結果原本的形式，讀回時還原為相同的輸出
+_OUTPUT_KEY = b"psql.output"
+# 產生結果的語句引用的名稱（JSON 列表），寫入表格時據此刪除檔案
+_TABLES_KEY = b"psql.tables"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError(
+            "disk_cache_dir requires pyarrow; install it with `pip install pyarrow`"
+        ) from e
+    return pa
+
+
+def _arrow_lossless(values) -> bool:
+    """
+    判斷 object 列的值經 pyarrow 推斷類型後能否原樣讀回
+
+    json / jsonb 物件被推斷為 struct，讀回時缺少的鍵變成 None；不同小數位數的 numeric
+    被統一為同一個 scale；json 陣列中的整數與浮點數被統一為浮點數。
+    """
+    exponents = set()
+    number_types = set()
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            return False
+        if isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, Decimal):
+            exponents.add(value.as_tuple().exponent)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            number_types.add(type(value))
+    return len(exponents) <= 1 and len(number_types) <= 1
+
+
+class DiskCache:
+    """
+    以檔案存放查詢結果的快取
+
+    hits / misses / evictions 只統計本進程的讀取與淘汰。
+    """
+
+    def __init__(self, directory: str, ttl: float, max_bytes: int, format: str = "feather"):
+        """
+        Args:
+            directory: 快取目錄，不存在時建立
+            ttl: 紀錄的有效秒數（依檔案修改時間）
+            max_bytes: 快取目錄中結果檔案的大小上限（位元組）
+            format: 'feather'（可記憶體映射，讀取最快）或 'parquet'（壓縮，檔案較小）
+        """
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {sorted(FORMATS)}: {format}")
+        _require_pyarrow()
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.format = format
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: tuple) -> str:
+        """鍵對應的檔案路徑"""
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest + FORMATS[self.format])
+
+    def get(self, key: tuple) -> Any:
+        """
+        讀取快取的結果；Feather 檔案以記憶體映射讀取
+
+        Args:
+            key: 紀錄的鍵
+
+        Returns:
+            DataFrame 或 pyarrow.Table；不存在、已過期或無法讀取時為 MISSING
+        """
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > self.ttl:
+                raise FileNotFoundError(path)
+            table = self._read(path)
+            # 以存取時間記錄最近使用，供淘汰時排序
+            os.utime(path, (time.time(), stat.st_mtime))
+        except (OSError, ValueError):
+            # 不存在、過期、或在讀取期間被其他進程淘汰
+            with self._lock:
+                self.misses += 1
+            return MISSING
+
+        with self._lock:
+            self.hits += 1
+        return self._to_result(table)
+
+    def _read(self, path: str):
+        """讀取結果檔案為 pyarrow.Table"""
+        pa = _require_pyarrow()
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.read_table(path, memory_map=True)
+        with pa.memory_map(path) as source:
+            # 映射的緩衝區在檔案關閉後仍有效，被取代或刪除的檔案也一樣（POSIX）
+            return pa.ipc.open_file(source).read_all()
+
+    def _to_result(self, table):
+        """依寫入時記錄的形式，把 pyarrow.Table 還原為 query 的輸出"""
+        import pandas as pd
+
+        output = (table.schema.metadata or {}).get(_OUTPUT_KEY, b"pandas")
+        if output == b"arrow":
+            return table.replace_schema_metadata(
+                {
+                    k: v for k, v in table.schema.metadata.items() if k not in (_OUTPUT_KEY, _TABLES_KEY)
+                } or None
+            )
+        if output == b"pandas-pyarrow":
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+        import pyarrow as pa
+
+        df = table.to_pandas()
+        for i, field in enumerate(table.schema):
+            if pa.types.is_list(field.type) or pa.types.is_large_list(field.type):
+                # to_pandas 把陣列轉為 ndarray，還原為 query 回傳的 list
+                df.isetitem(i, pd.Series(table.column(i).to_pylist(), index=df.index, dtype=object))
+            elif pa.types.is_timestamp(field.type) and field.type.tz is not None:
+                # to_pandas 使用 pytz 時區，還原為連線使用的 zoneinfo 時區
+                try:
+                    df.isetitem(i, df.iloc[:, i].dt.tz_convert(ZoneInfo(field.type.tz)))
+                except (ValueError, KeyError):
+                    pass
+        return df
+
+    def set(self, key: tuple, result: Any, sql: Optional[str] = None) -> None:
+        """
+        寫入查詢結果並在超過大小上限時淘汰舊檔案；無法轉換為 Arrow 或無法原樣讀回
+        （例如 json / jsonb 物件、小數位數不一的 numeric）的結果不會被快取
+
+        Args:
+            key: 紀錄的鍵
+            result: 查詢結果（DataFrame 或 pyarrow.Table）
+            sql: 產生結果的語句，用於記錄引用的表格；未指定時任何寫入都會使該檔案失效
+        """
+        pa = _require_pyarrow()
+        import pandas as pd
+
+        try:
+            if isinstance(result, pd.DataFrame):
+                arrow_backed = len(result.columns) > 0 and all(
+                    isinstance(dtype, pd.ArrowDtype) for dtype in result.dtypes
+                )
+                if not all(
+                    _arrow_lossless(result.iloc[:, i])
+                    for i, dtype in enumerate(result.dtypes) if dtype == object
+                ):
+                    return
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                output = b"pandas-pyarrow" if arrow_backed else b"pandas"
+            else:
+                table, output = result, b"arrow"
+            metadata = {**(table.schema.metadata or {}), _OUTPUT_KEY: output}
+            if sql is not None:
+                metadata[_TABLES_KEY] = json.dumps(sorted(referenced_names(sql))).encode()
+            table = table.replace_schema_metadata(metadata)
+        except (pa.ArrowException, TypeError, ValueError):
+            # 例如包含 pyarrow 無法推斷類型的 object 列
+            return
+
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=os.path.basename(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq
+
+                    pq.write_table(table, sink)
+                else:
+                    import pyarrow.feather as feather
+
+                    feather.write_feather(table, sink, compression="uncompressed")
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """刪除過期檔案、遺留的暫存檔，並依最後讀取時間淘汰到大小上限以內"""
+        now = time.time()
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    # 崩潰的寫入者留下的暫存檔；仍在寫入中的暫存檔不會這麼舊
+                    if now - stat.st_mtime > max(self.ttl, 3600):
+                        self._remove(entry.path)
+                    continue
+                if not entry.name.endswith(FORMATS[self.format]):
+                    continue
+                if now - stat.st_mtime > self.ttl:
+                    self._remove(entry.path)
+                    continue
+                entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                with self._lock:
+                    self.evictions += 1
+            total -= size
+
+    def _remove(self, path: str) -> bool:
+        """刪除檔案；已被其他進程刪除時回傳 False"""
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def invalidate_table(self, table_name: str) -> None:
+        """
+        刪除引用了表格的結果檔案（只比對表格名稱，不分大小寫）
+
+        Args:
+            table_name: 表格名稱
+        """
+        self._invalidate(frozenset([table_name.lower()]))
+
+    def invalidate_statements(self, statements: list) -> None:
+        """
+        依已執行的語句刪除受影響的結果檔案（規則見 result_cache.written_tables）
+
+        Args:
+            statements: 已執行的語句列表
+        """
+        names = written_tables(statements)
+        if names is None:
+            self.clear()
+        elif names:
+            self._invalidate(names)
+
+    def _invalidate(self, names: frozenset) -> None:
+        """刪除引用了任一名稱的結果檔案；沒有記錄引用名稱或無法讀取的檔案也一併刪除"""
+        with os.scandir(self.directory) as it:
+            paths = [entry.path for entry in it if entry.name.endswith(FORMATS[self.format])]
+        for path in paths:
+            referenced = self._read_names(path)
+            if referenced is None or not referenced.isdisjoint(names):
+                self._remove(path)
+
+    def _read_names(self, path: str) -> Optional[frozenset]:
+        """只讀取檔案的 schema，取出記錄的引用名稱；沒有記錄或無法讀取時回傳 None"""
+        pa = _require_pyarrow()
+        try:
+            if self.format == "parquet":
+                import pyarrow.parquet as pq
+
+                schema = pq.read_schema(path)
+            else:
+                with pa.memory_map(path) as source:
+                    schema = pa.ipc.open_file(source).schema
+        except (OSError, ValueError):
+            return None
+        names = (schema.metadata or {}).get(_TABLES_KEY)
+        return None if names is None else frozenset(json.loads(names))
+
+    def clear(self) -> None:
+        """刪除快取目錄中的所有結果檔案（不重設計數器）"""
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(FORMATS[self.format]):
+                    self._remove(entry.path)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            包含 hits、misses、evictions、entries、bytes 的字典（entries / bytes 為目前目錄中的檔案）
+        """
+        entries, total = 0, 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(FORMATS[self.format]):
+                    try:
+                        total += entry.stat().st_size
+                    except OSError:
+                        continue
+                    entries += 1
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": total,
+            }
@@ -1,12 +1,33 @@
+import functools
+import inspect
+import io
+import itertools
+import math
 import os
 import re
-from typing import Optional, Tuple
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from types import SimpleNamespace
+from typing import Iterator, Optional, Tuple
 
+import numpy as np
 import psycopg as pg
 import pandas as pd
 
 from dotenv import load_dotenv
 
+from psql import pgcopy
+from psql.catalog import MISSING, get_catalog_cache
+from psql.disk_cache import DiskCache
+from psql.pool import get_pool
+from psql.result_cache import ResultCache, is_cacheable, normalize_sql
+from psql.results import ResultBuilder, register_raw_loaders
+from psql.sqlsplit import split_statements
+
 _root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(_root_dir, ".env"))
 
@@ -16,6 +37,138 @@ PG_DBNAME = os.environ["PG_DBNAME"]
 PG_USER = os.environ["PG_USER"]
 PG_PASSWORD = os.environ["PG_PASSWORD"]
 
+# 自適應批次大小：以每批次的位元組預算為起點，再依實際耗時調整
+DEFAULT_BATCH_BYTES = 4 * 1024 * 1024
+TARGET_BATCH_SECONDS = 0.5
+MIN_BATCH_ROWS = 100
+MAX_BATCH_ROWS = 200000
+
+# 系統目錄查詢：直接讀取 pg_namespace / pg_class / pg_attribute，
+# 避免 information_schema 視圖的權限過濾與大量關聯時的額外成本；
+# 輸出格式與 information_schema 相同（data_type、is_nullable 等）。
+# 名稱以查詢參數傳入，查詢文字固定，因此可以重用伺服器端的預備語句
+SCHEMA_EXISTS_SQL = """
+    SELECT EXISTS (
+        SELECT FROM pg_catalog.pg_namespace WHERE nspname = %(schema_name)s
+    )
+"""
+
+TABLE_EXISTS_SQL = """
+    SELECT EXISTS (
+        SELECT FROM pg_catalog.pg_class
+        WHERE oid = to_regclass(format('%%I.%%I', %(schema_name)s::text, %(table_name)s::text))
+        AND relkind IN ('r', 'p', 'v', 'f')
+    )
+"""
+
+LIST_TABLES_SQL = """
+    SELECT
+        c.relname::text AS table_name,
+        CASE
+            WHEN n.oid = pg_my_temp_schema() THEN 'LOCAL TEMPORARY'
+            WHEN c.relkind IN ('r', 'p') THEN 'BASE TABLE'
+            WHEN c.relkind = 'v' THEN 'VIEW'
+            ELSE 'FOREIGN'
+        END AS table_type
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = %(schema_name)s
+    AND c.relkind IN ('r', 'p', 'v', 'f')
+    ORDER BY c.relname;
+"""
+
+# describe_table 回傳的列（不含 SELECT 與 FROM），供單表與批次查詢共用
+_COLUMN_INFO_SQL = """
+        a.attname::text AS column_name,
+        CASE
+            WHEN t.typtype = 'd' THEN
+                CASE
+                    WHEN bt.typelem <> 0 AND bt.typlen = -1 THEN 'ARRAY'
+                    WHEN bt.typnamespace = 'pg_catalog'::regnamespace THEN format_type(t.typbasetype, NULL)
+                    ELSE 'USER-DEFINED'
+                END
+            WHEN t.typelem <> 0 AND t.typlen = -1 THEN 'ARRAY'
+            WHEN t.typnamespace = 'pg_catalog'::regnamespace THEN format_type(a.atttypid, NULL)
+            ELSE 'USER-DEFINED'
+        END AS data_type,
+        CASE WHEN a.attnotnull OR (t.typtype = 'd' AND t.typnotnull) THEN 'NO' ELSE 'YES' END AS is_nullable,
+        pg_get_expr(ad.adbin, ad.adrelid) AS column_default,
+        information_schema._pg_char_max_length(
+            information_schema._pg_truetypid(a.*, t.*), information_schema._pg_truetypmod(a.*, t.*)
+        )::int AS character_maximum_length,
+        information_schema._pg_numeric_precision(
+            information_schema._pg_truetypid(a.*, t.*), information_schema._pg_truetypmod(a.*, t.*)
+        )::int AS numeric_precision,
+        information_schema._pg_numeric_scale(
+            information_schema._pg_truetypid(a.*, t.*), information_schema._pg_truetypmod(a.*, t.*)
+        )::int AS numeric_scale
+"""
+
+DESCRIBE_TABLE_SQL = """
+    SELECT""" + _COLUMN_INFO_SQL + """
+    FROM pg_catalog.pg_attribute a
+    JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+    LEFT JOIN pg_catalog.pg_type bt ON t.typtype = 'd' AND bt.oid = t.typbasetype
+    LEFT JOIN pg_catalog.pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+    WHERE a.attrelid = to_regclass(format('%%I.%%I', %(schema_name)s::text, %(table_name)s::text))
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    ORDER BY a.attnum;
+"""
+
+# 既有表格各列的完整類型名稱，供 unnest 的陣列參數轉型；不含 typmod，
+# 以免明確轉型截斷 varchar(n) 等值（寫入時的賦值轉型仍會檢查長度）
+COLUMN_TYPES_SQL = """
+    SELECT a.attname::text AS column_name, format_type(a.atttypid, NULL) AS column_type
+    FROM pg_catalog.pg_attribute a
+    WHERE a.attrelid = to_regclass(format('%%I.%%I', %(schema_name)s::text, %(table_name)s::text))
+    AND a.attnum > 0
+    AND NOT a.attisdropped
+    ORDER BY a.attnum;
+"""
+
+# 一次查詢多個表格的列信息；{condition} 為篩選 pg_class c / pg_namespace n 的條件（可含查詢參數）。
+# 以 LEFT JOIN 讓沒有任何列的表格也出現一行（column_name 為 NULL）
+CATALOG_SNAPSHOT_SQL = """
+    SELECT
+        n.nspname::text AS schema_name,
+        c.relname::text AS table_name,""" + _COLUMN_INFO_SQL + """
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+    LEFT JOIN pg_catalog.pg_type bt ON t.typtype = 'd' AND bt.oid = t.typbasetype
+    LEFT JOIN pg_catalog.pg_attrdef ad ON ad.adrelid = a.attrelid AND ad.adnum = a.attnum
+    WHERE c.relkind IN ('r', 'p', 'v', 'f')
+    AND {condition}
+    ORDER BY n.nspname, c.relname, a.attnum;
+"""
+
+
+class _ConnectionOwner:
+    """thread_safe 模式下存放在執行緒區域儲存中的物件；執行緒結束時被回收，觸發關閉該執行緒的連線"""
+
+
+def _pooled(method):
+    """
+    在連線池模式下，讓方法在整個呼叫期間（生成器則為整個迭代期間）持有同一條連線，
+    並在最外層呼叫結束時把閒置的連線歸還連線池
+    """
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            with self._borrow():
+                yield from method(self, *args, **kwargs)
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._borrow():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
 
 class PG:
     def __init__(
@@ -25,29 +178,189 @@ class PG:
         port=PG_PORT,
         user=PG_USER,
         password=PG_PASSWORD,
+        pool: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_max_idle: float = 600.0,
+        pool_max_lifetime: float = 3600.0,
+        thread_safe: bool = False,
+        catalog_cache_ttl: Optional[float] = None,
+        result_cache_ttl: Optional[float] = None,
+        result_cache_max_bytes: int = 256 * 1024 * 1024,
+        disk_cache_dir: Optional[str] = None,
+        disk_cache_ttl: float = 24 * 3600.0,
+        disk_cache_max_bytes: int = 10 * 1024 ** 3,
+        disk_cache_format: str = "feather",
+        prepare_threshold: Optional[int] = 5,
+        prepared_max: int = 100,
     ):
+        """
+        Args:
+            dbname, host, port, user, password: 連線參數，預設讀取 PG_* 環境變數
+            pool: 是否從同一 DSN 共用的連線池借用連線（需要 psycopg_pool），
+                  每次呼叫 query / insert_pg 等方法時借出，結束後歸還
+            pool_min_size: 連線池保持的最少連線數
+            pool_max_size: 連線池的最大連線數
+            pool_max_idle: 閒置超過此秒數的多餘連線會被關閉
+            pool_max_lifetime: 連線存活超過此秒數後會被替換
+            thread_safe: 是否讓每個執行緒使用自己的連線（pool=True 時為每次呼叫各自從連線池借用），
+                         使同一個實例可以被多個執行緒同時呼叫
+            catalog_cache_ttl: 快取 schema_exists / table_exists / describe_table 結果的秒數，
+                               None 表示不快取；快取由同一 DSN 的實例共用，
+                               經由 query 執行的 CREATE / DROP / ALTER 會使相關紀錄失效
+            result_cache_ttl: 快取 query 唯讀查詢結果的秒數，None 表示不快取；
+                              此實例經由 query 執行的 DML / DDL 與 insert_pg 會使引用目標表格的結果失效
+            result_cache_max_bytes: 結果快取的大小上限（位元組），超過時淘汰最久未使用的結果
+            disk_cache_dir: 以檔案快取 query 唯讀查詢結果的目錄（需要 pyarrow），None 表示不使用；
+                            同一目錄可由多個進程共用，紀錄只依 TTL 與大小上限淘汰
+            disk_cache_ttl: 磁碟快取紀錄的有效秒數
+            disk_cache_max_bytes: 磁碟快取目錄的大小上限（位元組），超過時淘汰最久未讀取的檔案
+            disk_cache_format: 'feather'（記憶體映射讀取）或 'parquet'（壓縮）
+            prepare_threshold: 同一段語句文字（不論是否帶參數）在同一連線上執行幾次後改為伺服器端預備語句，
+                               0 表示第一次就預備，None 表示停用（例如經由交易模式的 pgbouncer 連線時）；
+                               預設值與 psycopg 相同
+            prepared_max: 每條連線保留的預備語句數量上限，超過時釋放最久未使用的語句（預設值與 psycopg 相同）
+        """
+        # 目前使用的連線與借用深度；thread_safe 時每個執行緒各自一份
+        self._state = threading.local() if thread_safe else SimpleNamespace()
+        self._thread_safe = thread_safe
+        self._thread_conns = []
+        self._thread_conns_lock = threading.Lock()
         self.host = host
         self.port = port
         self.dbname = dbname
         self.user = user
         self.password = password
         self._conn = None
-        self.auto_commit = True
+        self._auto_commit = True
+        self._cursor_ids = itertools.count()
+        self._pool = None
+        # 建立工作執行緒使用的 PG 實例時沿用的選項
+        self._worker_options = {"prepare_threshold": prepare_threshold, "prepared_max": prepared_max}
+        self.prepare_threshold = prepare_threshold
+        self.prepared_max = prepared_max
+        self._borrow_depth = 0
+        conninfo = pg.conninfo.make_conninfo(
+            host=host, port=port, dbname=dbname, user=user, password=password
+        )
+        self.catalog_cache_ttl = catalog_cache_ttl
+        self._catalog_cache = None
+        if catalog_cache_ttl is not None:
+            self._catalog_cache = get_catalog_cache(conninfo)
+        self.result_cache = None
+        if result_cache_ttl is not None:
+            self.result_cache = ResultCache(result_cache_ttl, result_cache_max_bytes)
+        self.disk_cache = None
+        if disk_cache_dir is not None:
+            self.disk_cache = DiskCache(disk_cache_dir, disk_cache_ttl, disk_cache_max_bytes, disk_cache_format)
+        if pool:
+            self._worker_options.update({
+                "pool": True,
+                "pool_min_size": pool_min_size,
+                "pool_max_size": pool_max_size,
+                "pool_max_idle": pool_max_idle,
+                "pool_max_lifetime": pool_max_lifetime,
+            })
+            self._pool = get_pool(
+                conninfo,
+                min_size=pool_min_size,
+                max_size=pool_max_size,
+                max_idle=pool_max_idle,
+                max_lifetime=pool_max_lifetime,
+            )
+
+    @property
+    def _conn(self) -> Optional[pg.Connection]:
+        return getattr(self._state, "conn", None)
+
+    @_conn.setter
+    def _conn(self, conn: Optional[pg.Connection]) -> None:
+        self._state.conn = conn
+
+    @property
+    def auto_commit(self) -> bool:
+        # insert_pg(transaction=True) 只在目前的狀態（thread_safe 時為目前執行緒）中暫停自動提交
+        return getattr(self._state, "auto_commit", self._auto_commit)
+
+    @auto_commit.setter
+    def auto_commit(self, auto_commit: bool) -> None:
+        self._auto_commit = auto_commit
+
+    @property
+    def _borrow_depth(self) -> int:
+        return getattr(self._state, "borrow_depth", 0)
+
+    @_borrow_depth.setter
+    def _borrow_depth(self, depth: int) -> None:
+        self._state.borrow_depth = depth
 
     @property
     def conn(self) -> pg.Connection:
+        if self._pool is not None:
+            # 連線池模式：借出的連線保留到最外層呼叫結束（交易未結束時則保留到下次呼叫）
+            if self._conn is None:
+                self._conn = self._configure_connection(self._pool.getconn())
+            return self._conn
         if not self._conn or self._conn.closed:
             self._conn = self.connect()
+            if self._thread_safe:
+                # 執行緒結束時區域儲存中的 owner 隨之被回收，finalize 關閉該執行緒的連線，
+                # 避免每個結束的執行緒留下一條開啟的連線
+                self._state.owner = _ConnectionOwner()
+                weakref.finalize(self._state.owner, self._conn.close)
+                # 記錄各執行緒的連線，讓 close() 可以全部關閉
+                with self._thread_conns_lock:
+                    self._thread_conns = [c for c in self._thread_conns if not c.closed]
+                    self._thread_conns.append(self._conn)
         return self._conn
 
+    @contextmanager
+    def _borrow(self):
+        """
+        連線池模式下標記一次公開方法呼叫；最外層呼叫結束時，若連線沒有未結束的交易就歸還連線池
+        """
+        if self._pool is None:
+            yield
+            return
+
+        self._borrow_depth += 1
+        try:
+            yield
+        finally:
+            self._borrow_depth -= 1
+            if self._borrow_depth == 0:
+                self._release()
+
+    def _release(self) -> None:
+        """把閒置的借用連線歸還連線池；處於交易中的連線繼續由此實例持有"""
+        if self._conn is None:
+            return
+        if self._conn.closed or self._conn.info.transaction_status == pg.pq.TransactionStatus.IDLE:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
     def connect(self) -> pg.Connection:
-        return pg.connect(
+        return self._configure_connection(pg.connect(
             host=self.host,
             port=self.port,
             dbname=self.dbname,
             user=self.user,
             password=self.password,
-        )
+        ))
+
+    def _configure_connection(self, conn: pg.Connection) -> pg.Connection:
+        """
+        套用預備語句設定；psycopg 在每條連線上以 LRU 管理預備語句
+        
+        Args:
+            conn: 新建立或從連線池借出的連線
+            
+        Returns:
+            同一條連線
+        """
+        conn.prepare_threshold = self.prepare_threshold
+        conn.prepared_max = self.prepared_max
+        return conn
 
     def _parse_table_name(self, table_name: str) -> Tuple[str, str]:
         """
@@ -92,6 +405,7 @@ class PG:
 
     # === Schema 管理功能 ===
     
+    @_pooled
     def create_schema(self, schema_name: str) -> None:
         """
         創建新的 schema
@@ -101,7 +415,9 @@ class PG:
         """
         escaped_schema = self._escape_identifier(schema_name)
         self.query(f"CREATE SCHEMA IF NOT EXISTS {escaped_schema};")
+        self._catalog_set(("schema", schema_name), True)
 
+    @_pooled
     def list_schemas(self) -> pd.DataFrame:
         """
         列出所有可用的 schemas
@@ -109,13 +425,14 @@ class PG:
         Returns:
             包含所有 schema 信息的 DataFrame
         """
-        return self.query("""
+        return self._query_uncached("""
             SELECT schema_name 
             FROM information_schema.schemata 
             WHERE schema_name NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
             ORDER BY schema_name;
         """)
 
+    @_pooled
     def drop_schema(self, schema_name: str, cascade: bool = False) -> None:
         """
         刪除指定的 schema
@@ -128,6 +445,7 @@ class PG:
         cascade_str = "CASCADE" if cascade else "RESTRICT"
         self.query(f"DROP SCHEMA IF EXISTS {escaped_schema} {cascade_str};")
 
+    @_pooled
     def schema_exists(self, schema_name: str) -> bool:
         """
         檢查 schema 是否存在
@@ -138,16 +456,19 @@ class PG:
         Returns:
             True 如果 schema 存在，否則 False
         """
-        result = self.query(f"""
-            SELECT EXISTS (
-                SELECT FROM information_schema.schemata 
-                WHERE schema_name = '{schema_name}'
-            )
-        """)
-        return result.iloc[0, 0] if result is not None else False
+        key = ("schema", schema_name)
+        cached = self._catalog_get(key)
+        if cached is not MISSING:
+            return cached
+
+        result = self._query_uncached(SCHEMA_EXISTS_SQL, {"schema_name": schema_name})
+        exists = result.iloc[0, 0] if result is not None else False
+        self._catalog_set(key, exists)
+        return exists
 
     # === 表格管理功能 ===
     
+    @_pooled
     def list_tables(self, schema_name: str = 'public') -> pd.DataFrame:
         """
         列出指定 schema 中的所有表格
@@ -158,13 +479,9 @@ class PG:
         Returns:
             包含表格信息的 DataFrame
         """
-        return self.query(f"""
-            SELECT table_name, table_type
-            FROM information_schema.tables
-            WHERE table_schema = '{schema_name}'
-            ORDER BY table_name;
-        """)
+        return self._query_uncached(LIST_TABLES_SQL, {"schema_name": schema_name})
 
+    @_pooled
     def describe_table(self, table_name: str, schema_name: Optional[str] = None) -> pd.DataFrame:
         """
         獲取表格的詳細信息
@@ -178,22 +495,19 @@ class PG:
         """
         if schema_name is None:
             schema_name, table_name = self._parse_table_name(table_name)
-        
-        return self.query(f"""
-            SELECT 
-                column_name,
-                data_type,
-                is_nullable,
-                column_default,
-                character_maximum_length,
-                numeric_precision,
-                numeric_scale
-            FROM information_schema.columns
-            WHERE table_schema = '{schema_name}'
-            AND table_name = '{table_name}'
-            ORDER BY ordinal_position;
-        """)
 
+        key = ("columns", schema_name, table_name)
+        cached = self._catalog_get(key)
+        if cached is not MISSING:
+            return cached.copy()
+
+        result = self._query_uncached(
+            DESCRIBE_TABLE_SQL, {"schema_name": schema_name, "table_name": table_name}
+        )
+        self._catalog_set(key, result.copy())
+        return result
+
+    @_pooled
     def table_exists(self, table_name: str, schema_name: Optional[str] = None) -> bool:
         """
         檢查表格是否存在
@@ -207,48 +521,316 @@ class PG:
         """
         if schema_name is None:
             schema_name, table_name = self._parse_table_name(table_name)
+
+        key = ("table", schema_name, table_name)
+        cached = self._catalog_get(key)
+        if cached is not MISSING:
+            return cached
+
+        result = self._query_uncached(
+            TABLE_EXISTS_SQL, {"schema_name": schema_name, "table_name": table_name}
+        )
+        exists = result.iloc[0, 0] if result is not None else False
+        self._catalog_set(key, exists)
+        return exists
+
+    @_pooled
+    def describe_tables(self, names: list) -> dict:
+        """
+        以單一查詢獲取多個表格的詳細信息
+        
+        啟用 catalog_cache_ttl 時，結果會寫入元數據快取，之後對這些表格的
+        describe_table / table_exists 以及 insert_pg 不再需要查詢資料庫。
+        
+        Args:
+            names: 表格名稱列表，每個可以是 'table' 或 'schema.table' 格式
+            
+        Returns:
+            以 'schema.table' 為鍵、describe_table 格式的 DataFrame 為值的字典；
+            不存在的表格不會出現在結果中
+        """
+        targets = list(dict.fromkeys(self._parse_table_name(name) for name in names))
+        if not targets:
+            return {}
+
+        snapshot = self._load_catalog_snapshot("""
+            c.oid IN (
+                SELECT to_regclass(format('%%I.%%I', r.schema_name, r.table_name))
+                FROM unnest(%(schemas)s::text[], %(tables)s::text[]) AS r(schema_name, table_name)
+            )
+        """, {
+            "schemas": [schema_name for schema_name, _ in targets],
+            "tables": [table_name for _, table_name in targets],
+        })
+
+        for schema_name, table_name in targets:
+            if f"{schema_name}.{table_name}" not in snapshot:
+                self._catalog_set(("table", schema_name, table_name), False)
+        return snapshot
+
+    @_pooled
+    def catalog_snapshot(self, schemas: Optional[list] = None) -> dict:
+        """
+        以單一查詢獲取一個或多個 schema 中所有表格的詳細信息
         
-        result = self.query(f"""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = '{schema_name}' 
-                AND table_name = '{table_name}'
+        啟用 catalog_cache_ttl 時，結果會寫入元數據快取（同 describe_tables）。
+        
+        Args:
+            schemas: schema 名稱或名稱列表；None 表示所有非系統 schema
+            
+        Returns:
+            以 'schema.table' 為鍵、describe_table 格式的 DataFrame 為值的字典
+        """
+        if isinstance(schemas, str):
+            schemas = [schemas]
+        if schemas is None:
+            return self._load_catalog_snapshot(
+                "n.nspname NOT IN ('pg_catalog', 'information_schema') AND n.nspname !~ '^pg_(toast|temp)'"
             )
-        """)
-        return result.iloc[0, 0] if result is not None else False
+        if not schemas:
+            return {}
+        return self._load_catalog_snapshot("n.nspname = ANY(%(schemas)s::text[])", {"schemas": list(schemas)})
+
+    def _load_catalog_snapshot(self, condition: str, params: Optional[dict] = None) -> dict:
+        """
+        執行 CATALOG_SNAPSHOT_SQL，按表格分組並寫入元數據快取
+        
+        Args:
+            condition: 篩選表格的 SQL 條件
+            params: 條件中使用的查詢參數
+            
+        Returns:
+            以 'schema.table' 為鍵、describe_table 格式的 DataFrame 為值的字典
+        """
+        with self._cursor() as cur:
+            cur.execute(CATALOG_SNAPSHOT_SQL.format(condition=condition), params)
+            # 前兩列是 schema_name / table_name，其餘與 describe_table 相同
+            description = cur.description[2:]
+            rows = cur.fetchall()
+        if self.auto_commit:
+            self.conn.commit()
+
+        grouped = {}
+        for schema_name, table_name, *columns in rows:
+            table_rows = grouped.setdefault((schema_name, table_name), [])
+            if columns[0] is not None:
+                table_rows.append(columns)
+
+        snapshot = {}
+        for (schema_name, table_name), table_rows in grouped.items():
+            table_info = self._rows_to_frame(description, table_rows)
+            self._catalog_set(("schema", schema_name), True)
+            self._catalog_set(("table", schema_name, table_name), True)
+            self._catalog_set(("columns", schema_name, table_name), table_info.copy())
+            snapshot[f"{schema_name}.{table_name}"] = table_info
+        return snapshot
+
+    def _query_uncached(self, sql: str, params=None) -> pd.DataFrame | None:
+        """
+        執行內部使用的單一唯讀查詢（系統目錄、範圍邊界等），不經過結果快取
+        
+        Args:
+            sql: SQL 語句
+            params: 查詢參數
+            
+        Returns:
+            查詢結果的 DataFrame
+        """
+        return self._execute_statements([sql.strip()], "pandas", "numpy", False, params)
+
+    def _catalog_get(self, key: tuple):
+        """
+        讀取元數據快取；未啟用快取時一律視為未命中
+        
+        Returns:
+            快取的值，或 catalog.MISSING
+        """
+        if self._catalog_cache is None:
+            return MISSING
+        return self._catalog_cache.get(key, self.catalog_cache_ttl)
+
+    def _catalog_set(self, key: tuple, value) -> None:
+        """寫入元數據快取（未啟用快取時不做任何事）"""
+        if self._catalog_cache is not None:
+            self._catalog_cache.set(key, value)
 
     # === 原有功能（已增強）===
 
-    def query(self, query: str) -> pd.DataFrame | None:
+    @_pooled
+    def query(
+        self,
+        query: str,
+        params=None,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+        script: bool = False,
+    ) -> pd.DataFrame | None:
         """
         Execute a SQL query or multiple SQL statements separated by semicolons.
 
         For multiple statements, they will be executed in a single transaction.
         Only the result of the last statement will be returned (if it's a SELECT).
+        Statements are split by a lexer that ignores semicolons inside string
+        literals, quoted identifiers, dollar-quoted bodies and comments.
 
         Args:
             query: SQL query or multiple SQL statements separated by semicolons
+            params: parameters for a single statement, a sequence for %s
+                    placeholders or a mapping for %(name)s placeholders. Values
+                    are sent separately from the SQL text, so calls with
+                    different values share one statement text, which is
+                    prepared on the server once that text has been executed
+                    prepare_threshold times on the connection
+            output: 'pandas' for a DataFrame, 'arrow' for a pyarrow.Table built
+                    directly from the fetched columns (requires pyarrow)
+            dtype_backend: for output='pandas', 'numpy' for NumPy dtypes or
+                           'pyarrow' for Arrow-backed pandas dtypes (requires pyarrow)
+            binary: request binary-format results; integer, float, boolean and
+                    timestamp columns are then decoded in bulk from their raw
+                    bytes instead of being parsed from text cell by cell
+            script: send all statements to the server in one round trip over
+                    the simple query protocol instead of one round trip per
+                    statement; cannot be combined with params or binary
+
+        With result_cache_ttl set, the result of a single read-only statement
+        is served from the result cache until it expires or this instance
+        writes to a table the statement mentions. With disk_cache_dir set,
+        it is also read from and written to the on-disk cache, whose files
+        are deleted by the same writes; writes by other processes are only
+        picked up once the files expire.
 
         Returns:
-            pandas DataFrame for SELECT queries, None for other queries
+            pandas DataFrame (or pyarrow.Table) for SELECT queries, None for other queries
         """
+        self._check_output(output, dtype_backend)
+
         # Split the query into individual statements
-        statements = [stmt.strip() for stmt in query.split(";") if stmt.strip()]
+        statements = split_statements(query)
 
         if not statements:
             return None
+        if params is not None and len(statements) > 1:
+            raise ValueError("params can only be used with a single statement")
+        if script and (params is not None or binary):
+            raise ValueError("script=True cannot be combined with params or binary")
+
+        cache_key = None
+        caching = self.result_cache is not None or self.disk_cache is not None
+        if caching and len(statements) == 1 and is_cacheable(statements[0]):
+            params_key = None if params is None else repr(params)
+            cache_key = (normalize_sql(statements[0]), params_key, output, dtype_backend, binary)
+            cached = self._get_cached_result(cache_key, statements[0])
+            if cached is not MISSING:
+                return cached
+
+        try:
+            if script and len(statements) > 1:
+                result = self._execute_script(query, output, dtype_backend)
+            else:
+                result = self._execute_statements(statements, output, dtype_backend, binary, params)
+            if cache_key is not None and result is not None:
+                self._store_result(cache_key, result, statements[0])
+            return result
+        finally:
+            # DDL issued through this method invalidates the cached catalog metadata,
+            # DML and DDL invalidate cached results that reference the written tables
+            if self._catalog_cache is not None:
+                self._catalog_cache.invalidate_statements(statements)
+            if self.result_cache is not None:
+                self.result_cache.invalidate_statements(statements)
+            if self.disk_cache is not None:
+                self.disk_cache.invalidate_statements(statements)
+
+    sql = query
+
+    def _execute_script(self, script: str, output: str, dtype_backend: str) -> pd.DataFrame | None:
+        """
+        Execute a multi-statement script in a single simple-query round trip.
+
+        The server runs all statements in the current transaction and returns
+        every result at once; only the last one is converted.
+
+        Args:
+            script: the original, unsplit SQL text
+            output, dtype_backend: as in query
+
+        Returns:
+            result of the last statement, None if it returns no rows
+        """
+        result = None
+        with self._cursor() as cur:
+            try:
+                # Multiple statements cannot be prepared, even with prepare_threshold=0
+                cur.execute(script, prepare=False)
+                while cur.nextset():
+                    pass
+                if cur.description:
+                    result = self._fetch_result(cur, output, dtype_backend)
+                if self.auto_commit:
+                    self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return result
+
+    def _get_cached_result(self, key: tuple, statement: str):
+        """
+        Look a read-only statement up in the result cache, then the disk cache.
+
+        A disk cache hit is also stored in the in-memory result cache.
+
+        Returns:
+            the cached result, or catalog.MISSING
+        """
+        if self.result_cache is not None:
+            cached = self.result_cache.get(key)
+            if cached is not MISSING:
+                return cached
+        if self.disk_cache is not None:
+            cached = self.disk_cache.get(self._disk_cache_key(key))
+            if cached is not MISSING and self.result_cache is not None:
+                self.result_cache.set(key, cached, statement)
+            return cached
+        return MISSING
+
+    def _store_result(self, key: tuple, result, statement: str) -> None:
+        """Store a fresh result in the enabled result caches."""
+        if self.result_cache is not None:
+            self.result_cache.set(key, result, statement)
+        if self.disk_cache is not None:
+            self.disk_cache.set(self._disk_cache_key(key), result, statement)
+
+    def _disk_cache_key(self, key: tuple) -> tuple:
+        """Qualify a result cache key with the database, as the cache directory may be shared."""
+        return (self.host, str(self.port), self.dbname, self.user) + key
+
+    def _execute_statements(
+        self, statements: list, output: str, dtype_backend: str, binary: bool, params=None
+    ) -> pd.DataFrame | None:
+        """
+        Execute already split statements, the last one's result is returned.
+
+        A single statement runs on its own; several run in one transaction.
+
+        Args:
+            statements: non-empty list of SQL statements
+            output, dtype_backend, binary: as in query
+            params: parameters of a single statement, as in query
 
+        Returns:
+            result of the last statement, None if it returns no rows
+        """
         # If only one statement, use the existing behavior
         if len(statements) == 1:
-            with self.conn.cursor() as cur:
-                cur.execute(statements[0])
+            with self._cursor(binary=binary) as cur:
+                cur.execute(statements[0], params)
 
                 if cur.description:
-                    colnames = [desc[0] for desc in cur.description]
-                    results = cur.fetchall()
+                    result = self._fetch_result(cur, output, dtype_backend, binary=binary)
                     if self.auto_commit:
                         self.conn.commit()
-                    return pd.DataFrame(results, columns=colnames)
+                    return result
                 else:
                     if self.auto_commit:
                         self.conn.commit()
@@ -256,7 +838,7 @@ class PG:
 
         # For multiple statements, execute them in a transaction
         result = None
-        with self.conn.cursor() as cur:
+        with self._cursor(binary=binary) as cur:
             try:
                 # Execute each statement
                 for i, stmt in enumerate(statements):
@@ -267,9 +849,7 @@ class PG:
 
                     # If this is the last statement and it returns results, capture them
                     if i == len(statements) - 1 and cur.description:
-                        colnames = [desc[0] for desc in cur.description]
-                        results = cur.fetchall()
-                        result = pd.DataFrame(results, columns=colnames)
+                        result = self._fetch_result(cur, output, dtype_backend, binary=binary)
 
                 # Commit the transaction if auto_commit is True
                 if self.auto_commit:
@@ -282,135 +862,1375 @@ class PG:
 
         return result
 
-    sql = query
+    def query_many(
+        self,
+        queries: list,
+        max_concurrency: int = 8,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+    ) -> list:
+        """
+        Execute independent queries concurrently over several connections.
 
-    def insert_pg(
-        self, df: pd.DataFrame, table_name: str, overwrite: bool = False
-    ) -> None:
+        Each query runs through query() on its own connection (drawn from the
+        pool when this instance uses one), so multi-statement scripts work too.
+
+        Args:
+            queries: list of SQL strings, each as accepted by query()
+            max_concurrency: maximum number of queries running at the same time
+            output: 'pandas' or 'arrow', as in query
+            dtype_backend: 'numpy' or 'pyarrow', as in query
+            binary: request binary-format results, as in query
+
+        Returns:
+            list of results in the same order as ``queries``. DataFrames carry
+            the wall-clock seconds of their query in ``df.attrs["elapsed_seconds"]``
+            (pyarrow.Table results in their schema metadata); statements that
+            return no rows give None.
         """
-        將 pandas DataFrame 插入到 PostgreSQL 表格中
-        
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be positive: {max_concurrency}")
+        self._check_output(output, dtype_backend)
+        return list(self._iter_concurrent(queries, max_concurrency, output, dtype_backend, binary))
+
+    def _iter_concurrent(
+        self,
+        queries: list,
+        max_concurrency: int,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+    ) -> Iterator:
+        """
+        Run queries on a thread pool and yield their results in input order,
+        each as soon as it and all earlier ones have finished.
+
         Args:
-            df: 要插入的 pandas DataFrame
-            table_name: 目標表格名稱，格式可以是：
-                       - 'my_table' (使用預設 schema 'public')
-                       - 'my_schema.my_table' (指定 schema)
-            overwrite: 如果為 True，會刪除並重新創建表格
+            queries: list of SQL strings
+            max_concurrency: number of worker threads (and connections)
+            output, dtype_backend, binary: as in query
+
+        Yields:
+            query() results with the elapsed seconds attached (see query_many)
         """
-        if df.empty:
-            return
+        # 每個執行緒使用自己的連線
+        runner = PG(
+            dbname=self.dbname,
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            thread_safe=True,
+            **self._worker_options,
+        )
+
+        def run(query: str):
+            start = time.perf_counter()
+            result = runner.query(query, output=output, dtype_backend=dtype_backend, binary=binary)
+            elapsed = time.perf_counter() - start
+            if isinstance(result, pd.DataFrame):
+                result.attrs["elapsed_seconds"] = elapsed
+            elif result is not None:
+                result = result.replace_schema_metadata(
+                    {**(result.schema.metadata or {}), b"elapsed_seconds": str(elapsed).encode()}
+                )
+            return result
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, max(len(queries), 1))) as executor:
+                yield from executor.map(run, queries)
+        finally:
+            runner.close()
+
+    @_pooled
+    def read_table_parallel(
+        self,
+        table_name: str,
+        key_column: Optional[str] = None,
+        n_workers: int = 4,
+        columns: Optional[list] = None,
+        chunks: bool = False,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+    ):
+        """
+        Read a whole table by splitting it into ranges fetched concurrently.
+
+        With ``key_column`` (a numeric column) the table is split into equal
+        ranges between its min and max values; rows with a NULL key go to the
+        last range; the column should be indexed, otherwise every range scans
+        the whole table. Without it the table is split into physical block
+        ranges using ctid, which PostgreSQL 14+ scans with a TID range scan.
+
+        Args:
+            table_name: table name, 'table' or 'schema.table'
+            key_column: numeric column to split on, None to split by ctid
+            n_workers: number of ranges and concurrent connections
+            columns: columns to read, None for all
+            chunks: if True, return an iterator of per-range results in range
+                    order instead of one concatenated result
+            output, dtype_backend, binary: as in query
+
+        Returns:
+            one DataFrame (or pyarrow.Table) with the ranges concatenated in
+            order, or an iterator over the per-range results when ``chunks``
+        """
+        if n_workers < 1:
+            raise ValueError(f"n_workers must be positive: {n_workers}")
+        self._check_output(output, dtype_backend)
 
-        # 解析表格名稱
         schema_name, parsed_table_name = self._parse_table_name(table_name)
-        
-        # 確保 schema 存在
-        if not self.schema_exists(schema_name):
-            self.create_schema(schema_name)
+        full_table_name = (
+            f"{self._escape_identifier(schema_name)}.{self._escape_identifier(parsed_table_name)}"
+        )
+        select_list = "*" if columns is None else ", ".join(self._escape_identifier(c) for c in columns)
+        select = f"SELECT {select_list} FROM {full_table_name}"
 
-        # 檢查表格是否存在
-        table_exists = self.table_exists(parsed_table_name, schema_name)
-        
-        # 構建完整的表格名稱
-        escaped_schema = self._escape_identifier(schema_name)
-        escaped_table = self._escape_identifier(parsed_table_name)
-        full_table_name = f"{escaped_schema}.{escaped_table}"
+        if key_column is None:
+            conditions = self._ctid_ranges(full_table_name, n_workers)
+        else:
+            conditions = self._key_ranges(full_table_name, key_column, n_workers)
+        queries = [f"{select} WHERE {condition}" for condition in conditions]
 
-        # 處理表格創建/覆蓋邏輯
-        if table_exists and overwrite:
-            # 獲取列類型並重新創建表格
-            pg_types = self._get_pg_types(df)
-            columns = ", ".join([
-                f"{self._escape_identifier(col)} {pg_types[col]}" 
-                for col in df.columns
-            ])
-            
-            self.query(f"""
-                DROP TABLE IF EXISTS {full_table_name};
-                CREATE TABLE {full_table_name} ({columns});
-            """)
-        elif not table_exists:
-            # 創建新表格
-            pg_types = self._get_pg_types(df)
-            columns = ", ".join([
-                f"{self._escape_identifier(col)} {pg_types[col]}" 
-                for col in df.columns
-            ])
-            self.query(f"CREATE TABLE {full_table_name} ({columns});")
-        elif table_exists and not overwrite:
-            # 表格已存在且不覆蓋，則清空表格
-            self.query(f"TRUNCATE TABLE {full_table_name};")
+        results = self._iter_concurrent(queries, n_workers, output, dtype_backend, binary)
+        if chunks:
+            return results
+        results = list(results)
+        if output == "arrow":
+            import pyarrow as pa
 
-        # 批量插入數據
-        self._insert_dataframe_batch(df, full_table_name)
+            return pa.concat_tables(results)
+        return pd.concat(results, ignore_index=True)
 
-    def _insert_dataframe_batch(self, df: pd.DataFrame, full_table_name: str) -> None:
+    def _key_ranges(self, full_table_name: str, key_column: str, n_ranges: int) -> list:
         """
-        批量插入 DataFrame 數據到指定表格
-        
-        Args:
-            df: 要插入的 DataFrame
-            full_table_name: 完整的表格名稱（包含 schema）
+        Split a numeric key column into at most n_ranges WHERE conditions.
+
+        Returns:
+            list of SQL conditions covering every row, NULL keys included
         """
-        batch_size = 1000
-        total_rows = len(df)
+        key = self._escape_identifier(key_column)
+        bounds = self._query_uncached(f"SELECT min({key}) AS lo, max({key}) AS hi FROM {full_table_name}")
+        lo, hi = bounds.iloc[0, 0], bounds.iloc[0, 1]
+        if pd.isna(lo):
+            return ["true"]
+        if not pd.api.types.is_number(lo):
+            raise ValueError(f"key_column must be a numeric column: {key_column}")
 
-        # 準備列名（轉義）
-        escaped_columns = [self._escape_identifier(col) for col in df.columns]
-        columns_str = ", ".join(escaped_columns)
-        
-        for i in range(0, total_rows, batch_size):
-            batch = df.iloc[i : i + batch_size]
-            
-            # 準備數據
-            values = []
-            for _, row in batch.iterrows():
-                row_values = []
-                for val in row:
-                    if pd.isna(val):
-                        row_values.append(None)
-                    else:
-                        row_values.append(val)
-                values.append(tuple(row_values))
-            
-            # 執行批量插入
-            with self.conn.cursor() as cur:
-                try:
-                    # 構建參數化查詢
-                    placeholders = ", ".join(["%s" for _ in range(len(df.columns))])
-                    insert_query = f"INSERT INTO {full_table_name} ({columns_str}) VALUES ({placeholders})"
-                    
-                    # 使用 executemany 進行批量插入（更高效）
-                    cur.executemany(insert_query, values)
-                    
-                    if self.auto_commit:
-                        self.conn.commit()
-                except Exception as e:
-                    self.conn.rollback()
-                    raise Exception(f"Error inserting batch {i//batch_size + 1}: {str(e)}")
+        # 以整數邊界切成左閉右開的區間，非整數的鍵值同樣會落在某個區間內
+        lo, hi = math.floor(lo), math.floor(hi)
+        span = hi - lo + 1
+        edges = sorted({lo + span * i // n_ranges for i in range(n_ranges)} | {hi + 1})
+        conditions = [f"{key} >= {start} AND {key} < {end}" for start, end in zip(edges, edges[1:])]
+        conditions[-1] += f" OR {key} IS NULL"
+        return conditions
 
-    def _get_pg_types(self, df: pd.DataFrame) -> dict:
+    def _ctid_ranges(self, full_table_name: str, n_ranges: int) -> list:
         """
-        將 pandas DataFrame 的數據類型映射到 PostgreSQL 數據類型
-        
-        Args:
-            df: pandas DataFrame
-            
+        Split a table into at most n_ranges physical block ranges.
+
         Returns:
-            列名到 PostgreSQL 數據類型的字典映射
+            list of ctid conditions; the last range is open-ended so rows in
+            blocks added meanwhile are still read
         """
-        pg_types = {}
+        result = self._query_uncached("""
+            SELECT (pg_relation_size(%(table_name)s::regclass)
+                    / current_setting('block_size')::int) AS blocks
+        """, {"table_name": full_table_name})
+        n_blocks = int(result.iloc[0, 0])
+        edges = sorted({n_blocks * i // n_ranges for i in range(1, n_ranges)} - {0})
+        if not edges:
+            return ["true"]
 
-        for col, dtype in df.dtypes.items():
-            if pd.api.types.is_integer_dtype(dtype):
-                # 根據整數大小選擇適當的類型
-                if df[col].min() >= -2147483648 and df[col].max() <= 2147483647:
-                    pg_types[col] = "INTEGER"
-                else:
-                    pg_types[col] = "BIGINT"
-            elif pd.api.types.is_float_dtype(dtype):
-                pg_types[col] = "DOUBLE PRECISION"
-            elif pd.api.types.is_bool_dtype(dtype):
-                pg_types[col] = "BOOLEAN"
+        conditions = []
+        start = 0
+        for end in edges:
+            conditions.append(f"ctid >= '({start},0)'::tid AND ctid < '({end},0)'::tid")
+            start = end
+        conditions.append(f"ctid >= '({start},0)'::tid")
+        return conditions
+
+    @_pooled
+    def query_iter(
+        self,
+        query: str,
+        chunksize: int = 10000,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        binary: bool = False,
+        params=None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the result of a single SELECT statement as DataFrame chunks.
+
+        Rows are fetched through a named (server-side) cursor, so client memory
+        stays bounded by ``chunksize`` regardless of the total result size.
+        The cursor is declared WITH HOLD, so writes on the same instance inside
+        the loop (query, insert_pg) may commit without closing it; the server
+        then keeps the remaining rows until the iterator finishes or is closed.
+
+        Args:
+            query: a single SELECT statement
+            chunksize: maximum number of rows per yielded DataFrame
+            output: 'pandas' or 'arrow', as in query
+            dtype_backend: 'numpy' or 'pyarrow', as in query
+            binary: request binary-format results, as in query
+            params: parameters of the statement, as in query
+
+        Yields:
+            pandas DataFrames with at most ``chunksize`` rows. A query returning
+            no rows yields one empty DataFrame with the result columns.
+        """
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be positive: {chunksize}")
+        self._check_output(output, dtype_backend)
+
+        statement = self._single_statement(query)
+        cursor_name = f"psql_iter_{next(self._cursor_ids)}"
+
+        try:
+            with self._cursor(name=cursor_name, binary=binary, withhold=True) as cur:
+                cur.execute(statement, params)
+
+                empty = True
+                while True:
+                    rows = cur.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    empty = False
+                    builder = ResultBuilder(cur.description, self.conn.info.timezone, binary, cur)
+                    builder.append(rows)
+                    yield self._build_result(builder, output, dtype_backend)
+
+                if empty:
+                    builder = ResultBuilder(cur.description, self.conn.info.timezone, binary, cur)
+                    yield self._build_result(builder, output, dtype_backend)
+
+            if self.auto_commit:
+                self.conn.commit()
+        except GeneratorExit:
+            # The consumer stopped early; end the transaction holding the cursor
+            if self.auto_commit:
+                self.conn.commit()
+            raise
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _fetch_result(
+        self,
+        cur,
+        output: str = "pandas",
+        dtype_backend: str = "numpy",
+        chunksize: int = 10000,
+        binary: bool = False,
+    ):
+        """
+        Fetch the remaining rows of a cursor into a DataFrame or Arrow table.
+
+        Rows are fetched in chunks and written straight into typed per-column
+        buffers (see ResultBuilder), so no full list of row tuples is kept.
+
+        Args:
+            cur: cursor that has executed a statement returning rows
+            output: 'pandas' or 'arrow'
+            dtype_backend: 'numpy' or 'pyarrow'
+            chunksize: number of rows converted per fetch
+            binary: whether the cursor was opened by _cursor(binary=True)
+
+        Returns:
+            pandas DataFrame with dtypes chosen from the column type OIDs,
+            or a pyarrow.Table
+        """
+        builder = ResultBuilder(cur.description, self.conn.info.timezone, binary, cur)
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            builder.append(rows)
+        return self._build_result(builder, output, dtype_backend)
+
+    def _cursor(self, name: Optional[str] = None, binary: bool = False, withhold: bool = False):
+        """
+        Open a cursor, optionally returning binary-format results.
+
+        In binary mode the fixed-width column types are loaded as raw bytes
+        (see results.register_raw_loaders) for ResultBuilder to decode in bulk.
+
+        Args:
+            name: name of a server-side cursor, None for a client-side cursor
+            binary: request binary-format results
+            withhold: keep a server-side cursor open after its transaction commits
+
+        Returns:
+            psycopg cursor
+        """
+        if name is None:
+            cur = self.conn.cursor(binary=binary)
+        else:
+            cur = self.conn.cursor(name=name, binary=binary, withhold=withhold)
+        if binary:
+            register_raw_loaders(cur)
+        return cur
+
+    def _build_result(self, builder: ResultBuilder, output: str, dtype_backend: str):
+        """
+        Materialize a ResultBuilder in the requested output format.
+
+        Args:
+            builder: builder holding the fetched rows
+            output: 'pandas' or 'arrow'
+            dtype_backend: 'numpy' or 'pyarrow'
+
+        Returns:
+            pandas DataFrame or pyarrow.Table
+        """
+        if output == "arrow":
+            return builder.to_arrow()
+        if dtype_backend == "pyarrow":
+            return builder.to_arrow().to_pandas(types_mapper=pd.ArrowDtype)
+        return builder.to_frame()
+
+    @_pooled
+    def export(
+        self,
+        query: str,
+        path: Optional[str] = None,
+        format: str = "csv",
+        chunksize: int = 100000,
+    ):
+        """
+        Export the result of a SELECT through COPY (...) TO STDOUT.
+
+        COPY streams the result in bulk and is several times faster than the
+        regular fetch path for large extracts.
+
+        Args:
+            query: a single SELECT statement
+            path: if given, the raw COPY output is written straight to this file
+                  (CSV files include a header row)
+            format: COPY format, 'csv', 'text' or 'binary'
+            chunksize: rows per yielded DataFrame when path is None
+
+        Returns:
+            path when writing to a file, otherwise an iterator of DataFrame chunks.
+            CSV chunks are parsed by pandas using the column types of the query
+            (int, float, bool and timestamps are typed, other types are strings);
+            text and binary chunks are parsed by psycopg and match query().
+        """
+        if format not in ("csv", "text", "binary"):
+            raise ValueError(f"Unsupported COPY format: {format}")
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be positive: {chunksize}")
+
+        statement = self._single_statement(query)
+        if path is not None:
+            self._export_to_file(statement, path, format)
+            return path
+        if format == "csv":
+            return self._export_csv_chunks(statement, chunksize)
+        return self._export_row_chunks(statement, format, chunksize)
+
+    def _export_to_file(self, statement: str, path: str, format: str) -> None:
+        """
+        Write the COPY output of a SELECT straight to a local file.
+
+        Args:
+            statement: a single SELECT statement
+            path: destination file
+            format: 'csv', 'text' or 'binary'
+        """
+        options = {"csv": " (FORMAT CSV, HEADER)", "text": "", "binary": " (FORMAT BINARY)"}
+        copy_query = f"COPY (\n{statement}\n) TO STDOUT{options[format]}"
+
+        with open(path, "wb") as f, self.conn.cursor() as cur:
+            try:
+                with cur.copy(copy_query) as copy:
+                    for block in self._join_copy_blocks(copy):
+                        f.write(block)
+
+                if self.auto_commit:
+                    self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    @_pooled
+    def _export_row_chunks(self, statement: str, format: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Stream COPY text/binary output into DataFrame chunks, parsed by psycopg.
+
+        Args:
+            statement: a single SELECT statement
+            format: 'text' or 'binary'
+            chunksize: rows per yielded DataFrame
+        """
+        description = self._describe_query(statement)
+        options = " (FORMAT BINARY)" if format == "binary" else ""
+        copy_query = f"COPY (\n{statement}\n) TO STDOUT{options}"
+
+        with self.conn.cursor() as cur:
+            try:
+                with cur.copy(copy_query) as copy:
+                    copy.set_types([desc.type_code for desc in description])
+
+                    rows = []
+                    for row in copy.rows():
+                        rows.append(row)
+                        if len(rows) == chunksize:
+                            yield self._rows_to_frame(description, rows)
+                            rows = []
+                    if rows:
+                        yield self._rows_to_frame(description, rows)
+
+                if self.auto_commit:
+                    self.conn.commit()
+            except GeneratorExit:
+                # The consumer stopped early; end the transaction like query_iter
+                if self.auto_commit:
+                    self.conn.commit()
+                raise
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    @_pooled
+    def _export_csv_chunks(self, statement: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Stream COPY CSV output into DataFrame chunks parsed with pandas.read_csv.
+
+        Record boundaries (newlines outside quotes) are located once per merged
+        block of COPY output, so each chunk is scanned and parsed exactly once.
+
+        Args:
+            statement: a single SELECT statement
+            chunksize: rows per yielded DataFrame
+        """
+        description = self._describe_query(statement)
+        copy_query = f"COPY (\n{statement}\n) TO STDOUT (FORMAT CSV, NULL '\\N')"
+
+        buf = bytearray()
+        ends = np.zeros(0, dtype=np.int64)
+        in_quotes = False
+
+        with self.conn.cursor() as cur:
+            try:
+                with cur.copy(copy_query) as copy:
+                    for block in self._join_copy_blocks(copy):
+                        block_ends, in_quotes = pgcopy.csv_record_ends(block, in_quotes)
+                        ends = np.concatenate([ends, block_ends + len(buf)])
+                        buf += block
+
+                        while len(ends) >= chunksize:
+                            cut = int(ends[chunksize - 1]) + 1
+                            yield self._parse_csv_chunk(description, bytes(buf[:cut]))
+                            del buf[:cut]
+                            ends = ends[chunksize:] - cut
+
+                    if buf:
+                        yield self._parse_csv_chunk(description, bytes(buf))
+
+                if self.auto_commit:
+                    self.conn.commit()
+            except GeneratorExit:
+                # The consumer stopped early; end the transaction like query_iter
+                if self.auto_commit:
+                    self.conn.commit()
+                raise
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def _join_copy_blocks(self, copy, min_bytes: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Merge the small COPY TO data blocks (usually one per row) into larger ones.
+
+        Args:
+            copy: psycopg Copy object of a COPY ... TO STDOUT
+            min_bytes: minimum size of each merged block (the last may be smaller)
+
+        Yields:
+            merged blocks of COPY output
+        """
+        pending = []
+        pending_bytes = 0
+        for data in copy:
+            pending.append(data)
+            pending_bytes += len(data)
+            if pending_bytes >= min_bytes:
+                yield b"".join(pending)
+                pending = []
+                pending_bytes = 0
+        if pending:
+            yield b"".join(pending)
+
+    def _describe_query(self, statement: str):
+        """
+        Get the result description of a SELECT without fetching any rows.
+
+        Args:
+            statement: a single SELECT statement
+
+        Returns:
+            cursor.description of the statement
+        """
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM (\n{statement}\n) AS q LIMIT 0")
+            return cur.description
+
+    def _single_statement(self, query: str) -> str:
+        """
+        Strip the comments around a single statement and its trailing semicolon.
+
+        Wrappers such as COPY (...) put the statement on its own lines, so a
+        trailing -- comment that is left inside it cannot swallow the closing
+        parenthesis.
+
+        Args:
+            query: one SQL statement, possibly with comments and a semicolon
+
+        Returns:
+            the statement; text that is not exactly one statement is returned
+            stripped, for the server to reject
+        """
+        statements = split_statements(query)
+        if len(statements) == 1:
+            return statements[0]
+        return query.strip()
+
+    def _rows_to_frame(self, description, rows: list) -> pd.DataFrame:
+        """
+        Build a typed DataFrame from row tuples via ResultBuilder.
+
+        Args:
+            description: cursor.description of the rows
+            rows: list of row tuples
+
+        Returns:
+            pandas DataFrame
+        """
+        builder = ResultBuilder(description, self.conn.info.timezone)
+        builder.append(rows)
+        return builder.to_frame()
+
+    def _parse_csv_chunk(self, description, data: bytes) -> pd.DataFrame:
+        """
+        Parse whole CSV records from COPY output into a typed DataFrame.
+
+        Args:
+            description: cursor.description of the exported query
+            data: CSV records written with NULL '\\N'
+
+        Returns:
+            pandas DataFrame with the same column names and order as the query
+        """
+        builder = ResultBuilder(description, self.conn.info.timezone)
+        dtypes = {
+            i: (np.float64 if kind == "float" else None if kind == "int" else str)
+            for i, kind in enumerate(builder.kinds)
+        }
+        df = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=list(range(len(builder.columns))),
+            dtype={i: dtype for i, dtype in dtypes.items() if dtype is not None},
+            na_values=["\\N"],
+            keep_default_na=False,
+        )
+
+        for i, kind in enumerate(builder.kinds):
+            col = df[i]
+            if kind == "bool":
+                col = col.map({"t": True, "f": False})
+                if col.isna().any():
+                    col = col.astype(object).where(col.notna(), None)
+                else:
+                    col = col.astype(bool)
+            elif kind == "datetime":
+                col = pd.to_datetime(col, format="ISO8601").dt.as_unit("us")
+            elif kind == "datetimetz":
+                col = pd.to_datetime(col, format="ISO8601", utc=True).dt.as_unit("us")
+                if builder.timezone is not None:
+                    col = col.dt.tz_convert(builder.timezone)
+            elif kind == "object":
+                col = col.astype(object).where(col.notna(), None)
+            df[i] = col
+
+        df.columns = builder.columns
+        return df
+
+    def _check_output(self, output: str, dtype_backend: str) -> None:
+        """
+        Validate the output options of query/query_iter.
+
+        Args:
+            output: 'pandas' or 'arrow'
+            dtype_backend: 'numpy' or 'pyarrow'
+        """
+        if output not in ("pandas", "arrow"):
+            raise ValueError(f"Unsupported output: {output}")
+        if dtype_backend not in ("numpy", "pyarrow"):
+            raise ValueError(f"Unsupported dtype_backend: {dtype_backend}")
+        if output == "arrow" or dtype_backend == "pyarrow":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("pyarrow is required for Arrow output: pip install pyarrow")
+
+    @_pooled
+    def insert_pg(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        overwrite: bool = False,
+        method: str = "insert",
+        pipeline: bool = False,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+        transaction: bool = False,
+        synchronous_commit: bool = True,
+    ) -> None:
+        """
+        將 pandas DataFrame 插入到 PostgreSQL 表格中
+        
+        Args:
+            df: 要插入的 pandas DataFrame
+            table_name: 目標表格名稱，格式可以是：
+                       - 'my_table' (使用預設 schema 'public')
+                       - 'my_schema.my_table' (指定 schema)
+            overwrite: 如果為 True，會刪除並重新創建表格
+            method: 數據傳輸方式：
+                   - 'insert': 以 executemany 分批執行 INSERT（預設）
+                   - 'copy': 以 COPY ... FROM STDIN 串流寫入，適合大量數據
+                   - 'binary': 以二進位格式 COPY，數值與日期時間列直接從 NumPy 陣列編碼
+                   - 'unnest': 每個批次以單一 INSERT ... SELECT * FROM unnest(...) 送出，
+                     每一列作為一個陣列參數（適用於限制 COPY 的連線池）
+            pipeline: 如果為 True，以 psycopg pipeline 模式送出各批次，每個批次只同步一次
+                      （適用於 'insert' 與 'unnest'）。psycopg 的 executemany 本身已在批次內以
+                      pipeline 送出各行，因此省下的主要是自動提交時每批次 COMMIT 的往返；
+                      transaction=True 或 'unnest'（每批次只有一條語句）時幾乎沒有差別
+            batch_size: 固定每批次的行數；未指定時自動決定
+            batch_bytes: 固定每批次的位元組預算（依列類型與抽樣的字串長度估算行數）；
+                         兩者皆未指定時，以預設預算起步並依每批次耗時自動調整
+            transaction: 如果為 True，建表/清空與所有批次在同一個交易中完成，
+                         只在最後提交一次；任何錯誤都會回滾整個載入
+            synchronous_commit: 設為 False 時以 SET LOCAL synchronous_commit = off
+                                執行該交易（需搭配 transaction=True）
+        """
+        if method not in ("insert", "copy", "binary", "unnest"):
+            raise ValueError(f"不支援的插入方式: {method}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size 必須大於 0: {batch_size}")
+        if batch_bytes is not None and batch_bytes < 1:
+            raise ValueError(f"batch_bytes 必須大於 0: {batch_bytes}")
+
+        if not synchronous_commit and not transaction:
+            raise ValueError("synchronous_commit=False 需要搭配 transaction=True")
+
+        if df.empty:
+            return
+
+        if not transaction:
+            full_table_name, pg_types = self._prepare_table(df, table_name, overwrite, method)
+
+            # 批量插入數據
+            try:
+                self._transfer_dataframe(
+                    df, full_table_name, pg_types, method, pipeline, batch_size, batch_bytes
+                )
+            finally:
+                self._invalidate_results(table_name)
+            return
+
+        # 暫停自動提交，讓 DDL 與所有批次留在同一個交易中；
+        # 只覆寫目前的狀態，thread_safe 時其他執行緒的 query 仍照常提交
+        self._state.auto_commit = False
+        try:
+            if not synchronous_commit:
+                self.query("SET LOCAL synchronous_commit = off")
+            full_table_name, pg_types = self._prepare_table(df, table_name, overwrite, method)
+            self._transfer_dataframe(
+                df, full_table_name, pg_types, method, pipeline, batch_size, batch_bytes
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            if self._catalog_cache is not None:
+                # 回滾可能撤銷了剛建立的 schema 或表格
+                self._catalog_cache.invalidate_schema(self._parse_table_name(table_name)[0])
+            raise
+        finally:
+            del self._state.auto_commit
+            self._invalidate_results(table_name)
+
+    def _invalidate_results(self, table_name: str) -> None:
+        """
+        使結果快取與磁碟快取中引用了表格的查詢結果失效（未啟用快取時不做任何事）
+        
+        Args:
+            table_name: 表格名稱（支援 'schema.table' 格式）
+        """
+        parsed_table_name = self._parse_table_name(table_name)[1]
+        if self.result_cache is not None:
+            self.result_cache.invalidate_table(parsed_table_name)
+        if self.disk_cache is not None:
+            self.disk_cache.invalidate_table(parsed_table_name)
+
+    @_pooled
+    def insert_pg_parallel(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        overwrite: bool = False,
+        method: str = "copy",
+        n_workers: int = 4,
+        atomic: bool = False,
+        pipeline: bool = False,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        將 DataFrame 切分為多個行區間，透過多個連線並行插入同一個表格
+        
+        建表/清空等 DDL 會先在本連線上執行並提交，之後每個工作執行緒使用自己的連線
+        載入一個分區並各自提交。
+        
+        Args:
+            df: 要插入的 pandas DataFrame
+            table_name: 目標表格名稱（支援 'schema.table' 格式）
+            overwrite: 如果為 True，會刪除並重新創建表格
+            method: 每個分區使用的數據傳輸方式，同 insert_pg
+            n_workers: 並行的連線數量
+            atomic: 如果為 True，先載入到暫存表格，全部成功後才在單一交易中
+                    以暫存表格取代目標表格；任何分區失敗時目標表格保持不變
+            pipeline: 同 insert_pg
+            batch_size: 同 insert_pg
+            batch_bytes: 同 insert_pg
+            
+        Returns:
+            每個工作執行緒的統計（worker, rows, seconds, rows_per_sec）
+        """
+        if method not in ("insert", "copy", "binary", "unnest"):
+            raise ValueError(f"不支援的插入方式: {method}")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size 必須大於 0: {batch_size}")
+        if batch_bytes is not None and batch_bytes < 1:
+            raise ValueError(f"batch_bytes 必須大於 0: {batch_bytes}")
+        if n_workers < 1:
+            raise ValueError(f"n_workers 必須大於 0: {n_workers}")
+
+        stats_columns = ["worker", "rows", "seconds", "rows_per_sec"]
+        if df.empty:
+            return pd.DataFrame(columns=stats_columns)
+
+        if not atomic:
+            full_table_name, pg_types = self._prepare_table(df, table_name, overwrite, method)
+            # 工作連線看不到本連線未提交的 DDL，且 TRUNCATE 的鎖會阻塞它們
+            self.conn.commit()
+            try:
+                stats = self._load_partitions(
+                    df, full_table_name, pg_types, method, n_workers, pipeline, batch_size, batch_bytes
+                )
+            finally:
+                self._invalidate_results(table_name)
+            return pd.DataFrame(stats, columns=stats_columns)
+
+        schema_name, parsed_table_name = self._parse_table_name(table_name)
+        if not self.schema_exists(schema_name):
+            self.create_schema(schema_name)
+
+        escaped_schema = self._escape_identifier(schema_name)
+        full_table_name = f"{escaped_schema}.{self._escape_identifier(parsed_table_name)}"
+        # 暫存表格名稱帶隨機後綴，並行的載入不會互相覆蓋，也不會刪除同名的使用者表格；
+        # 建表時不先 DROP，名稱衝突時直接失敗
+        staging_table_name = f"{parsed_table_name[:42]}_staging_{uuid.uuid4().hex[:12]}"
+        escaped_staging = self._escape_identifier(staging_table_name)
+        full_staging_name = f"{escaped_schema}.{escaped_staging}"
+
+        if self.table_exists(parsed_table_name, schema_name) and not overwrite:
+            # 沿用既有表格的結構（包含索引與約束）
+            self.query(f"CREATE TABLE {full_staging_name} (LIKE {full_table_name} INCLUDING ALL);")
+            if method == "binary":
+                pg_types = self._get_binary_copy_types(df, staging_table_name, schema_name)
+            elif method == "unnest":
+                column_types = self._query_uncached(
+                    COLUMN_TYPES_SQL, {"schema_name": schema_name, "table_name": staging_table_name}
+                )
+                pg_types = self._map_unnest_types(df, column_types, staging_table_name, schema_name)
+            else:
+                pg_types = self._get_pg_types(df)
+        else:
+            pg_types = self._get_pg_types(df)
+            columns = ", ".join([
+                f"{self._escape_identifier(col)} {pg_types[col]}"
+                for col in df.columns
+            ])
+            self.query(f"CREATE TABLE {full_staging_name} ({columns});")
+        self.conn.commit()
+
+        try:
+            stats = self._load_partitions(
+                df, full_staging_name, pg_types, method, n_workers, pipeline, batch_size, batch_bytes
+            )
+        except Exception:
+            self.query(f"DROP TABLE IF EXISTS {full_staging_name};")
+            raise
+
+        # 在單一交易中以暫存表格取代目標表格；失敗時（例如有檢視依賴目標表格）
+        # 回滾交易並刪除暫存表格，目標表格保持不變
+        try:
+            self.query(f"""
+                DROP TABLE IF EXISTS {full_table_name};
+                ALTER TABLE {full_staging_name} RENAME TO {self._escape_identifier(parsed_table_name)};
+            """)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            self.query(f"DROP TABLE IF EXISTS {full_staging_name};")
+            raise
+        finally:
+            self._invalidate_results(table_name)
+        return pd.DataFrame(stats, columns=stats_columns)
+
+    def _load_partitions(
+        self,
+        df: pd.DataFrame,
+        full_table_name: str,
+        pg_types: dict,
+        method: str,
+        n_workers: int,
+        pipeline: bool = False,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> list:
+        """
+        將 DataFrame 依行區間切分，並行載入到已準備好的表格
+        
+        Args:
+            df: 要插入的 DataFrame
+            full_table_name: 完整的表格名稱（包含 schema）
+            pg_types: 列名到 PostgreSQL 類型的映射
+            method: 數據傳輸方式
+            n_workers: 並行的連線數量
+            pipeline: 同 insert_pg
+            batch_size: 同 insert_pg
+            batch_bytes: 同 insert_pg
+            
+        Returns:
+            每個分區的統計字典列表，依分區順序排列
+        """
+        n_workers = min(n_workers, len(df))
+        bounds = np.linspace(0, len(df), n_workers + 1).astype(int)
+
+        def load(worker_id: int) -> dict:
+            part = df.iloc[bounds[worker_id] : bounds[worker_id + 1]]
+            worker = PG(
+                dbname=self.dbname,
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                **self._worker_options,
+            )
+            worker.auto_commit = True
+            start = time.perf_counter()
+            try:
+                worker._transfer_dataframe(
+                    part, full_table_name, pg_types, method, pipeline, batch_size, batch_bytes
+                )
+            finally:
+                worker.close()
+            seconds = time.perf_counter() - start
+            return {
+                "worker": worker_id,
+                "rows": len(part),
+                "seconds": seconds,
+                "rows_per_sec": len(part) / seconds if seconds > 0 else float("inf"),
+            }
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(load, range(n_workers)))
+
+    def _prepare_table(
+        self, df: pd.DataFrame, table_name: str, overwrite: bool, method: str
+    ) -> Tuple[str, Optional[dict]]:
+        """
+        確保 schema 與目標表格就緒（創建、覆蓋或清空），並決定傳輸時使用的類型映射
+        
+        Args:
+            df: 要插入的 DataFrame
+            table_name: 目標表格名稱（支援 'schema.table' 格式）
+            overwrite: 如果為 True，會刪除並重新創建表格
+            method: 數據傳輸方式
+            
+        Returns:
+            (完整表格名稱, 類型映射) 的元組；不需要類型映射的傳輸方式為 None
+        """
+        # 解析表格名稱
+        schema_name, parsed_table_name = self._parse_table_name(table_name)
+        
+        # 確保 schema 存在
+        if not self.schema_exists(schema_name):
+            self.create_schema(schema_name)
+
+        # 檢查表格是否存在
+        table_exists = self.table_exists(parsed_table_name, schema_name)
+        
+        # 構建完整的表格名稱
+        escaped_schema = self._escape_identifier(schema_name)
+        escaped_table = self._escape_identifier(parsed_table_name)
+        full_table_name = f"{escaped_schema}.{escaped_table}"
+
+        pg_types = None
+
+        # 處理表格創建/覆蓋邏輯
+        if table_exists and overwrite:
+            # 獲取列類型並重新創建表格
+            pg_types = self._get_pg_types(df)
+            columns = ", ".join([
+                f"{self._escape_identifier(col)} {pg_types[col]}" 
+                for col in df.columns
+            ])
+            
+            self.query(f"""
+                DROP TABLE IF EXISTS {full_table_name};
+                CREATE TABLE {full_table_name} ({columns});
+            """)
+            self._catalog_set(("table", schema_name, parsed_table_name), True)
+        elif not table_exists:
+            # 創建新表格
+            pg_types = self._get_pg_types(df)
+            columns = ", ".join([
+                f"{self._escape_identifier(col)} {pg_types[col]}" 
+                for col in df.columns
+            ])
+            self.query(f"CREATE TABLE {full_table_name} ({columns});")
+            self._catalog_set(("table", schema_name, parsed_table_name), True)
+        elif table_exists and not overwrite:
+            # 表格已存在且不覆蓋，則清空表格
+            if method == "binary":
+                # 沿用既有表格時，以實際的列類型決定編碼器；在清空之前檢查，
+                # 否則自動提交的 TRUNCATE 之後才發現不支援的類型或值會清空表格而沒有載入任何數據
+                pg_types = self._get_binary_copy_types(df, parsed_table_name, schema_name)
+                pgcopy.check_values(df, pg_types)
+            elif method == "unnest":
+                # 陣列參數依表格實際的列類型轉型；從 DataFrame 推斷的 VARCHAR 無法賦值給 date、uuid、jsonb 等列
+                column_types = self._query_uncached(
+                    COLUMN_TYPES_SQL, {"schema_name": schema_name, "table_name": parsed_table_name}
+                )
+                pg_types = self._map_unnest_types(df, column_types, parsed_table_name, schema_name)
+
+            self.query(f"TRUNCATE TABLE {full_table_name};")
+
+        return full_table_name, pg_types
+
+    def _transfer_dataframe(
+        self,
+        df: pd.DataFrame,
+        full_table_name: str,
+        pg_types: Optional[dict],
+        method: str,
+        pipeline: bool = False,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        依指定的傳輸方式把 DataFrame 寫入已準備好的表格
+        
+        Args:
+            df: 要插入的 DataFrame
+            full_table_name: 完整的表格名稱（包含 schema）
+            pg_types: 列名到 PostgreSQL 類型的映射（'binary' 與 'unnest' 需要）
+            method: 數據傳輸方式
+            pipeline: 同 insert_pg
+            batch_size: 同 insert_pg
+            batch_bytes: 同 insert_pg
+        """
+        batch_options = {"batch_size": batch_size, "batch_bytes": batch_bytes}
+        if method == "binary":
+            self._copy_dataframe_binary(df, full_table_name, pg_types, **batch_options)
+        elif method == "copy":
+            self._copy_dataframe(df, full_table_name, **batch_options)
+        elif method == "unnest":
+            self._insert_dataframe_unnest(
+                df, full_table_name, pg_types, pipeline=pipeline, **batch_options
+            )
+        else:
+            self._insert_dataframe_batch(df, full_table_name, pipeline=pipeline, **batch_options)
+
+    def _insert_dataframe_batch(
+        self,
+        df: pd.DataFrame,
+        full_table_name: str,
+        pipeline: bool = False,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        批量插入 DataFrame 數據到指定表格
+        
+        Args:
+            df: 要插入的 DataFrame
+            full_table_name: 完整的表格名稱（包含 schema）
+            pipeline: 如果為 True，在 pipeline 模式中送出所有批次，
+                      每個批次結束時只同步一次（提交或 sync）
+            batch_size: 固定每批次的行數
+            batch_bytes: 固定每批次的位元組預算
+        """
+        # 準備列名（轉義）
+        escaped_columns = [self._escape_identifier(col) for col in df.columns]
+        columns_str = ", ".join(escaped_columns)
+        
+        # 構建參數化查詢
+        placeholders = ", ".join(["%s" for _ in range(len(df.columns))])
+        insert_query = f"INSERT INTO {full_table_name} ({columns_str}) VALUES ({placeholders})"
+
+        with self.conn.pipeline() if pipeline else nullcontext() as p:
+            batches = self._iter_batches(df, batch_size, batch_bytes)
+            for batch_number, batch in enumerate(batches, start=1):
+                # 準備數據
+                values = self._prepare_rows(batch)
+
+                # 執行批量插入
+                with self.conn.cursor() as cur:
+                    try:
+                        # 使用 executemany 進行批量插入（更高效）
+                        cur.executemany(insert_query, values)
+
+                        # 在 pipeline 模式中，提交本身就會同步；不提交時手動同步一次
+                        if self.auto_commit:
+                            self.conn.commit()
+                        elif p is not None:
+                            p.sync()
+                    except Exception as e:
+                        self.conn.rollback()
+                        raise Exception(f"Error inserting batch {batch_number}: {str(e)}")
+
+    def _insert_dataframe_unnest(
+        self,
+        df: pd.DataFrame,
+        full_table_name: str,
+        pg_types: dict,
+        pipeline: bool = False,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        以 INSERT ... SELECT * FROM unnest(...) 批量插入 DataFrame
+        
+        每個批次只執行一條語句，每一列作為一個陣列參數傳送，
+        並依 pg_types 轉型為對應的陣列類型。
+        
+        Args:
+            df: 要插入的 DataFrame
+            full_table_name: 完整的表格名稱（包含 schema）
+            pg_types: 列名到 PostgreSQL 類型的映射，用於陣列參數的轉型
+            pipeline: 如果為 True，在 pipeline 模式中送出所有批次
+            batch_size: 固定每批次的行數
+            batch_bytes: 固定每批次的位元組預算
+        """
+        escaped_columns = [self._escape_identifier(col) for col in df.columns]
+        columns_str = ", ".join(escaped_columns)
+        arrays = ", ".join([f"%s::{pg_types[col]}[]" for col in df.columns])
+        insert_query = f"INSERT INTO {full_table_name} ({columns_str}) SELECT * FROM unnest({arrays})"
+
+        with self.conn.pipeline() if pipeline else nullcontext() as p:
+            batches = self._iter_batches(df, batch_size, batch_bytes)
+            for batch_number, batch in enumerate(batches, start=1):
+                params = [values.tolist() for values in self._prepare_columns(batch)]
+
+                with self.conn.cursor() as cur:
+                    try:
+                        cur.execute(insert_query, params)
+
+                        if self.auto_commit:
+                            self.conn.commit()
+                        elif p is not None:
+                            p.sync()
+                    except Exception as e:
+                        self.conn.rollback()
+                        raise Exception(f"Error inserting batch {batch_number}: {str(e)}")
+
+    def _copy_dataframe(
+        self,
+        df: pd.DataFrame,
+        full_table_name: str,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        使用 COPY ... FROM STDIN 將 DataFrame 串流寫入指定表格
+        
+        整個 DataFrame 在同一個 COPY 操作中傳輸，只需一次往返與一次提交。
+        
+        Args:
+            df: 要插入的 DataFrame
+            full_table_name: 完整的表格名稱（包含 schema）
+            batch_size: 固定每次準備數據的行數
+            batch_bytes: 固定每次準備數據的位元組預算
+        """
+        escaped_columns = [self._escape_identifier(col) for col in df.columns]
+        columns_str = ", ".join(escaped_columns)
+        copy_query = f"COPY {full_table_name} ({columns_str}) FROM STDIN"
+
+        with self.conn.cursor() as cur:
+            try:
+                with cur.copy(copy_query) as copy:
+                    for batch in self._iter_batches(df, batch_size, batch_bytes):
+                        for row in self._prepare_rows(batch):
+                            copy.write_row(row)
+
+                if self.auto_commit:
+                    self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                raise Exception(f"Error copying data into {full_table_name}: {str(e)}")
+
+    def _copy_dataframe_binary(
+        self,
+        df: pd.DataFrame,
+        full_table_name: str,
+        pg_types: dict,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        使用二進位格式的 COPY 將 DataFrame 寫入指定表格
+        
+        Args:
+            df: 要插入的 DataFrame
+            full_table_name: 完整的表格名稱（包含 schema）
+            pg_types: 列名到 PostgreSQL 類型的映射，決定每一列使用的編碼器
+            batch_size: 固定每次編碼的行數
+            batch_bytes: 固定每次編碼的位元組預算
+        """
+        escaped_columns = [self._escape_identifier(col) for col in df.columns]
+        columns_str = ", ".join(escaped_columns)
+        copy_query = f"COPY {full_table_name} ({columns_str}) FROM STDIN (FORMAT BINARY)"
+
+        with self.conn.cursor() as cur:
+            try:
+                with cur.copy(copy_query) as copy:
+                    copy.write(pgcopy.PGCOPY_HEADER)
+                    for batch in self._iter_batches(df, batch_size, batch_bytes):
+                        copy.write(pgcopy.encode_rows(batch, pg_types))
+                    copy.write(pgcopy.PGCOPY_TRAILER)
+
+                if self.auto_commit:
+                    self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                raise Exception(f"Error copying data into {full_table_name}: {str(e)}")
+
+    def _get_binary_copy_types(
+        self, df: pd.DataFrame, table_name: str, schema_name: str
+    ) -> dict:
+        """
+        讀取既有表格的列類型，轉換為二進位 COPY 編碼器使用的類型名稱
+        
+        Args:
+            df: 要插入的 DataFrame
+            table_name: 表格名稱
+            schema_name: schema 名稱
+            
+        Returns:
+            列名到 PostgreSQL 類型的字典映射
+        """
+        table_info = self.describe_table(table_name, schema_name)
+        return self._map_binary_copy_types(df, table_info, table_name, schema_name)
+
+    def _map_binary_copy_types(
+        self, df: pd.DataFrame, table_info: pd.DataFrame, table_name: str, schema_name: str
+    ) -> dict:
+        """
+        把 describe_table 的結果轉換為二進位 COPY 編碼器使用的類型名稱
+        
+        Args:
+            df: 要插入的 DataFrame
+            table_info: describe_table 回傳的 DataFrame
+            table_name: 表格名稱（用於錯誤訊息）
+            schema_name: schema 名稱（用於錯誤訊息）
+            
+        Returns:
+            列名到 PostgreSQL 類型的字典映射
+        """
+        column_types = dict(zip(table_info["column_name"], table_info["data_type"]))
+
+        pg_types = {}
+        for col in df.columns:
+            if col not in column_types:
+                raise ValueError(f"表格 {schema_name}.{table_name} 中不存在列: {col}")
+            pg_type = pgcopy.PG_TYPE_NAMES.get(column_types[col])
+            if pg_type is None:
+                raise ValueError(
+                    f"列 {col} 的類型 {column_types[col]} 不支援二進位 COPY，請改用 method='copy'"
+                )
+            pg_types[col] = pg_type
+        return pg_types
+
+    def _map_unnest_types(
+        self, df: pd.DataFrame, column_types: pd.DataFrame, table_name: str, schema_name: str
+    ) -> dict:
+        """
+        把 COLUMN_TYPES_SQL 的結果轉換為 unnest 陣列參數轉型使用的類型映射
+        
+        Args:
+            df: 要插入的 DataFrame
+            column_types: COLUMN_TYPES_SQL 回傳的 DataFrame
+            table_name: 表格名稱（用於錯誤訊息）
+            schema_name: schema 名稱（用於錯誤訊息）
+            
+        Returns:
+            列名到 PostgreSQL 類型的字典映射
+        """
+        types = dict(zip(column_types["column_name"], column_types["column_type"]))
+
+        pg_types = {}
+        for col in df.columns:
+            if col not in types:
+                raise ValueError(f"表格 {schema_name}.{table_name} 中不存在列: {col}")
+            pg_types[col] = types[col]
+        return pg_types
+
+    def _iter_batches(
+        self,
+        df: pd.DataFrame,
+        batch_size: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+    ):
+        """
+        將 DataFrame 切分為批次
+        
+        - 指定 batch_size：固定行數
+        - 指定 batch_bytes：依估算的每行大小換算為固定行數（至少 1 行）
+        - 皆未指定：以 DEFAULT_BATCH_BYTES 換算的行數起步，之後依每批次的處理耗時
+          （兩次 yield 之間的時間）向 TARGET_BATCH_SECONDS 調整
+        
+        Args:
+            df: 要切分的 DataFrame
+            batch_size: 固定每批次的行數
+            batch_bytes: 固定每批次的位元組預算
+            
+        Yields:
+            DataFrame 的連續行區間
+        """
+        total_rows = len(df)
+        adaptive = batch_size is None and batch_bytes is None
+
+        if batch_size is None:
+            row_bytes = self._estimate_row_bytes(df)
+            if adaptive:
+                batch_size = DEFAULT_BATCH_BYTES // row_bytes
+                batch_size = min(max(batch_size, MIN_BATCH_ROWS), MAX_BATCH_ROWS)
+            else:
+                # 指定的位元組預算照實換算，不套用自適應模式的行數上下限
+                batch_size = max(batch_bytes // row_bytes, 1)
+
+        i = 0
+        while i < total_rows:
+            batch = df.iloc[i : i + batch_size]
+            start = time.perf_counter()
+            yield batch
+            elapsed = time.perf_counter() - start
+            i += len(batch)
+
+            if adaptive and elapsed > 0:
+                # 每次最多放大或縮小一倍，避免單一慢批次造成劇烈震盪
+                scale = min(max(TARGET_BATCH_SECONDS / elapsed, 0.5), 2.0)
+                batch_size = min(max(int(batch_size * scale), MIN_BATCH_ROWS), MAX_BATCH_ROWS)
+
+    def _estimate_row_bytes(self, df: pd.DataFrame, sample_size: int = 1000) -> int:
+        """
+        估算 DataFrame 每一行的傳輸大小
+        
+        固定寬度的列使用 dtype 的大小，文字等 object 列則以均勻抽樣的字串長度估算。
+        
+        Args:
+            df: 要估算的 DataFrame
+            sample_size: 每一列最多抽樣的值數量
+            
+        Returns:
+            每行的估算位元組數（至少為 1）
+        """
+        total_rows = len(df)
+        sample_index = np.unique(np.linspace(0, total_rows - 1, min(total_rows, sample_size)).astype(int))
+
+        row_bytes = 0
+        for col, dtype in df.dtypes.items():
+            # 每個欄位另有約 4 位元組的長度/分隔開銷
+            row_bytes += 4
+            if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+                row_bytes += dtype.itemsize
+            else:
+                sample = df[col].iloc[sample_index].dropna()
+                if len(sample):
+                    row_bytes += int(sample.astype(str).str.len().mean())
+
+        return max(row_bytes, 1)
+
+    def _prepare_rows(self, df: pd.DataFrame) -> list:
+        """
+        將 DataFrame 轉換為可傳給 psycopg 的值元組列表，缺失值轉換為 None
+        
+        以列為單位向量化處理，最後再把各列 zip 成行，避免逐格呼叫 pd.isna()。
+        
+        Args:
+            df: 要轉換的 DataFrame
+            
+        Returns:
+            每一行的值元組列表
+        """
+        return list(zip(*self._prepare_columns(df)))
+
+    def _prepare_columns(self, df: pd.DataFrame) -> list:
+        """
+        將 DataFrame 的每一列轉換為 object 陣列，缺失值轉換為 None
+        
+        每一列只計算一次缺失值遮罩並一次轉為 object 陣列。
+        
+        Args:
+            df: 要轉換的 DataFrame
+            
+        Returns:
+            與 df.columns 順序相同的 object 陣列列表
+        """
+        columns = []
+        for col in df.columns:
+            series = df[col]
+            values = series.to_numpy(dtype=object)
+            mask = series.isna().to_numpy(dtype=bool)
+            if mask.any():
+                # object 列的 to_numpy 可能回傳原始陣列，先複製以免改動呼叫者的 DataFrame
+                values = values.copy()
+                values[mask] = None
+            columns.append(values)
+        return columns
+
+    def _get_pg_types(self, df: pd.DataFrame) -> dict:
+        """
+        將 pandas DataFrame 的數據類型映射到 PostgreSQL 數據類型
+        
+        Args:
+            df: pandas DataFrame
+            
+        Returns:
+            列名到 PostgreSQL 數據類型的字典映射
+        """
+        pg_types = {}
+
+        for col, dtype in df.dtypes.items():
+            if pd.api.types.is_integer_dtype(dtype):
+                # 根據整數大小選擇適當的類型
+                if df[col].min() >= -2147483648 and df[col].max() <= 2147483647:
+                    pg_types[col] = "INTEGER"
+                else:
+                    pg_types[col] = "BIGINT"
+            elif pd.api.types.is_float_dtype(dtype):
+                pg_types[col] = "DOUBLE PRECISION"
+            elif pd.api.types.is_bool_dtype(dtype):
+                pg_types[col] = "BOOLEAN"
             elif pd.api.types.is_datetime64_dtype(dtype):
                 pg_types[col] = "TIMESTAMP"
             elif isinstance(dtype, pd.DatetimeTZDtype):
@@ -433,8 +2253,20 @@ class PG:
     # === 原有功能保持不變 ===
     
     def close(self):
+        if self._thread_safe and self._pool is None:
+            # 關閉所有執行緒建立的連線
+            with self._thread_conns_lock:
+                conns, self._thread_conns = self._thread_conns, []
+            for conn in conns:
+                conn.close()
         if self._conn:
-            self._conn.close()
+            if self._pool is not None:
+                # 連線池模式：結束未完成的交易後歸還連線，而不是關閉連線
+                if not self._conn.closed:
+                    self._conn.rollback()
+                self._release()
+            else:
+                self._conn.close()
             self._conn = None
 
     def __del__(self):
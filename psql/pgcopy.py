@@ -0,0 +1,245 @@
+"""
+PostgreSQL COPY 數據格式的工具
+
+- 二進位 (PGCOPY) 編碼：數值、布林與日期時間列直接從 NumPy 陣列批次編碼
+  （轉為大端序並依 isna() 遮罩處理 NULL），只有文字列需要逐值編碼。
+- CSV 串流切分：在 COPY TO 的輸出區塊中找出記錄邊界，以便分段解析。
+"""
+import struct
+
+import numpy as np
+import pandas as pd
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
+
+# PostgreSQL 的時間戳以 2000-01-01 為起點，單位為微秒
+PG_EPOCH_US = 946684800000000
+
+# 固定寬度類型對應的大端序 NumPy dtype
+FIXED_WIDTH_TYPES = {
+    "SMALLINT": ">i2",
+    "INTEGER": ">i4",
+    "BIGINT": ">i8",
+    "REAL": ">f4",
+    "DOUBLE PRECISION": ">f8",
+    "BOOLEAN": "u1",
+    "TIMESTAMP": ">i8",
+    "TIMESTAMP WITH TIME ZONE": ">i8",
+}
+
+# information_schema.columns.data_type 到 _get_pg_types 類型名稱的對應
+PG_TYPE_NAMES = {
+    "smallint": "SMALLINT",
+    "integer": "INTEGER",
+    "bigint": "BIGINT",
+    "real": "REAL",
+    "double precision": "DOUBLE PRECISION",
+    "boolean": "BOOLEAN",
+    "timestamp without time zone": "TIMESTAMP",
+    "timestamp with time zone": "TIMESTAMP WITH TIME ZONE",
+    "text": "TEXT",
+    "character varying": "TEXT",
+    "character": "TEXT",
+}
+
+
+def encode_rows(df: pd.DataFrame, pg_types: dict) -> bytes:
+    """
+    將 DataFrame 編碼為 PGCOPY 的數據行（不含檔頭與結尾）
+
+    Args:
+        df: 要編碼的 DataFrame
+        pg_types: 列名到 PostgreSQL 類型的映射，決定每一列使用的編碼器
+
+    Returns:
+        可直接寫入 COPY ... FROM STDIN (FORMAT BINARY) 的位元組
+    """
+    n_rows = len(df)
+    if n_rows == 0:
+        return b""
+
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        mask = series.isna().to_numpy(dtype=bool)
+        pg_type = pg_types[col].upper()
+        if pg_type in FIXED_WIDTH_TYPES:
+            columns.append(_encode_fixed_width(series, mask, pg_type))
+        elif _is_text_type(pg_type):
+            columns.append(_encode_text(series, mask))
+        else:
+            raise ValueError(f"列 {col} 的類型 {pg_type} 不支援二進位 COPY")
+
+    # 每個欄位佔用 4 位元組長度 + 數據（NULL 只有長度 -1）
+    row_sizes = np.full(n_rows, 2, dtype=np.int64)
+    for lengths, _ in columns:
+        row_sizes += 4 + np.maximum(lengths, 0)
+    row_offsets = np.zeros(n_rows, dtype=np.int64)
+    np.cumsum(row_sizes[:-1], out=row_offsets[1:])
+
+    buf = np.empty(int(row_sizes.sum()), dtype=np.uint8)
+    field_counts = np.full(n_rows, len(columns), dtype=">i2")
+    _scatter(buf, row_offsets, field_counts.view(np.uint8).reshape(n_rows, 2))
+
+    field_offsets = row_offsets + 2
+    for lengths, write_data in columns:
+        length_bytes = lengths.astype(">i4").view(np.uint8).reshape(n_rows, 4)
+        _scatter(buf, field_offsets, length_bytes)
+        write_data(buf, field_offsets + 4)
+        field_offsets = field_offsets + 4 + np.maximum(lengths, 0)
+
+    return buf.tobytes()
+
+
+def _is_text_type(pg_type: str) -> bool:
+    return pg_type == "TEXT" or pg_type.startswith("VARCHAR")
+
+
+def _scatter(buf: np.ndarray, offsets: np.ndarray, block: np.ndarray) -> None:
+    """把每一行的固定寬度位元組區塊寫入 buf 中對應的位置"""
+    if len(offsets):
+        buf[offsets[:, None] + np.arange(block.shape[1])] = block
+
+
+def _encode_fixed_width(series: pd.Series, mask: np.ndarray, pg_type: str):
+    """
+    從 NumPy 陣列批次編碼固定寬度的列
+
+    Returns:
+        (每行數據長度的陣列, 寫入函數) 的元組，NULL 的長度為 -1
+    """
+    be_dtype = np.dtype(FIXED_WIDTH_TYPES[pg_type])
+    if pg_type in ("TIMESTAMP", "TIMESTAMP WITH TIME ZONE"):
+        ts = pd.to_datetime(series)
+        if ts.dt.tz is not None:
+            ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+        micros = ts.to_numpy(dtype="datetime64[us]").view(np.int64)
+        values = np.where(mask, 0, micros - PG_EPOCH_US)
+    elif pg_type == "BOOLEAN":
+        values = series.to_numpy(dtype=bool, na_value=False)
+    elif pg_type in ("REAL", "DOUBLE PRECISION"):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        values = _integer_values(series, mask, pg_type)
+
+    data = values.astype(be_dtype).view(np.uint8).reshape(len(series), be_dtype.itemsize)
+    lengths = np.where(mask, -1, be_dtype.itemsize)
+    valid = ~mask
+
+    def write_data(buf, offsets):
+        _scatter(buf, offsets[valid], data[valid])
+
+    return lengths, write_data
+
+
+def _integer_values(series: pd.Series, mask: np.ndarray, pg_type: str) -> np.ndarray:
+    """
+    把整數列轉為 int64 陣列，並確認每個值都能無損地寫入目標寬度
+
+    直接 astype 會把 1.7 截斷為 1、把超出範圍的值回繞為其他數字，
+    因此遇到非整數或超出範圍的值時拋出 ValueError（與文字 COPY 或 INSERT 的行為一致）。
+
+    Returns:
+        int64 陣列，NULL 的位置為 0
+    """
+    if series.dtype == object:
+        series = pd.to_numeric(series)
+    info = np.iinfo(np.dtype(FIXED_WIDTH_TYPES[pg_type]))
+    valid = ~mask
+
+    if series.dtype.kind == "f":
+        floats = series.to_numpy(dtype=np.float64, na_value=0)
+        bad = valid & (~np.isfinite(floats) | (floats != np.trunc(floats)))
+        if bad.any():
+            raise ValueError(f"列 {series.name} 的值 {floats[bad][0]} 不是整數，無法寫入 {pg_type}")
+        # info.max 轉為浮點數時可能進位（BIGINT），因此以 2 的次方作為上界
+        bad = valid & ((floats < info.min) | (floats >= 2.0 ** (info.bits - 1)))
+        if bad.any():
+            raise ValueError(f"列 {series.name} 的值 {floats[bad][0]} 超出 {pg_type} 的範圍")
+        return floats.astype(np.int64)
+
+    if series.dtype.kind == "u":
+        unsigned = series.to_numpy(dtype=np.uint64, na_value=0)
+        bad = valid & (unsigned > info.max)
+        if bad.any():
+            raise ValueError(f"列 {series.name} 的值 {unsigned[bad][0]} 超出 {pg_type} 的範圍")
+        return unsigned.astype(np.int64)
+
+    values = series.to_numpy(dtype=np.int64, na_value=0)
+    bad = valid & ((values < info.min) | (values > info.max))
+    if bad.any():
+        raise ValueError(f"列 {series.name} 的值 {values[bad][0]} 超出 {pg_type} 的範圍")
+    return values
+
+
+def check_values(df: pd.DataFrame, pg_types: dict) -> None:
+    """
+    在寫入任何數據之前確認整數列的值都能以對應的類型編碼
+
+    Args:
+        df: 要編碼的 DataFrame
+        pg_types: 列名到 PostgreSQL 類型的映射
+
+    Raises:
+        ValueError: 整數列包含非整數或超出範圍的值
+    """
+    for col in df.columns:
+        pg_type = pg_types[col].upper()
+        if pg_type in ("SMALLINT", "INTEGER", "BIGINT"):
+            series = df[col]
+            _integer_values(series, series.isna().to_numpy(dtype=bool), pg_type)
+
+
+def _encode_text(series: pd.Series, mask: np.ndarray):
+    """
+    逐值將文字列編碼為 UTF-8（二進位格式的 text/varchar 即為原始位元組）
+
+    Returns:
+        (每行數據長度的陣列, 寫入函數) 的元組，NULL 的長度為 -1
+    """
+    encoded = [
+        str(val).encode("utf-8")
+        for val, is_null in zip(series.to_numpy(dtype=object), mask)
+        if not is_null
+    ]
+    valid_lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    lengths = np.full(len(series), -1, dtype=np.int64)
+    lengths[~mask] = valid_lengths
+    payload = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    valid = ~mask
+
+    def write_data(buf, offsets):
+        if not len(payload):
+            return
+        # 每個位元組的目標位置 = 所屬欄位的起點 + 在該欄位內的位移
+        starts = offsets[valid]
+        value_starts = np.zeros(len(valid_lengths), dtype=np.int64)
+        np.cumsum(valid_lengths[:-1], out=value_starts[1:])
+        positions = np.repeat(starts - value_starts, valid_lengths) + np.arange(len(payload))
+        buf[positions] = payload
+
+    return lengths, write_data
+
+
+def csv_record_ends(block, in_quotes: bool = False):
+    """
+    找出 CSV 區塊中結束一筆記錄的換行位置
+
+    引號內的換行屬於欄位內容；跳脫的引號是成對出現的 ""，不影響引號的奇偶性，
+    因此只要計算每個位置之前的引號數量即可判斷是否在引號內。
+
+    Args:
+        block: COPY ... TO STDOUT (FORMAT CSV) 輸出的一段位元組
+        in_quotes: 區塊開始時是否位於引號內（上一個區塊的結果）
+
+    Returns:
+        (記錄結尾換行的位置陣列, 區塊結束時是否位於引號內) 的元組
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    if not len(data):
+        return np.zeros(0, dtype=np.int64), in_quotes
+
+    quoted = (np.cumsum(data == ord('"')) + int(in_quotes)) % 2 == 1
+    ends = np.flatnonzero((data == ord("\n")) & ~quoted)
+    return ends, bool(quoted[-1])
@@ -0,0 +1,122 @@
+"""
+同一 DSN 的 PG 實例共用的連線池
+
+以 psycopg_pool.ConnectionPool 實作（選用依賴，pip install psql[pool]）。
+連線池依 conninfo 建立並快取在模組中，第一個建立者的大小與逾時設定會被沿用。
+AsyncPG 使用的 AsyncConnectionPool 綁定事件迴圈，因此依 (conninfo, 事件迴圈) 快取。
+"""
+import asyncio
+import atexit
+import threading
+
+_pools = {}
+_lock = threading.Lock()
+_async_pools = {}
+
+
+def get_pool(
+    conninfo: str,
+    min_size: int = 1,
+    max_size: int = 10,
+    max_idle: float = 600.0,
+    max_lifetime: float = 3600.0,
+):
+    """
+    取得 conninfo 對應的共用連線池，不存在時建立
+
+    借出連線前會以 ConnectionPool.check_connection 檢查連線是否仍可用，
+    失效的連線會被丟棄並換成新的連線。
+
+    Args:
+        conninfo: 連線字串
+        min_size: 連線池保持的最少連線數
+        max_size: 連線池的最大連線數
+        max_idle: 閒置超過此秒數的多餘連線會被關閉
+        max_lifetime: 連線存活超過此秒數後會在歸還時被替換
+
+    Returns:
+        psycopg_pool.ConnectionPool
+    """
+    with _lock:
+        pool = _pools.get(conninfo)
+        if pool is None or pool.closed:
+            try:
+                from psycopg_pool import ConnectionPool
+            except ImportError as e:
+                raise ImportError(
+                    "pool=True requires psycopg_pool; install it with `pip install psycopg-pool`"
+                ) from e
+
+            pool = ConnectionPool(
+                conninfo,
+                min_size=min_size,
+                max_size=max_size,
+                max_idle=max_idle,
+                max_lifetime=max_lifetime,
+                check=ConnectionPool.check_connection,
+                open=True,
+            )
+            _pools[conninfo] = pool
+        return pool
+
+
+async def get_async_pool(
+    conninfo: str,
+    min_size: int = 1,
+    max_size: int = 10,
+    max_idle: float = 600.0,
+    max_lifetime: float = 3600.0,
+):
+    """
+    取得目前事件迴圈中 conninfo 對應的共用非同步連線池，不存在時建立並開啟
+
+    參數同 get_pool。
+
+    Returns:
+        psycopg_pool.AsyncConnectionPool
+    """
+    loop = asyncio.get_running_loop()
+
+    # 丟棄已關閉的事件迴圈留下的連線池
+    for key in [key for key in _async_pools if key[1].is_closed()]:
+        del _async_pools[key]
+
+    pool = _async_pools.get((conninfo, loop))
+    if pool is None or pool.closed:
+        try:
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise ImportError(
+                "pool=True requires psycopg_pool; install it with `pip install psycopg-pool`"
+            ) from e
+
+        pool = AsyncConnectionPool(
+            conninfo,
+            min_size=min_size,
+            max_size=max_size,
+            max_idle=max_idle,
+            max_lifetime=max_lifetime,
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        _async_pools[(conninfo, loop)] = pool
+        await pool.open()
+    return pool
+
+
+async def close_async_pools() -> None:
+    """關閉目前事件迴圈中的所有共用非同步連線池"""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _async_pools if key[1] is loop]:
+        await _async_pools.pop(key).close()
+
+
+def close_pools() -> None:
+    """關閉所有共用連線池"""
+    with _lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+atexit.register(close_pools)
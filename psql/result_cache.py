@@ -0,0 +1,236 @@
+"""
+PG.query 結果的進程內快取
+
+以正規化的 SQL、參數與輸出選項為鍵，快取唯讀查詢的結果；紀錄依 TTL 過期，
+總大小（位元組）超過上限時淘汰最久未使用的紀錄。同一 PG 實例經由 query 執行的
+DML / DDL 以及 insert_pg 會使引用了目標表格的紀錄失效。
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from psql.catalog import MISSING, _NAME, _split_name
+
+# 字串常值、引號識別符或空白；正規化時只壓縮引號外的空白
+_TOKEN_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+_IDENTIFIER_RE = re.compile(r'"((?:[^"]|"")+)"|([A-Za-z_][A-Za-z0-9_$]*)')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+_READ_RE = re.compile(r"^\s*(?:SELECT|WITH|VALUES|TABLE)\b", re.IGNORECASE)
+# 不改變任何表格內容的語句
+_NEUTRAL_RE = re.compile(
+    r"^\s*(?:SELECT|WITH|VALUES|TABLE|SHOW|EXPLAIN|SET|RESET|BEGIN|START|COMMIT|END|ROLLBACK"
+    r"|SAVEPOINT|RELEASE|ANALYZE|VACUUM|LISTEN|UNLISTEN|NOTIFY)\b",
+    re.IGNORECASE,
+)
+# 出現在讀取語句中即代表可能寫入（資料修改 CTE、SELECT INTO、FOR UPDATE、EXPLAIN ANALYZE 等）
+_WRITE_KEYWORD_RE = re.compile(r"\b(?:INSERT|UPDATE|DELETE|MERGE|TRUNCATE|INTO)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(
+    r"^\s*(?:INSERT\s+INTO|UPDATE(?:\s+ONLY)?|DELETE\s+FROM(?:\s+ONLY)?|MERGE\s+INTO"
+    r"|TRUNCATE(?:\s+TABLE)?(?:\s+ONLY)?|COPY"
+    r"|(?:CREATE(?:\s+OR\s+REPLACE)?(?:\s+(?:GLOBAL|LOCAL))?(?:\s+(?:TEMP|TEMPORARY|UNLOGGED))?|DROP|ALTER)"
+    r"\s+(?:TABLE|VIEW|MATERIALIZED\s+VIEW|FOREIGN\s+TABLE)(?:\s+IF(?:\s+NOT)?\s+EXISTS)?(?:\s+ONLY)?)"
+    rf"\s+{_NAME}(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    正規化 SQL 作為快取鍵：壓縮引號外的連續空白並去除結尾的分號
+
+    Args:
+        sql: SQL 語句
+
+    Returns:
+        正規化後的 SQL
+    """
+    sql = _TOKEN_RE.sub(lambda m: m.group(1) or " ", sql)
+    return sql.strip().rstrip(";").strip()
+
+
+def is_cacheable(sql: str) -> bool:
+    """判斷語句是否為可快取的唯讀查詢"""
+    return bool(_READ_RE.match(sql)) and not _WRITE_KEYWORD_RE.search(_STRING_RE.sub("''", sql))
+
+
+def referenced_names(sql: str) -> frozenset:
+    """
+    取出 SQL 中所有識別符（轉為小寫），作為失效比對時可能引用的表格名稱
+
+    刻意涵蓋所有識別符而不只 FROM / JOIN 之後的名稱，並且不分大小寫，
+    寧可多失效也不漏掉子查詢或 CTE 中的表格。
+    """
+    sql = _STRING_RE.sub("''", sql)
+    return frozenset(
+        (quoted.replace('""', '"') or bare).lower()
+        for quoted, bare in _IDENTIFIER_RE.findall(sql)
+    )
+
+
+def written_tables(statements: list):
+    """
+    找出語句可能寫入的表格名稱
+
+    能辨識目標表格的 DML / DDL 只回傳該表格的名稱（小寫，不含 schema）；
+    其他可能寫入的語句（CALL、DO、SELECT INTO、CASCADE、一次處理多個表格等）無法判斷範圍。
+
+    Args:
+        statements: 已執行的語句列表
+
+    Returns:
+        表格名稱的 frozenset；無法判斷範圍時為 None，代表所有紀錄都應失效
+    """
+    names = set()
+    for statement in statements:
+        if _NEUTRAL_RE.match(statement) and not _WRITE_KEYWORD_RE.search(_STRING_RE.sub("''", statement)):
+            continue
+
+        match = _WRITE_RE.match(statement)
+        if match:
+            name, rest = match.groups()
+            # CASCADE 會連帶刪除或修改依賴的檢視，無法只比對名稱
+            if not rest.strip().startswith(",") and not re.search(r"\bCASCADE\b", rest, re.IGNORECASE):
+                names.add(_split_name(name)[1].lower())
+                continue
+
+        return None
+    return frozenset(names)
+
+
+def _result_bytes(result: Any) -> int:
+    """估算 DataFrame 或 pyarrow.Table 占用的位元組數"""
+    if hasattr(result, "memory_usage"):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    return int(result.nbytes)
+
+
+def _copy_result(result: Any) -> Any:
+    """複製 DataFrame，避免呼叫端修改快取中的結果；pyarrow.Table 不可變，直接共用"""
+    if hasattr(result, "memory_usage"):
+        return result.copy(deep=True)
+    return result
+
+
+class ResultCache:
+    """
+    以最近使用順序淘汰、總大小有上限的查詢結果快取
+
+    hits / misses / evictions 分別記錄命中、未命中（含過期）與因大小上限被淘汰的次數。
+    """
+
+    def __init__(self, ttl: float, max_bytes: int):
+        """
+        Args:
+            ttl: 紀錄的有效秒數
+            max_bytes: 所有紀錄的大小上限（位元組），超過單一上限的結果不會被快取
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Any:
+        """
+        讀取快取的結果
+
+        Args:
+            key: 紀錄的鍵
+
+        Returns:
+            結果的副本；不存在或已過期時為 MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[3] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[0]
+        return _copy_result(result)
+
+    def set(self, key: tuple, result: Any, sql: str) -> None:
+        """
+        寫入查詢結果，必要時淘汰最久未使用的紀錄
+
+        Args:
+            key: 紀錄的鍵
+            result: 查詢結果（DataFrame 或 pyarrow.Table）
+            sql: 產生結果的語句，用於記錄引用的表格
+        """
+        size = _result_bytes(result)
+        if size > self.max_bytes:
+            return
+        result = _copy_result(result)
+        names = referenced_names(sql)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, size, names, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: tuple) -> None:
+        """移除紀錄（呼叫端需持有鎖）"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+
+    def invalidate_table(self, table_name: str) -> None:
+        """
+        使引用了表格的紀錄失效
+
+        只比對表格名稱（不分大小寫）而不比對 schema，避免遺漏依 search_path 解析的未限定名稱。
+
+        Args:
+            table_name: 表格名稱
+        """
+        table_name = table_name.lower()
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if table_name in entry[2]]:
+                self._remove(key)
+
+    def invalidate_statements(self, statements: list) -> None:
+        """
+        依已執行的語句使受影響的紀錄失效（規則見 written_tables）
+
+        Args:
+            statements: 已執行的語句列表
+        """
+        names = written_tables(statements)
+        if names is None:
+            self.clear()
+            return
+        for name in names:
+            self.invalidate_table(name)
+
+    def clear(self) -> None:
+        """清除所有紀錄（不重設計數器）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            包含 hits、misses、evictions、entries、bytes 的字典
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,335 @@
+"""
+以列為單位建構查詢結果的 DataFrame
+
+依 cursor.description 的類型 OID 為每一列選擇 NumPy 緩衝區，分批把取回的行轉置後
+直接寫入對應類型的陣列，不需要先保留完整的行列表，也不需要 pandas 從 Python 物件推斷類型。
+
+以二進位格式取回結果時（cursor(binary=True)），固定寬度類型的值不經過 Python 物件，
+而是保留原始位元組後整批以 np.frombuffer 解碼。
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import psycopg
+from psycopg.adapt import Transformer
+from psycopg.pq import Format
+from psycopg.types.composite import CompositeInfo
+from psycopg.types.multirange import MultirangeInfo
+from psycopg.types.range import RangeInfo
+from psycopg.types.string import ByteaBinaryLoader
+
+from psql.pgcopy import PG_EPOCH_US
+
+# PostgreSQL 內建類型的 OID
+INT2_OID = 21
+INT4_OID = 23
+INT8_OID = 20
+FLOAT4_OID = 700
+FLOAT8_OID = 701
+BOOL_OID = 16
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+JSON_OID = 114
+JSONB_OID = 3802
+RECORD_OID = 2249
+
+COLUMN_KINDS = {
+    INT2_OID: "int",
+    INT4_OID: "int",
+    INT8_OID: "int",
+    FLOAT4_OID: "float",
+    FLOAT8_OID: "float",
+    BOOL_OID: "bool",
+    TIMESTAMP_OID: "datetime",
+    TIMESTAMPTZ_OID: "datetimetz",
+}
+
+# 二進位格式中固定寬度類型的值佈局（網路位元組序）
+# timestamp / timestamptz 為自 2000-01-01 起的微秒數
+BINARY_DTYPES = {
+    INT2_OID: ">i2",
+    INT4_OID: ">i4",
+    INT8_OID: ">i8",
+    FLOAT4_OID: ">f4",
+    FLOAT8_OID: ">f8",
+    BOOL_OID: "u1",
+    TIMESTAMP_OID: ">i8",
+    TIMESTAMPTZ_OID: ">i8",
+}
+
+# 二進位格式中 timestamp 'infinity' / '-infinity' 的值
+TIMESTAMP_INFINITY = (np.iinfo(np.int64).max, np.iinfo(np.int64).min)
+
+
+def register_raw_loaders(context) -> None:
+    """
+    讓 context（連線或 cursor）以原始位元組取回二進位格式的固定寬度類型
+
+    使用 bytea 的二進位 loader（psycopg 的 C 實作），每個值只是複製位元組，
+    不建立 float / datetime 物件；解碼由 ResultBuilder 整批完成。
+
+    Args:
+        context: 具有 adapters 屬性的 psycopg 連線或 cursor
+    """
+    for oid in BINARY_DTYPES:
+        context.adapters.register_loader(oid, ByteaBinaryLoader)
+
+
+def contains_raw_values(types, oid: int) -> bool:
+    """
+    判斷類型 oid 的值在 register_raw_loaders 之下是否（直接或巢狀地）被載入為原始位元組
+
+    陣列、範圍、多重範圍與複合類型的元素透過同一個 cursor 的 loader 載入，
+    因此元素為固定寬度類型時同樣會變成位元組；匿名的 record 無法得知欄位類型，一律視為受影響。
+
+    Args:
+        types: 類型註冊表，通常為 cursor.adapters.types
+        oid: 類型 OID
+    """
+    if oid in BINARY_DTYPES or oid == RECORD_OID:
+        return True
+    info = types.get(oid)
+    if info is None:
+        return False
+    if oid == info.array_oid:
+        return contains_raw_values(types, info.oid)
+    if isinstance(info, (RangeInfo, MultirangeInfo)):
+        return contains_raw_values(types, info.subtype_oid)
+    if isinstance(info, CompositeInfo):
+        return any(contains_raw_values(types, field_type) for field_type in info.field_types)
+    return False
+
+
+class ResultBuilder:
+    """
+    累積查詢結果並建構具有正確 dtype 的 DataFrame
+
+    - 整數列：int64；含有 NULL 時為 float64（NaN），與 pandas 從行列表推斷的結果一致
+    - 浮點列：float64（NULL 為 NaN）
+    - 布林列：bool；含有 NULL 時為 object（None）
+    - timestamp / timestamptz：datetime64[us]（NULL 為 NaT），timestamptz 帶有連線的時區
+    - 其他類型：object
+    """
+
+    def __init__(self, description, timezone=None, binary=False, cursor=None):
+        """
+        Args:
+            description: cursor.description
+            timezone: timestamptz 列使用的時區，通常為 connection.info.timezone
+            binary: 固定寬度類型的值是否為 register_raw_loaders 取回的原始位元組
+            cursor: 取回結果的 cursor；binary 為 True 時用來以連線的 loader 重新載入
+                    陣列、範圍、record 等巢狀列（其元素也被載入為原始位元組）
+        """
+        self.columns = [desc[0] for desc in description]
+        self.type_codes = [desc.type_code for desc in description]
+        self.kinds = [COLUMN_KINDS.get(code, "object") for code in self.type_codes]
+        self.binary_dtypes = [
+            BINARY_DTYPES.get(desc.type_code) if binary else None for desc in description
+        ]
+        self.timezone = timezone
+        self._cursor = cursor
+        self._nested_loaders = {}
+        if binary and cursor is not None:
+            # 連線本身沒有註冊原始位元組的 loader，以它的 adapters 載入巢狀列
+            tx = Transformer(cursor.connection)
+            for i, code in enumerate(self.type_codes):
+                if code not in BINARY_DTYPES and contains_raw_values(cursor.adapters.types, code):
+                    self._nested_loaders[i] = tx.get_loader(code, Format.BINARY).load
+        self._values = [[] for _ in self.columns]
+        self._masks = [[] for _ in self.columns]
+
+    def append(self, rows: list) -> None:
+        """
+        把一批行轉置後寫入各列的緩衝區
+
+        Args:
+            rows: cursor.fetchmany() 取回的行元組列表
+        """
+        if not rows:
+            return
+
+        for i, values in enumerate(zip(*rows)):
+            if i in self._nested_loaders:
+                values = self._reload(i, len(rows))
+            # fromiter 不會把陣列類型的值（Python list）展開成多維陣列
+            values = np.fromiter(values, dtype=object, count=len(rows))
+            kind = self.kinds[i]
+            if kind == "object":
+                self._values[i].append(values)
+                continue
+
+            if self.binary_dtypes[i] is not None:
+                values, mask = self._decode_binary(values, i)
+                self._values[i].append(values)
+                self._masks[i].append(mask)
+                continue
+
+            mask = np.equal(values, None)
+            if kind == "int":
+                values[mask] = 0
+                values = values.astype(np.int64)
+            elif kind == "float":
+                values[mask] = np.nan
+                values = values.astype(np.float64)
+            elif kind == "bool":
+                values[mask] = False
+                values = values.astype(bool)
+            elif kind == "datetime":
+                values = values.astype("datetime64[us]")
+            else:
+                values = pd.to_datetime(values, utc=True).tz_convert(None).as_unit("us").to_numpy()
+            self._values[i].append(values)
+            self._masks[i].append(mask)
+
+    def _reload(self, i: int, count: int) -> list:
+        """
+        從 cursor 目前的 PGresult 重新載入剛取回的 count 行中第 i 列的值
+
+        伺服器端 cursor 的 PGresult 只包含最後一次 FETCH 的行；
+        用戶端 cursor 的 PGresult 包含完整結果，剛取回的行結束於 rownumber。
+        """
+        cur = self._cursor
+        pgresult = cur.pgresult
+        if isinstance(cur, (psycopg.ServerCursor, psycopg.AsyncServerCursor)):
+            start = 0
+        else:
+            start = cur.rownumber - count
+        load = self._nested_loaders[i]
+        values = []
+        for row in range(start, start + count):
+            data = pgresult.get_value(row, i)
+            values.append(None if data is None else load(data))
+        return values
+
+    def _decode_binary(self, values: np.ndarray, i: int):
+        """
+        把第 i 列的原始二進位值整批解碼為緩衝區使用的 NumPy 陣列
+
+        Args:
+            values: 每個元素為原始位元組或 None 的 object 陣列
+            i: 列的位置
+
+        Returns:
+            (值陣列, NULL 遮罩) 的元組
+        """
+        dtype = np.dtype(self.binary_dtypes[i])
+        mask = np.equal(values, None)
+        if mask.any():
+            values = values.copy()
+            values[mask] = bytes(dtype.itemsize)
+        data = np.frombuffer(b"".join(values), dtype=dtype)
+
+        kind = self.kinds[i]
+        if kind == "int":
+            return data.astype(np.int64), mask
+        if kind == "float":
+            data = data.astype(np.float64)
+            data[mask] = np.nan
+            return data, mask
+        if kind == "bool":
+            return data.astype(bool), mask
+
+        # timestamp / timestamptz：自 2000-01-01 起的微秒數（timestamptz 為 UTC）
+        if np.isin(data[~mask], TIMESTAMP_INFINITY).any():
+            raise ValueError(f"無法轉換 timestamp infinity: {self.columns[i]}")
+        data = data.astype(np.int64) + PG_EPOCH_US
+        data[mask] = np.iinfo(np.int64).min
+        return data.view("datetime64[us]"), mask
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        以累積的緩衝區建構 DataFrame
+
+        Returns:
+            欄位順序與查詢結果相同的 DataFrame
+        """
+        data = {}
+        for i in range(len(self.columns)):
+            data[i] = self._build_column(i)
+
+        df = pd.DataFrame(data)
+        df.columns = self.columns
+        return df
+
+    def to_arrow(self):
+        """
+        以累積的緩衝區直接建構 pyarrow.Table，不經過 pandas
+
+        數值與日期時間列由 NumPy 緩衝區加上 NULL 遮罩轉換（整數列含 NULL 時仍為 int64），
+        object 列交由 pyarrow 推斷類型；無法推斷的列（inet / cidr 的 ipaddress 物件、
+        形狀不一的 json / jsonb 值等）改為字串列。
+
+        Returns:
+            欄位順序與查詢結果相同的 pyarrow.Table
+        """
+        import pyarrow as pa
+
+        arrays = []
+        for i in range(len(self.columns)):
+            kind = self.kinds[i]
+            values, mask = self._concat(i)
+            if kind == "object":
+                try:
+                    arrays.append(pa.array(values, from_pandas=True))
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    arrays.append(pa.array(self._to_strings(values, i), type=pa.string()))
+            elif kind in ("datetime", "datetimetz"):
+                tz = None
+                if kind == "datetimetz":
+                    tz = str(self.timezone) if self.timezone is not None else "UTC"
+                arrays.append(pa.array(values, type=pa.timestamp("us", tz=tz), mask=mask))
+            else:
+                arrays.append(pa.array(values, mask=mask))
+        return pa.Table.from_arrays(arrays, names=self.columns)
+
+    def _to_strings(self, values: np.ndarray, i: int) -> list:
+        """把第 i 列的值轉為字串（json / jsonb 以 JSON 文字表示），NULL 保持為 None"""
+        if self.type_codes[i] in (JSON_OID, JSONB_OID):
+            return [None if value is None else json.dumps(value, default=str) for value in values]
+        return [None if value is None else str(value) for value in values]
+
+    def _concat(self, i: int):
+        """
+        合併第 i 列的所有緩衝區
+
+        Returns:
+            (值陣列, NULL 遮罩) 的元組；object 列的遮罩為 None
+        """
+        kind = self.kinds[i]
+        chunks = self._values[i]
+        if not chunks:
+            empty_dtypes = {
+                "int": np.int64,
+                "float": np.float64,
+                "bool": bool,
+                "datetime": "datetime64[us]",
+                "datetimetz": "datetime64[us]",
+                "object": object,
+            }
+            values = np.array([], dtype=empty_dtypes[kind])
+        else:
+            values = np.concatenate(chunks)
+        if kind == "object":
+            return values, None
+
+        mask = np.concatenate(self._masks[i]) if chunks else np.zeros(0, dtype=bool)
+        return values, mask
+
+    def _build_column(self, i: int):
+        kind = self.kinds[i]
+        values, mask = self._concat(i)
+        if kind == "object":
+            return values
+
+        if kind == "int" and mask.any():
+            values = values.astype(np.float64)
+            values[mask] = np.nan
+        elif kind == "bool" and mask.any():
+            values = values.astype(object)
+            values[mask] = None
+        elif kind == "datetimetz":
+            values = pd.DatetimeIndex(values).tz_localize("UTC")
+            if self.timezone is not None:
+                values = values.tz_convert(self.timezone)
+        return values
@@ -0,0 +1,142 @@
+"""
+把 SQL 腳本切分為單獨的語句
+
+以簡單的詞法分析找出語句之間的分號，略過下列位置中的分號：
+- 字串常值 '...'（包含 E'...' 的反斜線跳脫）與引號識別符 "..."
+- 錢號引用 $$...$$、$tag$...$tag$（函數主體、DO 區塊）
+- 註解 -- ... 與 /* ... */（可巢狀）
+- CREATE FUNCTION / PROCEDURE 中 SQL 標準的 BEGIN ATOMIC ... END 主體
+"""
+import re
+
+_DOLLAR_TAG_RE = re.compile(r"\$(?:[A-Za-z_\u0080-\uffff][A-Za-z0-9_\u0080-\uffff]*)?\$")
+_WORD_RE = re.compile(r"[A-Za-z_\u0080-\uffff][A-Za-z0-9_$\u0080-\uffff]*")
+_ROUTINE_RE = re.compile(
+    r"CREATE\s+(?:OR\s+REPLACE\s+)?(?:FUNCTION|PROCEDURE)\b", re.IGNORECASE
+)
+
+
+def split_statements(sql: str) -> list:
+    """
+    把 SQL 腳本切分為語句列表
+
+    Args:
+        sql: 以分號分隔的一個或多個 SQL 語句
+
+    Returns:
+        語句列表；每個語句去除了開頭的註解、前後空白與結尾分號，只有空白或註解的片段會被略過
+    """
+    statements = []
+    # 目前語句第一個非註解字元的位置，尚未遇到時為 None
+    start = None
+    # BEGIN ATOMIC / CASE 與 END 的巢狀深度（只在 CREATE FUNCTION / PROCEDURE 中追蹤）
+    depth = 0
+    i = 0
+    n = len(sql)
+
+    while i < n:
+        ch = sql[i]
+
+        if ch == "-" and sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end + 1
+            continue
+
+        if ch == "/" and sql.startswith("/*", i):
+            i = _skip_block_comment(sql, i)
+            continue
+
+        if ch == ";":
+            if depth == 0:
+                if start is not None:
+                    statements.append(sql[start:i].rstrip())
+                start = None
+            i += 1
+            continue
+
+        if ch.isspace():
+            i += 1
+            continue
+
+        if start is None:
+            start = i
+
+        if ch == "'":
+            escapes = i > 0 and sql[i - 1] in "eE" and (i < 2 or not _is_word_char(sql[i - 2]))
+            i = _skip_string(sql, i, escapes)
+            continue
+
+        if ch == '"':
+            end = sql.find('"', i + 1)
+            while end != -1 and sql.startswith('""', end):
+                end = sql.find('"', end + 2)
+            i = n if end == -1 else end + 1
+            continue
+
+        if ch == "$":
+            match = _DOLLAR_TAG_RE.match(sql, i)
+            # $1 之類的位置參數不是錢號引用；識別符中的 $ 也不是
+            if match and not (i > 0 and _is_word_char(sql[i - 1])):
+                tag = match.group()
+                end = sql.find(tag, match.end())
+                i = n if end == -1 else end + len(tag)
+                continue
+            i += 1
+            continue
+
+        match = _WORD_RE.match(sql, i)
+        if match:
+            word = match.group().upper()
+            if word in ("BEGIN", "CASE", "END") and _ROUTINE_RE.match(sql, start):
+                if word == "BEGIN" or (word == "CASE" and depth > 0):
+                    depth += 1
+                elif word == "END" and depth > 0:
+                    depth -= 1
+            i = match.end()
+            continue
+
+        i += 1
+
+    if start is not None:
+        statements.append(sql[start:].rstrip())
+    return statements
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "_$"
+
+
+def _skip_string(sql: str, i: int, escapes: bool) -> int:
+    """回傳從 i 開始的字串常值結束之後的位置；escapes 為 True 時處理反斜線跳脫"""
+    i += 1
+    n = len(sql)
+    while i < n:
+        ch = sql[i]
+        if escapes and ch == "\\":
+            i += 2
+            continue
+        if ch == "'":
+            if sql.startswith("''", i):
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_block_comment(sql: str, i: int) -> int:
+    """回傳從 i 開始的 /* */ 註解（可巢狀）結束之後的位置"""
+    depth = 0
+    n = len(sql)
+    while i < n:
+        if sql.startswith("/*", i):
+            depth += 1
+            i += 2
+        elif sql.startswith("*/", i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return n
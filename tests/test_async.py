@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from psql.async_pg import AsyncPG
+from psql.pool import close_async_pools
+
+
+def test_async_query():
+    """Test awaiting query and iterating over streamed chunks."""
+    async def run():
+        pg = AsyncPG()
+
+        result = await pg.query("SELECT g AS id, g / 2.0::float8 AS half FROM generate_series(1, 5) g ORDER BY g")
+        assert result["id"].tolist() == [1, 2, 3, 4, 5]
+        assert result["half"].dtype == np.float64
+        assert await pg.query("CREATE TEMP TABLE IF NOT EXISTS async_tmp (id int)") is None
+
+        binary = await pg.query("SELECT 1.5::float8 AS x", binary=True)
+        assert binary["x"].iloc[0] == 1.5
+
+        chunks = [chunk async for chunk in pg.query_iter("SELECT g FROM generate_series(1, 25) g", chunksize=10)]
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+        chunks = [
+            chunk
+            async for chunk in pg.query_iter(
+                "SELECT g FROM generate_series(1, %(n)s) g", chunksize=10, params={"n": 15}
+            )
+        ]
+        assert [len(chunk) for chunk in chunks] == [10, 5]
+
+        # Stopping early releases the connection
+        async for chunk in pg.query_iter("SELECT g FROM generate_series(1, 100) g", chunksize=10):
+            break
+        assert (await pg.query("SELECT 42 AS answer")).iloc[0, 0] == 42
+
+        with pytest.raises(Exception):
+            await pg.query("SELECT * FROM non_existent_table")
+        assert (await pg.query("SELECT 1 AS one")).iloc[0, 0] == 1
+
+        await pg.close()
+
+    asyncio.run(run())
+
+
+def test_async_query_inside_query_iter():
+    """Test that querying from inside query_iter raises without a pool and works with one."""
+    async def run():
+        pg = AsyncPG()
+        with pytest.raises(RuntimeError, match="query_iter"):
+            async for chunk in pg.query_iter("SELECT g FROM generate_series(1, 20) g", chunksize=10):
+                await asyncio.wait_for(pg.query("SELECT 1"), timeout=5)
+        assert (await pg.query("SELECT 1 AS one")).iloc[0, 0] == 1
+        await pg.close()
+
+        pooled = AsyncPG(pool=True)
+        totals = []
+        async for chunk in pooled.query_iter("SELECT g FROM generate_series(1, 20) g", chunksize=10):
+            totals.append((await pooled.query("SELECT %(n)s::int AS n", {"n": len(chunk)})).iloc[0, 0])
+        assert totals == [10, 10]
+        await pooled.close()
+        await close_async_pools()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("method", ["insert", "copy", "binary", "unnest"])
+def test_async_insert_pg(method):
+    """Test awaiting insert_pg with every transfer method."""
+    async def run():
+        pg = AsyncPG()
+        df = pd.DataFrame({
+            "id": range(500),
+            "value": np.arange(500) * 0.5,
+            "name": [f"name_{i}" if i % 7 else None for i in range(500)],
+        })
+
+        await pg.insert_pg(df, "test_async_schema.test_async_insert", overwrite=True, method=method, batch_size=200)
+        # Second load truncates the existing table
+        await pg.insert_pg(df, "test_async_schema.test_async_insert", method=method)
+
+        result = await pg.query("SELECT * FROM test_async_schema.test_async_insert ORDER BY id")
+        assert len(result) == 500
+        assert result["value"].tolist() == df["value"].tolist()
+        assert result["name"].tolist() == df["name"].tolist()
+
+        await pg.query("DROP SCHEMA IF EXISTS test_async_schema CASCADE;")
+        await pg.close()
+
+    asyncio.run(run())
+
+
+def test_async_pool_concurrency():
+    """Test that concurrent tasks on a pooled AsyncPG run on separate connections."""
+    async def run():
+        pg = AsyncPG(pool=True, pool_max_size=8)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            pg.query(f"SELECT pg_backend_pid() AS pid, {i} AS i, pg_sleep(0.2)") for i in range(8)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert [result["i"].iloc[0] for result in results] == list(range(8))
+        assert len({result["pid"].iloc[0] for result in results}) > 1
+        assert elapsed < 1.0
+
+        await close_async_pools()
+
+    asyncio.run(run())
@@ -0,0 +1,146 @@
+import pandas as pd
+import psycopg
+import pytest
+
+from psql.catalog import CatalogCache, MISSING
+from psql.pg import PG
+
+
+def _count_queries(pg, monkeypatch) -> list:
+    """Record every statement list sent through pg.query."""
+    executed = []
+    original = pg._execute_statements
+
+    def recording(statements, *args, **kwargs):
+        executed.append(statements)
+        return original(statements, *args, **kwargs)
+
+    monkeypatch.setattr(pg, "_execute_statements", recording)
+    return executed
+
+
+def test_catalog_cache_skips_lookups(monkeypatch):
+    """Test that repeated loads into the same table skip catalog lookups."""
+    pg = PG(catalog_cache_ttl=60)
+    pg.query("DROP SCHEMA IF EXISTS test_catalog_schema CASCADE;")
+    df = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+
+    pg.insert_pg(df, "test_catalog_schema.loads", method="copy")
+    executed = _count_queries(pg, monkeypatch)
+    pg.insert_pg(df, "test_catalog_schema.loads", method="copy")
+
+    # Only the TRUNCATE went through query; existence checks came from the cache
+    assert len(executed) == 1
+    assert executed[0][0].startswith("TRUNCATE")
+
+    pg.describe_table("test_catalog_schema.loads")
+    pg.describe_table("test_catalog_schema.loads")
+    assert len(executed) == 2
+
+    pg.query("DROP SCHEMA IF EXISTS test_catalog_schema CASCADE;")
+
+
+def test_catalog_cache_invalidation():
+    """Test invalidation by DDL issued through query and by TTL expiry."""
+    pg = PG(catalog_cache_ttl=60)
+    pg.query("DROP TABLE IF EXISTS test_catalog_inv;")
+    assert not pg.table_exists("test_catalog_inv")
+
+    # A table created on another connection is not seen until the entry expires
+    with psycopg.connect(pg.conn.info.dsn, password=pg.password, autocommit=True) as other:
+        other.execute("CREATE TABLE test_catalog_inv (id int)")
+    assert not pg.table_exists("test_catalog_inv")
+    assert PG(catalog_cache_ttl=0).table_exists("test_catalog_inv")
+
+    # DDL through query invalidates the table
+    pg.query("DROP TABLE test_catalog_inv;")
+    assert not pg.table_exists("test_catalog_inv")
+    pg.query("CREATE TABLE Test_Catalog_Inv (id int, name text);")
+    assert pg.table_exists("test_catalog_inv")
+    assert pg.describe_table("test_catalog_inv")["column_name"].tolist() == ["id", "name"]
+    pg.query("ALTER TABLE test_catalog_inv ADD COLUMN extra int;")
+    assert pg.describe_table("test_catalog_inv")["column_name"].tolist() == ["id", "name", "extra"]
+
+    pg.query("DROP TABLE IF EXISTS test_catalog_inv;")
+    assert not pg.table_exists("test_catalog_inv")
+
+    # A transactional load that rolls back does not leave the new schema cached
+    pg.query("DROP SCHEMA IF EXISTS test_catalog_tx CASCADE;")
+    duplicate_columns = pd.DataFrame([[1, 2]], columns=["id", "id"])
+    with pytest.raises(Exception):
+        pg.insert_pg(duplicate_columns, "test_catalog_tx.loads", transaction=True)
+    pg.insert_pg(pd.DataFrame({"id": [1]}), "test_catalog_tx.loads", transaction=True)
+    assert pg.query("SELECT count(*) AS n FROM test_catalog_tx.loads").iloc[0, 0] == 1
+    pg.query("DROP SCHEMA IF EXISTS test_catalog_tx CASCADE;")
+
+
+def test_describe_tables_snapshot(monkeypatch):
+    """Test bulk column metadata and that it serves later lookups from the cache."""
+    pg = PG(catalog_cache_ttl=60)
+    pg.query("""
+        DROP SCHEMA IF EXISTS test_snapshot_schema CASCADE;
+        CREATE SCHEMA test_snapshot_schema;
+        CREATE TABLE test_snapshot_schema.orders (id int NOT NULL, amount float8, note varchar(20));
+        CREATE TABLE test_snapshot_schema.prices (price numeric(10, 2) DEFAULT 0);
+        CREATE TABLE test_snapshot_schema."Items" (tags text[]);
+        CREATE TABLE test_snapshot_schema.empty ();
+    """)
+
+    snapshot = pg.catalog_snapshot("test_snapshot_schema")
+    assert sorted(snapshot) == [
+        "test_snapshot_schema.Items", "test_snapshot_schema.empty",
+        "test_snapshot_schema.orders", "test_snapshot_schema.prices",
+    ]
+    for key, table_info in snapshot.items():
+        schema_name, table_name = key.split(".")
+        expected = PG().describe_table(table_name, schema_name)
+        assert table_info.equals(expected), key
+        assert table_info.dtypes.tolist() == expected.dtypes.tolist(), key
+
+    tables = pg.describe_tables(["test_snapshot_schema.orders", "test_snapshot_schema.missing"])
+    assert list(tables) == ["test_snapshot_schema.orders"]
+    assert tables["test_snapshot_schema.orders"]["column_name"].tolist() == ["id", "amount", "note"]
+
+    # Existence checks, describe_table and insert_pg now need no catalog queries
+    executed = _count_queries(pg, monkeypatch)
+    assert not pg.table_exists("test_snapshot_schema.missing")
+    assert pg.describe_table("test_snapshot_schema.orders").equals(tables["test_snapshot_schema.orders"])
+    df = pd.DataFrame({"id": [1, 2], "amount": [1.5, 2.25], "note": ["a", "b"]})
+    pg.insert_pg(df, "test_snapshot_schema.orders", method="binary")
+    assert [statements[0].split()[0] for statements in executed] == ["TRUNCATE"]
+
+    assert pg.describe_tables([]) == {}
+    pg.query("DROP SCHEMA IF EXISTS test_snapshot_schema CASCADE;")
+
+
+def test_catalog_cache_statement_parsing():
+    """Test which cache entries DDL statements invalidate."""
+    cache = CatalogCache()
+
+    def fill():
+        cache.clear()
+        cache.set(("schema", "sales"), True)
+        cache.set(("table", "sales", "orders"), True)
+        cache.set(("table", "public", "Items"), True)
+        cache.set(("columns", "public", "items"), pd.DataFrame())
+
+    fill()
+    cache.invalidate_statements(["SELECT 1", "INSERT INTO sales.orders VALUES (1)", "TRUNCATE sales.orders"])
+    assert cache.get(("table", "sales", "orders"), 60) is True
+
+    fill()
+    cache.invalidate_statements(['CREATE TABLE IF NOT EXISTS "public".ITEMS (id int)'])
+    assert cache.get(("table", "public", "Items"), 60) is MISSING
+    assert cache.get(("columns", "public", "items"), 60) is MISSING
+    assert cache.get(("table", "sales", "orders"), 60) is True
+
+    fill()
+    cache.invalidate_statements(["DROP SCHEMA sales CASCADE"])
+    assert cache.get(("schema", "sales"), 60) is MISSING
+    assert cache.get(("table", "sales", "orders"), 60) is MISSING
+    assert cache.get(("table", "public", "Items"), 60) is True
+
+    for statement in ["ALTER TABLE sales.orders RENAME TO old_orders", "DROP TABLE a, b", "CREATE INDEX ON sales.orders (id)"]:
+        fill()
+        cache.invalidate_statements([statement])
+        assert cache.get(("table", "public", "Items"), 60) is MISSING, statement
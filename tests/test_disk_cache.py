@@ -0,0 +1,130 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from psql.catalog import MISSING
+from psql.disk_cache import DiskCache
+from psql.pg import PG
+
+DISK_CACHE_SQL = """
+    SELECT g AS id, g::float8 / 3 AS ratio, CASE WHEN g % 3 = 0 THEN NULL ELSE g END AS maybe,
+           'row ' || g AS label, now() AS created_at, (g / 7.0)::numeric(10, 3) AS amount,
+           ARRAY[g, g + 1] AS pair
+    FROM generate_series(1, 20) g
+"""
+
+
+def test_disk_cache_shared_between_instances(tmp_path):
+    """Test that results written by one PG instance are read back unchanged by another."""
+    for disk_format in ("feather", "parquet"):
+        directory = str(tmp_path / disk_format)
+        for output, dtype_backend in [("pandas", "numpy"), ("pandas", "pyarrow"), ("arrow", "numpy")]:
+            first = PG(disk_cache_dir=directory, disk_cache_format=disk_format)
+            expected = first.query(DISK_CACHE_SQL, output=output, dtype_backend=dtype_backend)
+            assert first.disk_cache.stats()["misses"] == 1
+
+            # A fresh instance stands in for another process sharing the directory
+            second = PG(disk_cache_dir=directory, disk_cache_format=disk_format)
+            result = second.query(DISK_CACHE_SQL, output=output, dtype_backend=dtype_backend)
+            assert second.disk_cache.stats()["hits"] == 1
+            assert result.equals(expected), (disk_format, output, dtype_backend)
+            if output == "pandas":
+                assert result.dtypes.tolist() == expected.dtypes.tolist()
+                assert result["created_at"].dt.tz == expected["created_at"].dt.tz
+                assert result["pair"].tolist() == expected["pair"].tolist()
+
+        files = os.listdir(directory)
+        assert len(files) == 3 and not any(name.endswith(".tmp") for name in files)
+
+
+def test_disk_cache_keeps_json_and_numeric_values(tmp_path):
+    """Test that mixed-shape jsonb and mixed-scale numeric read back exactly as queried."""
+    sql = """
+        SELECT * FROM (VALUES
+            ('{"a": 1}'::jsonb, '[1, 2.5]'::jsonb, 1.5::numeric),
+            ('{"b": [1, 2]}'::jsonb, '[3]'::jsonb, 2.25::numeric)
+        ) AS t(doc, arr, amount)
+    """
+    first = PG(disk_cache_dir=str(tmp_path))
+    expected = first.query(sql)
+
+    second = PG(disk_cache_dir=str(tmp_path))
+    result = second.query(sql)
+    assert result["doc"].tolist() == [{"a": 1}, {"b": [1, 2]}]
+    assert [str(value) for value in result["amount"]] == ["1.5", "2.25"]
+    for column in expected.columns:
+        assert [repr(value) for value in result[column]] == [repr(value) for value in expected[column]]
+
+
+def test_disk_cache_invalidated_by_writes(tmp_path):
+    """Test that writes by the same instance delete disk cache files for the written table."""
+    pg = PG(result_cache_ttl=60, disk_cache_dir=str(tmp_path))
+    pg.query("""
+        DROP TABLE IF EXISTS test_disk_cache_writes;
+        DROP TABLE IF EXISTS test_disk_cache_other;
+        CREATE TABLE test_disk_cache_writes (id int, value text);
+        CREATE TABLE test_disk_cache_other (id int);
+        INSERT INTO test_disk_cache_writes VALUES (1, 'before');
+    """)
+    sql = "SELECT value FROM test_disk_cache_writes WHERE id = 1"
+    other_sql = "SELECT count(*) AS n FROM test_disk_cache_other"
+
+    assert pg.query(sql).iloc[0, 0] == "before"
+    pg.query(other_sql)
+    assert len(os.listdir(tmp_path)) == 2
+
+    # SELECT / UPDATE / SELECT must not serve the pre-UPDATE value from disk
+    pg.query("UPDATE test_disk_cache_writes SET value = 'after' WHERE id = 1")
+    assert len(os.listdir(tmp_path)) == 1
+    assert pg.query(sql).iloc[0, 0] == "after"
+    # A second instance sharing the directory sees the refreshed file
+    assert PG(disk_cache_dir=str(tmp_path)).query(sql).iloc[0, 0] == "after"
+
+    pg.insert_pg(pd.DataFrame({"id": [1], "value": ["loaded"]}), "test_disk_cache_writes", method="copy")
+    assert pg.query(sql).iloc[0, 0] == "loaded"
+    # The unrelated result was never invalidated
+    assert pg.disk_cache.stats()["entries"] == 2
+
+    pg.query("DROP TABLE IF EXISTS test_disk_cache_writes; DROP TABLE IF EXISTS test_disk_cache_other;")
+
+
+def test_disk_cache_ttl_and_size(tmp_path):
+    """Test TTL expiry and eviction of the least recently read files."""
+    frame = pd.DataFrame({"x": range(10000)})
+    cache = DiskCache(str(tmp_path), ttl=60, max_bytes=10 ** 9)
+    cache.set(("a",), frame)
+    size = cache.stats()["bytes"]
+
+    cache = DiskCache(str(tmp_path), ttl=60, max_bytes=int(size * 2.5))
+    cache.set(("b",), frame)
+    # Make "b" the least recently read file
+    os.utime(cache._path(("b",)), (time.time() - 100, time.time()))
+    assert cache.get(("a",)).equals(frame)
+    cache.set(("c",), frame)
+    assert cache.get(("b",)) is MISSING
+    assert cache.get(("a",)) is not MISSING
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+    expired = DiskCache(str(tmp_path), ttl=0.05, max_bytes=10 ** 9)
+    time.sleep(0.1)
+    assert expired.get(("a",)) is MISSING
+
+
+def test_disk_cache_concurrent_writers(tmp_path):
+    """Test that concurrent writers of the same key always leave a complete file."""
+    cache = DiskCache(str(tmp_path), ttl=60, max_bytes=10 ** 9)
+    frames = [pd.DataFrame({"x": range(i * 1000, (i + 1) * 1000)}) for i in range(8)]
+
+    def write_and_read(frame):
+        cache.set(("shared",), frame)
+        return cache.get(("shared",))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(write_and_read, frames))
+
+    for result in results + [cache.get(("shared",))]:
+        assert any(result.equals(frame) for frame in frames)
+    assert os.listdir(tmp_path) == [os.path.basename(cache._path(("shared",)))]
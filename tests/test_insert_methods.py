@@ -0,0 +1,482 @@
+import datetime
+import uuid
+
+import pytest
+import pandas as pd
+import numpy as np
+import psycopg
+
+from psql import pgcopy
+from psql.pg import PG
+
+
+@pytest.fixture
+def mixed_df():
+    """DataFrame covering the dtypes handled by _get_pg_types, including nulls."""
+    return pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "name": ["Alice", "O'Reilly", None],
+            "score": [92.5, np.nan, 95.5],
+            "active": [True, False, True],
+            "created_at": pd.to_datetime(["2023-01-01", None, "2023-01-03"]),
+            "notes": ["tab\there", "new\nline", "back\\slash"],
+        }
+    )
+
+
+def test_insert_pg_copy(mixed_df):
+    """Test loading a DataFrame through COPY FROM STDIN."""
+    pg = PG()
+
+    pg.insert_pg(mixed_df, "test_insert_copy", overwrite=True, method="copy")
+
+    result = pg.query("SELECT * FROM test_insert_copy ORDER BY id")
+    assert len(result) == 3
+    assert result["id"].tolist() == [1, 2, 3]
+    assert result["name"].tolist()[:2] == ["Alice", "O'Reilly"]
+    assert result["name"].iloc[2] is None
+    assert result["score"].iloc[0] == 92.5
+    assert pd.isna(result["score"].iloc[1])
+    assert result["active"].tolist() == [True, False, True]
+    assert pd.isna(result["created_at"].iloc[1])
+    assert result["notes"].tolist() == mixed_df["notes"].tolist()
+
+    # Reloading into the existing table truncates it first
+    pg.insert_pg(mixed_df.iloc[:1], "test_insert_copy", method="copy")
+    count_result = pg.query("SELECT COUNT(*) FROM test_insert_copy")
+    assert count_result.iloc[0, 0] == 1
+
+    pg.query("DROP TABLE IF EXISTS test_insert_copy;")
+
+
+def test_insert_pg_copy_large():
+    """Test that COPY handles frames larger than a single insert batch."""
+    pg = PG()
+
+    large_size = 5000
+    large_df = pd.DataFrame({
+        "id": range(large_size),
+        "value": [f"value_{i}" for i in range(large_size)],
+        "number": [i * 1.5 for i in range(large_size)]
+    })
+
+    pg.insert_pg(large_df, "test_insert_copy_large", overwrite=True, method="copy")
+
+    count_result = pg.query("SELECT COUNT(*) FROM test_insert_copy_large")
+    assert count_result.iloc[0, 0] == large_size
+
+    pg.query("DROP TABLE IF EXISTS test_insert_copy_large;")
+
+
+def test_insert_pg_invalid_method(mixed_df):
+    """Test that an unknown insert method is rejected before touching the table."""
+    pg = PG()
+
+    with pytest.raises(ValueError):
+        pg.insert_pg(mixed_df, "test_insert_invalid", method="bogus")
+
+    assert not pg.table_exists("test_insert_invalid")
+
+
+def test_insert_pg_binary(mixed_df):
+    """Test loading a DataFrame through binary COPY."""
+    pg = PG()
+
+    df = mixed_df.assign(
+        big=[2**40, None, 3],
+        created_tz=pd.to_datetime(["2023-01-01 08:00:00.000000", "2023-06-01 12:30:15.123456", None]).tz_localize("Asia/Taipei"),
+    )
+    pg.insert_pg(df, "test_insert_binary", overwrite=True, method="binary")
+
+    result = pg.query("SELECT * FROM test_insert_binary ORDER BY id")
+    assert len(result) == 3
+    assert result["id"].tolist() == [1, 2, 3]
+    assert result["name"].tolist()[:2] == ["Alice", "O'Reilly"]
+    assert result["name"].iloc[2] is None
+    assert result["score"].iloc[2] == 95.5
+    assert pd.isna(result["score"].iloc[1])
+    assert result["active"].tolist() == [True, False, True]
+    assert result["created_at"].iloc[0] == pd.Timestamp("2023-01-01")
+    assert pd.isna(result["created_at"].iloc[1])
+    assert pd.Timestamp(result["created_tz"].iloc[1]) == df["created_tz"].iloc[1]
+    assert pd.isna(result["created_tz"].iloc[2])
+    assert result["notes"].tolist() == mixed_df["notes"].tolist()
+    assert result["big"].iloc[0] == 2**40
+
+    pg.query("DROP TABLE IF EXISTS test_insert_binary;")
+
+
+def test_insert_pg_binary_existing_table():
+    """Test that binary COPY into an existing table follows the table's column types."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_binary_existing;
+        CREATE TABLE test_insert_binary_existing (id BIGINT, ratio DOUBLE PRECISION, label TEXT);
+    """)
+
+    # id would map to INTEGER and ratio to BIGINT from the DataFrame alone
+    df = pd.DataFrame({"id": [1, 2], "ratio": [3, 4], "label": ["a", "b"]})
+    pg.insert_pg(df, "test_insert_binary_existing", method="binary")
+
+    result = pg.query("SELECT * FROM test_insert_binary_existing ORDER BY id")
+    assert result["id"].tolist() == [1, 2]
+    assert result["ratio"].tolist() == [3.0, 4.0]
+    assert result["label"].tolist() == ["a", "b"]
+
+    pg.query("DROP TABLE IF EXISTS test_insert_binary_existing;")
+
+
+def test_insert_pg_binary_existing_table_errors_keep_rows():
+    """Test that a binary load rejected by the existing table leaves its rows in place."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_binary_keep;
+        CREATE TABLE test_insert_binary_keep (id INTEGER, amount NUMERIC(10, 2), day DATE);
+        INSERT INTO test_insert_binary_keep VALUES (1, 1.50, '2024-01-01'), (2, 2.50, '2024-01-02');
+    """)
+
+    # numeric and date have no binary encoder
+    df = pd.DataFrame({"id": [3], "amount": [3.5], "day": pd.to_datetime(["2024-01-03"])})
+    with pytest.raises(ValueError):
+        pg.insert_pg(df, "test_insert_binary_keep", method="binary")
+    # A column the table does not have
+    with pytest.raises(ValueError):
+        pg.insert_pg(pd.DataFrame({"id": [3], "missing": [1]}), "test_insert_binary_keep", method="binary")
+    # A value the INTEGER column cannot hold
+    with pytest.raises(ValueError):
+        pg.insert_pg(pd.DataFrame({"id": [3_000_000_000]}), "test_insert_binary_keep", method="binary")
+
+    assert pg.query("SELECT id FROM test_insert_binary_keep ORDER BY id")["id"].tolist() == [1, 2]
+
+    pg.query("DROP TABLE IF EXISTS test_insert_binary_keep;")
+
+def test_binary_encode_rejects_lossy_integers():
+    """Test that binary encoding refuses values an integer column cannot hold exactly."""
+    with pytest.raises(ValueError):
+        pgcopy.encode_rows(pd.DataFrame({"n": [1.7, 2.0]}), {"n": "INTEGER"})
+    with pytest.raises(ValueError):
+        pgcopy.encode_rows(pd.DataFrame({"n": [1, 3_000_000_000]}), {"n": "INTEGER"})
+    with pytest.raises(ValueError):
+        pgcopy.encode_rows(pd.DataFrame({"n": [40000]}), {"n": "SMALLINT"})
+
+    # Whole floats and nulls are fine
+    encoded = pgcopy.encode_rows(pd.DataFrame({"n": [1.0, np.nan, 3e9]}), {"n": "BIGINT"})
+    assert len(encoded) == 3 * 2 + 2 * (4 + 8) + 4
+
+
+def test_insert_pg_pipeline():
+    """Test batched inserts sent in pipeline mode."""
+    pg = PG()
+
+    large_size = 2500
+    large_df = pd.DataFrame({
+        "id": range(large_size),
+        "value": [f"value_{i}" if i % 10 else None for i in range(large_size)],
+    })
+
+    pg.insert_pg(large_df, "test_insert_pipeline", overwrite=True, pipeline=True)
+
+    count_result = pg.query("SELECT COUNT(*), COUNT(value) FROM test_insert_pipeline")
+    assert count_result.iloc[0, 0] == large_size
+    assert count_result.iloc[0, 1] == large_size - large_size // 10
+
+    pg.query("DROP TABLE IF EXISTS test_insert_pipeline;")
+
+
+def test_insert_pg_pipeline_error():
+    """Test that a failing batch in pipeline mode raises and leaves the connection usable."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_pipeline_error;
+        CREATE TABLE test_insert_pipeline_error (id INTEGER);
+    """)
+
+    # The second batch overflows INTEGER
+    df = pd.DataFrame({"id": [1] * 1000 + [2**40]})
+    with pytest.raises(Exception, match="batch 2"):
+        pg.insert_pg(df, "test_insert_pipeline_error", pipeline=True, batch_size=1000)
+
+    count_result = pg.query("SELECT COUNT(*) FROM test_insert_pipeline_error")
+    assert count_result.iloc[0, 0] == 1000
+
+    pg.query("DROP TABLE IF EXISTS test_insert_pipeline_error;")
+
+
+def test_insert_pg_unnest(mixed_df):
+    """Test inserting batches as a single INSERT ... SELECT FROM unnest() statement."""
+    pg = PG()
+
+    pg.insert_pg(mixed_df, "test_insert_unnest", overwrite=True, method="unnest")
+
+    result = pg.query("SELECT * FROM test_insert_unnest ORDER BY id")
+    assert len(result) == 3
+    assert result["id"].tolist() == [1, 2, 3]
+    assert result["name"].tolist()[:2] == ["Alice", "O'Reilly"]
+    assert result["name"].iloc[2] is None
+    assert pd.isna(result["score"].iloc[1])
+    assert result["active"].tolist() == [True, False, True]
+    assert pd.isna(result["created_at"].iloc[1])
+    assert result["notes"].tolist() == mixed_df["notes"].tolist()
+
+    # Large frame into the existing table, spanning several batches
+    large_size = 25000
+    large_df = pd.DataFrame({
+        "id": range(large_size),
+        "name": [f"name_{i}" for i in range(large_size)],
+        "score": np.nan,
+        "active": True,
+        "created_at": pd.Timestamp("2024-01-01"),
+        "notes": None,
+    })
+    pg.insert_pg(large_df, "test_insert_unnest", method="unnest", pipeline=True)
+
+    count_result = pg.query("SELECT COUNT(*), COUNT(score) FROM test_insert_unnest")
+    assert count_result.iloc[0, 0] == large_size
+    assert count_result.iloc[0, 1] == 0
+
+    pg.query("DROP TABLE IF EXISTS test_insert_unnest;")
+
+
+def test_insert_pg_unnest_existing_table_types():
+    """Test that unnest into an existing table casts to the table's date, uuid and jsonb columns."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_unnest_types;
+        CREATE TABLE test_insert_unnest_types (id INTEGER, day DATE, key UUID, doc JSONB, amount NUMERIC(6, 2));
+    """)
+
+    keys = [uuid.uuid4(), uuid.uuid4()]
+    df = pd.DataFrame({
+        "id": [1, 2],
+        "day": [datetime.date(2024, 1, 1), None],
+        "key": keys,
+        "doc": ['{"a": 1}', None],
+        "amount": [1.25, 2.5],
+    })
+    pg.insert_pg(df, "test_insert_unnest_types", method="unnest")
+
+    result = pg.query("SELECT * FROM test_insert_unnest_types ORDER BY id")
+    assert result["day"].tolist() == [datetime.date(2024, 1, 1), None]
+    assert result["key"].tolist() == keys
+    assert result["doc"].tolist() == [{"a": 1}, None]
+    assert [float(v) for v in result["amount"]] == [1.25, 2.5]
+
+    with pytest.raises(ValueError):
+        pg.insert_pg(pd.DataFrame({"missing": [1]}), "test_insert_unnest_types", method="unnest")
+    assert len(pg.query("SELECT * FROM test_insert_unnest_types")) == 2
+
+    pg.query("DROP TABLE IF EXISTS test_insert_unnest_types;")
+
+
+@pytest.mark.parametrize("method", ["insert", "copy", "binary", "unnest"])
+def test_insert_pg_parallel(method):
+    """Test loading row partitions concurrently over several connections."""
+    pg = PG()
+
+    large_size = 10000
+    large_df = pd.DataFrame({
+        "id": range(large_size),
+        "value": [f"value_{i}" for i in range(large_size)],
+        "number": [i * 1.5 for i in range(large_size)]
+    })
+
+    stats = pg.insert_pg_parallel(large_df, "test_insert_parallel", overwrite=True, method=method, n_workers=3)
+
+    assert list(stats.columns) == ["worker", "rows", "seconds", "rows_per_sec"]
+    assert stats["worker"].tolist() == [0, 1, 2]
+    assert stats["rows"].sum() == large_size
+
+    result = pg.query("SELECT COUNT(*), COUNT(DISTINCT id), SUM(number) FROM test_insert_parallel")
+    assert result.iloc[0, 0] == large_size
+    assert result.iloc[0, 1] == large_size
+    assert result.iloc[0, 2] == large_df["number"].sum()
+
+    pg.query("DROP TABLE IF EXISTS test_insert_parallel;")
+
+
+def _staging_tables(pg, table_name):
+    return pg.query(
+        "SELECT tablename FROM pg_tables WHERE tablename LIKE %(pattern)s",
+        {"pattern": f"{table_name}\\_staging\\_%"},
+    )["tablename"].tolist()
+
+
+def test_insert_pg_parallel_atomic():
+    """Test that an atomic parallel load swaps in the new data only when every partition succeeds."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_parallel_atomic;
+        CREATE TABLE test_insert_parallel_atomic (id INTEGER PRIMARY KEY, label TEXT);
+        INSERT INTO test_insert_parallel_atomic VALUES (-1, 'old');
+    """)
+
+    good_df = pd.DataFrame({"id": range(5000), "label": "new"})
+    stats = pg.insert_pg_parallel(good_df, "test_insert_parallel_atomic", n_workers=4, atomic=True)
+    assert len(stats) == 4
+
+    result = pg.query("SELECT COUNT(*), MIN(id) FROM test_insert_parallel_atomic")
+    assert result.iloc[0, 0] == 5000
+    assert result.iloc[0, 1] == 0
+    assert _staging_tables(pg, "test_insert_parallel_atomic") == []
+
+    # The last partition violates the primary key, so nothing should change
+    bad_df = pd.DataFrame({"id": list(range(3999)) + [0], "label": "bad"})
+    with pytest.raises(Exception):
+        pg.insert_pg_parallel(bad_df, "test_insert_parallel_atomic", n_workers=4, atomic=True)
+
+    result = pg.query("SELECT COUNT(*), MAX(label) FROM test_insert_parallel_atomic")
+    assert result.iloc[0, 0] == 5000
+    assert result.iloc[0, 1] == "new"
+    assert _staging_tables(pg, "test_insert_parallel_atomic") == []
+
+    # A view depending on the target makes the swap's DROP TABLE fail
+    pg.query("CREATE VIEW test_insert_parallel_atomic_view AS SELECT id FROM test_insert_parallel_atomic;")
+    with pytest.raises(Exception):
+        pg.insert_pg_parallel(good_df, "test_insert_parallel_atomic", n_workers=2, atomic=True)
+
+    assert _staging_tables(pg, "test_insert_parallel_atomic") == []
+    assert pg.conn.info.transaction_status == psycopg.pq.TransactionStatus.IDLE
+    assert pg.query("SELECT COUNT(*) FROM test_insert_parallel_atomic").iloc[0, 0] == 5000
+
+    pg.query("""
+        DROP VIEW IF EXISTS test_insert_parallel_atomic_view;
+        DROP TABLE IF EXISTS test_insert_parallel_atomic;
+    """)
+
+
+def test_insert_pg_parallel_atomic_keeps_user_staging_table():
+    """Test that an atomic load never drops a user table that happens to be named <table>_staging."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_atomic_user;
+        DROP TABLE IF EXISTS test_insert_atomic_user_staging;
+        CREATE TABLE test_insert_atomic_user_staging (note TEXT);
+        INSERT INTO test_insert_atomic_user_staging VALUES ('keep me');
+    """)
+
+    df = pd.DataFrame({"id": range(100), "label": "new"})
+    pg.insert_pg_parallel(df, "test_insert_atomic_user", n_workers=2, atomic=True)
+    pg.insert_pg_parallel(df, "test_insert_atomic_user", n_workers=2, atomic=True)
+
+    assert pg.query("SELECT COUNT(*) FROM test_insert_atomic_user").iloc[0, 0] == 100
+    assert pg.query("SELECT note FROM test_insert_atomic_user_staging")["note"].tolist() == ["keep me"]
+    assert _staging_tables(pg, "test_insert_atomic_user") == []
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_atomic_user;
+        DROP TABLE IF EXISTS test_insert_atomic_user_staging;
+    """)
+
+
+def test_insert_pg_batch_options():
+    """Test explicit batch_size / batch_bytes overrides and adaptive batching."""
+    pg = PG()
+
+    df = pd.DataFrame({
+        "id": range(3000),
+        "payload": ["x" * 200] * 3000,
+    })
+
+    # Fixed row count: the third batch fails
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_batch_options;
+        CREATE TABLE test_insert_batch_options (id INTEGER CHECK (id < 2500), payload TEXT);
+    """)
+    with pytest.raises(Exception, match="batch 3"):
+        pg.insert_pg(df, "test_insert_batch_options", batch_size=1000)
+
+    # Byte budget: ~208 bytes per row, so 100 KB is roughly 480 rows per batch
+    with pytest.raises(Exception, match="batch 6"):
+        pg.insert_pg(df, "test_insert_batch_options", batch_bytes=100_000)
+
+    # Adaptive batching loads everything when nothing fails
+    pg.insert_pg(df, "test_insert_batch_options", overwrite=True)
+    count_result = pg.query("SELECT COUNT(*) FROM test_insert_batch_options")
+    assert count_result.iloc[0, 0] == 3000
+
+    with pytest.raises(ValueError):
+        pg.insert_pg(df, "test_insert_batch_options", batch_size=0)
+
+    pg.query("DROP TABLE IF EXISTS test_insert_batch_options;")
+
+
+def test_iter_batches():
+    """Test how _iter_batches splits a DataFrame."""
+    pg = PG()
+    df = pd.DataFrame({"id": range(10000), "value": ["abcdefgh"] * 10000})
+
+    sizes = [len(batch) for batch in pg._iter_batches(df, batch_size=3000)]
+    assert sizes == [3000, 3000, 3000, 1000]
+
+    # 4 + 8 bytes for id, 4 + 8 bytes for value
+    assert pg._estimate_row_bytes(df) == 24
+    sizes = [len(batch) for batch in pg._iter_batches(df, batch_bytes=24 * 2500)]
+    assert sizes == [2500] * 4
+
+    # An explicit byte budget is honored beyond the adaptive row bounds
+    sizes = [len(batch) for batch in pg._iter_batches(df, batch_bytes=24 * 40)]
+    assert sizes == [40] * 250
+    sizes = [len(batch) for batch in pg._iter_batches(df, batch_bytes=1)]
+    assert len(sizes) == 10000
+
+    # Adaptive batches always cover the whole frame in order
+    batches = list(pg._iter_batches(df))
+    assert pd.concat(batches)["id"].tolist() == list(range(10000))
+
+
+@pytest.mark.parametrize("method", ["insert", "copy"])
+def test_insert_pg_transaction(method):
+    """Test that a transactional load is all-or-nothing, including the DDL."""
+    pg = PG()
+
+    pg.query("""
+        DROP TABLE IF EXISTS test_insert_transaction;
+        CREATE TABLE test_insert_transaction (id INTEGER CHECK (id < 2500));
+        INSERT INTO test_insert_transaction VALUES (-1);
+    """)
+
+    # The TRUNCATE and the first batches are rolled back with the failing batch
+    bad_df = pd.DataFrame({"id": range(3000)})
+    with pytest.raises(Exception):
+        pg.insert_pg(bad_df, "test_insert_transaction", method=method, batch_size=1000, transaction=True)
+
+    result = pg.query("SELECT id FROM test_insert_transaction")
+    assert result["id"].tolist() == [-1]
+    assert pg.auto_commit
+
+    good_df = pd.DataFrame({"id": range(2000)})
+    pg.insert_pg(
+        good_df, "test_insert_transaction", method=method, batch_size=500,
+        transaction=True, synchronous_commit=False,
+    )
+
+    count_result = pg.query("SELECT COUNT(*) FROM test_insert_transaction")
+    assert count_result.iloc[0, 0] == 2000
+
+    # SET LOCAL does not outlive the load
+    setting = pg.query("SHOW synchronous_commit")
+    assert setting.iloc[0, 0] == "on"
+
+    with pytest.raises(ValueError):
+        pg.insert_pg(good_df, "test_insert_transaction", synchronous_commit=False)
+
+    pg.query("DROP TABLE IF EXISTS test_insert_transaction;")
+
+
+def test_insert_pg_transaction_new_table():
+    """Test that a failed transactional load does not leave a newly created table behind."""
+    pg = PG()
+    pg.query("DROP TABLE IF EXISTS test_insert_transaction_new;")
+
+    df = pd.DataFrame({"id": [1, 2], "value": ["a", "\x00"]})
+    with pytest.raises(Exception):
+        pg.insert_pg(df, "test_insert_transaction_new", transaction=True)
+
+    assert not pg.table_exists("test_insert_transaction_new")
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from psql.pg import PG
+
+
+def test_pool_shared_and_returned():
+    """Test that PG instances with the same DSN share one pool and return connections after each call."""
+    pg1 = PG(pool=True, pool_max_size=4)
+    pg2 = PG(pool=True)
+    assert pg1._pool is pg2._pool
+
+    result = pg1.query("SELECT 1 AS one")
+    assert result.iloc[0, 0] == 1
+    assert pg1._conn is None
+
+    # Repeated calls reuse pooled connections instead of opening new ones
+    pids = {pg.query("SELECT pg_backend_pid() AS pid").iloc[0, 0] for pg in [pg1, pg2] * 10}
+    assert len(pids) <= pg1._pool.max_size
+
+    # Generators hold their connection for the whole iteration
+    chunks = list(pg1.query_iter("SELECT g FROM generate_series(1, 10) g", chunksize=3))
+    assert sum(len(chunk) for chunk in chunks) == 10
+    assert pg1._conn is None
+
+
+def test_pool_read_table_parallel_returns_connection():
+    """Test that read_table_parallel gives back the connection it used to plan the ranges."""
+    pg = PG(pool=True)
+    pg.query("DROP TABLE IF EXISTS test_pool_read; CREATE TABLE test_pool_read AS SELECT g AS id FROM generate_series(1, 100) g;")
+
+    assert len(pg.read_table_parallel("test_pool_read", key_column="id", n_workers=2)) == 100
+    assert pg._conn is None
+    assert len(pg.read_table_parallel("test_pool_read", n_workers=2)) == 100
+    assert pg._conn is None
+
+    pg.query("DROP TABLE IF EXISTS test_pool_read;")
+
+
+def test_pool_transaction_kept():
+    """Test that a connection with an open transaction stays with its PG instance."""
+    pg = PG(pool=True)
+    pg.query("DROP TABLE IF EXISTS test_pool_tx; CREATE TABLE test_pool_tx (id int);")
+
+    pg.auto_commit = False
+    pg.query("INSERT INTO test_pool_tx VALUES (1)")
+    assert pg._conn is not None
+    pg.query("INSERT INTO test_pool_tx VALUES (2)")
+    pg.conn.commit()
+    pg.auto_commit = True
+
+    assert pg.query("SELECT count(*) AS n FROM test_pool_tx").iloc[0, 0] == 2
+    assert pg._conn is None
+
+    pg.query("DROP TABLE IF EXISTS test_pool_tx;")
+
+
+def test_pool_insert_and_health_check():
+    """Test loading through pooled connections and replacing a broken connection on checkout."""
+    pg = PG(pool=True)
+    df = pd.DataFrame({"id": range(1000), "value": [i * 0.5 for i in range(1000)]})
+
+    pg.insert_pg(df, "test_pool_insert", overwrite=True, method="copy")
+    stats = pg.insert_pg_parallel(df, "test_pool_insert", overwrite=True, n_workers=2)
+    assert stats["rows"].sum() == 1000
+    assert pg.query("SELECT count(*) AS n FROM test_pool_insert").iloc[0, 0] == 1000
+
+    # Kill the backend of the idle pooled connection; the next checkout replaces it
+    pid = pg.query("SELECT pg_backend_pid() AS pid").iloc[0, 0]
+    PG().query(f"SELECT pg_terminate_backend({pid})")
+    assert pg.query("SELECT 1 AS one").iloc[0, 0] == 1
+
+    pg.query("DROP TABLE IF EXISTS test_pool_insert;")
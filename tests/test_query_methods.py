@@ -0,0 +1,442 @@
+import time
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from psql.pg import PG
+
+
+def test_query_iter():
+    """Test streaming a result in bounded chunks through a server-side cursor."""
+    pg = PG()
+
+    chunks = list(pg.query_iter("SELECT g AS id, g * 2 AS doubled FROM generate_series(1, 2500) g ORDER BY g;", chunksize=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert all(list(chunk.columns) == ["id", "doubled"] for chunk in chunks)
+    result = pd.concat(chunks, ignore_index=True)
+    assert result["id"].tolist() == list(range(1, 2501))
+    assert result["doubled"].iloc[-1] == 5000
+
+
+def test_query_iter_empty_and_early_stop():
+    """Test empty results and abandoning the iterator midway."""
+    pg = PG()
+
+    chunks = list(pg.query_iter("SELECT 1 AS one WHERE false"))
+    assert len(chunks) == 1
+    assert chunks[0].empty
+    assert list(chunks[0].columns) == ["one"]
+
+    iterator = pg.query_iter("SELECT g FROM generate_series(1, 100) g", chunksize=10)
+    first = next(iterator)
+    assert first["g"].tolist() == list(range(1, 11))
+    iterator.close()
+
+    # The connection is usable again after closing the iterator
+    result = pg.query("SELECT 42 AS answer")
+    assert result.iloc[0, 0] == 42
+
+
+def test_query_iter_writes_inside_loop():
+    """Test that committing writes on the same instance does not close the streaming cursor."""
+    pg = PG()
+    pg.query("DROP TABLE IF EXISTS test_query_iter_sink; CREATE TABLE test_query_iter_sink (g int);")
+
+    n_chunks = 0
+    for chunk in pg.query_iter("SELECT g FROM generate_series(1, 100) g", chunksize=10):
+        pg.insert_pg(chunk, "test_query_iter_sink", method="copy" if n_chunks % 2 else "insert")
+        pg.query("INSERT INTO test_query_iter_sink VALUES (0)")
+        n_chunks += 1
+
+    assert n_chunks == 10
+    # insert_pg truncates the existing table, so only the last chunk and one marker remain
+    result = pg.query("SELECT count(*) AS n, max(g) AS top FROM test_query_iter_sink")
+    assert (result["n"].iloc[0], result["top"].iloc[0]) == (11, 100)
+
+    pg.query("DROP TABLE IF EXISTS test_query_iter_sink;")
+
+
+def test_query_iter_error():
+    """Test that errors propagate and the connection recovers."""
+    pg = PG()
+
+    with pytest.raises(Exception):
+        list(pg.query_iter("SELECT * FROM non_existent_table"))
+
+    with pytest.raises(ValueError):
+        list(pg.query_iter("SELECT 1", chunksize=0))
+
+    result = pg.query("SELECT 1 AS test_col")
+    assert result.iloc[0, 0] == 1
+
+
+def test_query_result_dtypes():
+    """Test that query builds typed columns from the result type OIDs."""
+    pg = PG()
+
+    result = pg.query("""
+        SELECT
+            g::int AS int_col,
+            g::bigint * 10000000000 AS bigint_col,
+            g / 2.0::float8 AS float_col,
+            g % 2 = 0 AS bool_col,
+            TIMESTAMP '2024-01-01' + g * INTERVAL '1 second' AS ts_col,
+            TIMESTAMPTZ '2024-01-01 00:00:00+00' + g * INTERVAL '1 hour' AS tstz_col,
+            'row ' || g AS text_col,
+            ARRAY[g, g] AS array_col
+        FROM generate_series(1, 3) g
+        ORDER BY g
+    """)
+
+    assert result["int_col"].dtype == np.int64
+    assert result["bigint_col"].dtype == np.int64
+    assert result["float_col"].dtype == np.float64
+    assert result["bool_col"].dtype == bool
+    assert pd.api.types.is_datetime64_dtype(result["ts_col"])
+    assert isinstance(result["tstz_col"].dtype, pd.DatetimeTZDtype)
+    assert result["text_col"].dtype == object
+
+    assert result["int_col"].tolist() == [1, 2, 3]
+    assert result["bigint_col"].iloc[2] == 30000000000
+    assert result["bool_col"].tolist() == [False, True, False]
+    assert result["ts_col"].iloc[1] == pd.Timestamp("2024-01-01 00:00:02")
+    assert result["tstz_col"].iloc[0] == pd.Timestamp("2024-01-01 01:00:00", tz="UTC")
+    assert result["text_col"].tolist() == ["row 1", "row 2", "row 3"]
+    assert result["array_col"].tolist() == [[1, 1], [2, 2], [3, 3]]
+
+
+def test_query_result_dtypes_with_nulls():
+    """Test NULL handling in typed result columns."""
+    pg = PG()
+
+    result = pg.query("""
+        SELECT * FROM (VALUES
+            (1, 1.5::float8, true, TIMESTAMP '2024-01-01'),
+            (NULL, NULL, NULL, NULL)
+        ) AS t(int_col, float_col, bool_col, ts_col)
+    """)
+
+    assert result["int_col"].dtype == np.float64
+    assert result["int_col"].iloc[0] == 1
+    assert pd.isna(result["int_col"].iloc[1])
+    assert pd.isna(result["float_col"].iloc[1])
+    assert result["bool_col"].tolist() == [True, None]
+    assert pd.isna(result["ts_col"].iloc[1])
+
+    # Empty results keep the column dtypes
+    empty = pg.query("SELECT 1::int AS a, 1.0::float8 AS b WHERE false")
+    assert empty.empty
+    assert empty["a"].dtype == np.int64
+    assert empty["b"].dtype == np.float64
+
+    # Duplicate column names are preserved
+    dup = pg.query("SELECT 1 AS x, 2 AS x")
+    assert list(dup.columns) == ["x", "x"]
+
+
+def test_query_arrow_output():
+    """Test building a pyarrow.Table and Arrow-backed DataFrames from query results."""
+    pa = pytest.importorskip("pyarrow")
+    pg = PG()
+
+    sql = """
+        SELECT * FROM (VALUES
+            (1, 1.5::float8, true, TIMESTAMP '2024-01-01', TIMESTAMPTZ '2024-01-01 00:00:00+00', 'a'),
+            (NULL, NULL, NULL, NULL, NULL, NULL)
+        ) AS t(int_col, float_col, bool_col, ts_col, tstz_col, text_col)
+    """
+
+    table = pg.query(sql, output="arrow")
+    assert isinstance(table, pa.Table)
+    assert table.column_names == ["int_col", "float_col", "bool_col", "ts_col", "tstz_col", "text_col"]
+    assert table.schema.field("int_col").type == pa.int64()
+    assert table.schema.field("float_col").type == pa.float64()
+    assert table.schema.field("bool_col").type == pa.bool_()
+    assert table.schema.field("ts_col").type == pa.timestamp("us")
+    assert table.schema.field("tstz_col").type.tz is not None
+    assert table.schema.field("text_col").type == pa.string()
+    assert table.column("int_col").to_pylist() == [1, None]
+    assert table.column("text_col").to_pylist() == ["a", None]
+
+    df = pg.query(sql, dtype_backend="pyarrow")
+    assert isinstance(df["int_col"].dtype, pd.ArrowDtype)
+    assert df["int_col"].iloc[0] == 1
+    assert pd.isna(df["int_col"].iloc[1])
+
+    chunks = list(pg.query_iter("SELECT g FROM generate_series(1, 5) g", chunksize=2, output="arrow"))
+    assert [chunk.num_rows for chunk in chunks] == [2, 2, 1]
+
+    with pytest.raises(ValueError):
+        pg.query("SELECT 1", output="csv")
+
+
+def test_query_arrow_uninferable_columns():
+    """Test that columns pyarrow cannot infer (inet, mixed-shape jsonb) fall back to strings."""
+    pa = pytest.importorskip("pyarrow")
+    pg = PG()
+
+    sql = """
+        SELECT * FROM (VALUES
+            (1, '192.168.0.1'::inet, '10.0.0.0/8'::cidr, '1'::jsonb),
+            (2, '::1'::inet, NULL::cidr, '{"a": 1}'::jsonb),
+            (3, NULL::inet, NULL::cidr, '"text"'::jsonb)
+        ) AS t(id, addr, net, doc)
+    """
+
+    table = pg.query(sql, output="arrow")
+    assert table.schema.field("addr").type == pa.string()
+    assert table.column("addr").to_pylist() == ["192.168.0.1", "::1", None]
+    assert table.column("net").to_pylist() == ["10.0.0.0/8", None, None]
+    assert table.column("doc").to_pylist() == ["1", '{"a": 1}', '"text"']
+
+    df = pg.query(sql, dtype_backend="pyarrow")
+    assert df["addr"].tolist()[:2] == ["192.168.0.1", "::1"]
+    assert df["id"].tolist() == [1, 2, 3]
+
+
+def test_query_many():
+    """Test running independent queries concurrently and getting results in order."""
+    pg = PG()
+
+    queries = [f"SELECT {i} AS i, pg_sleep(0.2)" for i in range(6)]
+    queries.append("CREATE TEMP TABLE test_query_many_tmp (id int); DROP TABLE test_query_many_tmp;")
+
+    start = time.perf_counter()
+    results = pg.query_many(queries, max_concurrency=6)
+    elapsed = time.perf_counter() - start
+
+    assert [result["i"].iloc[0] for result in results[:6]] == list(range(6))
+    assert results[6] is None
+    assert all(result.attrs["elapsed_seconds"] >= 0.2 for result in results[:6])
+    # 6 x 0.2 s would take 1.2 s one after another
+    assert elapsed < 1.0
+
+    with pytest.raises(Exception):
+        pg.query_many(["SELECT 1", "SELECT * FROM non_existent_table"])
+
+    with pytest.raises(ValueError):
+        pg.query_many(["SELECT 1"], max_concurrency=0)
+
+
+def test_read_table_parallel():
+    """Test reading a table in concurrently fetched key and ctid ranges."""
+    pg = PG()
+    pg.query("""
+        DROP TABLE IF EXISTS test_read_parallel;
+        CREATE TABLE test_read_parallel AS
+        SELECT g AS id, g * 0.5 AS half, 'row ' || g AS name
+        FROM generate_series(1, 20000) g;
+        INSERT INTO test_read_parallel VALUES (NULL, 0, 'null key');
+    """)
+    expected = pg.query("SELECT * FROM test_read_parallel")
+
+    by_key = pg.read_table_parallel("test_read_parallel", key_column="id", n_workers=4)
+    by_ctid = pg.read_table_parallel("public.test_read_parallel", n_workers=4)
+    for result in (by_key, by_ctid):
+        assert len(result) == len(expected)
+        assert sorted(result["name"]) == sorted(expected["name"])
+
+    chunks = list(pg.read_table_parallel("test_read_parallel", key_column="id", n_workers=4, columns=["id"], chunks=True))
+    assert len(chunks) == 4
+    assert [list(chunk.columns) for chunk in chunks] == [["id"]] * 4
+    assert chunks[0]["id"].max() < chunks[1]["id"].min()
+    assert chunks[-1]["id"].isna().sum() == 1
+
+    # Empty tables and more workers than keys
+    pg.query("DROP TABLE IF EXISTS test_read_parallel_small; CREATE TABLE test_read_parallel_small (id int);")
+    assert pg.read_table_parallel("test_read_parallel_small", key_column="id").empty
+    assert pg.read_table_parallel("test_read_parallel_small").empty
+    pg.query("INSERT INTO test_read_parallel_small VALUES (1), (2)")
+    assert sorted(pg.read_table_parallel("test_read_parallel_small", key_column="id", n_workers=8)["id"]) == [1, 2]
+
+    with pytest.raises(ValueError):
+        pg.read_table_parallel("test_read_parallel", key_column="name")
+
+    pg.query("DROP TABLE IF EXISTS test_read_parallel; DROP TABLE IF EXISTS test_read_parallel_small;")
+
+
+EXPORT_SQL = """
+    SELECT
+        g AS id,
+        CASE WHEN g % 5 = 0 THEN NULL ELSE g * 0.5 END::float8 AS half,
+        g % 2 = 0 AS even,
+        TIMESTAMP '2024-01-01' + g * INTERVAL '1 minute' AS ts,
+        CASE WHEN g % 3 = 0 THEN NULL
+             WHEN g % 3 = 1 THEN 'line ' || g || E'\\nwith "quotes", commas'
+             ELSE '' END AS note
+    FROM generate_series(1, 2500) g
+    ORDER BY g
+"""
+
+
+@pytest.mark.parametrize("format", ["csv", "text", "binary"])
+def test_export_chunks(format):
+    """Test streaming COPY TO output into DataFrame chunks."""
+    pg = PG()
+
+    chunks = list(pg.export(EXPORT_SQL, format=format, chunksize=1000))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+
+    result = pd.concat(chunks, ignore_index=True)
+    expected = pg.query(EXPORT_SQL)
+
+    assert list(result.columns) == ["id", "half", "even", "ts", "note"]
+    assert result["id"].tolist() == expected["id"].tolist()
+    assert result["id"].dtype == np.int64
+    assert result["half"].equals(expected["half"])
+    assert result["even"].tolist() == expected["even"].tolist()
+    assert (result["ts"] == expected["ts"]).all()
+    assert result["note"].tolist() == expected["note"].tolist()
+
+
+def test_export_to_file(tmp_path):
+    """Test writing COPY TO output straight to a local file."""
+    pg = PG()
+
+    path = tmp_path / "export.csv"
+    assert pg.export(EXPORT_SQL, path=str(path)) == str(path)
+
+    result = pd.read_csv(path, keep_default_na=False, na_values=[""])
+    assert list(result.columns) == ["id", "half", "even", "ts", "note"]
+    assert len(result) == 2500
+
+    with pytest.raises(ValueError):
+        pg.export("SELECT 1", format="json")
+
+
+@pytest.mark.parametrize("format", ["csv", "text", "binary"])
+def test_export_trailing_comment(format, tmp_path):
+    """Test exporting statements that end in a -- comment, with or without a semicolon."""
+    pg = PG()
+
+    for sql in [
+        "SELECT g FROM generate_series(1, 5) g -- five rows",
+        "-- leading\nSELECT g FROM generate_series(1, 5) g; -- after the semicolon",
+    ]:
+        chunks = list(pg.export(sql, format=format, chunksize=10))
+        assert pd.concat(chunks)["g"].tolist() == [1, 2, 3, 4, 5]
+        assert sum(len(chunk) for chunk in pg.query_iter(sql)) == 5
+
+    path = tmp_path / "comment.csv"
+    pg.export("SELECT 1 AS one -- note", path=str(path), format="csv")
+    assert pd.read_csv(path)["one"].tolist() == [1]
+
+
+def test_export_early_stop():
+    """Test abandoning an export iterator midway."""
+    pg = PG()
+
+    iterator = pg.export("SELECT g FROM generate_series(1, 100000) g", chunksize=10)
+    first = next(iterator)
+    assert first["g"].tolist() == list(range(1, 11))
+    iterator.close()
+
+    result = pg.query("SELECT 42 AS answer")
+    assert result.iloc[0, 0] == 42
+
+
+def test_query_binary():
+    """Test that binary-format results decode to the same values as text results."""
+    pg = PG()
+
+    sql = """
+        SELECT
+            g::smallint AS small_col,
+            g::int AS int_col,
+            g::bigint * 10000000000 AS bigint_col,
+            g / 3.0::float4 AS real_col,
+            CASE WHEN g % 4 = 0 THEN NULL ELSE g / 2.0::float8 END AS float_col,
+            g % 2 = 0 AS bool_col,
+            CASE WHEN g % 3 = 0 THEN NULL ELSE TIMESTAMP '2024-01-01' + g * INTERVAL '1 second' END AS ts_col,
+            TIMESTAMPTZ '2024-01-01 00:00:00+00' + g * INTERVAL '1 hour' AS tstz_col,
+            'row ' || g AS text_col,
+            g::numeric / 7 AS numeric_col
+        FROM generate_series(1, 100) g
+        ORDER BY g
+    """
+
+    expected = pg.query(sql)
+    result = pg.query(sql, binary=True)
+
+    assert list(result.columns) == list(expected.columns)
+    for column in expected.columns:
+        assert result[column].dtype == expected[column].dtype, column
+        assert result[column].equals(expected[column]), column
+
+    # NULLs in integer and boolean columns follow the text-format rules
+    nulls = pg.query("SELECT * FROM (VALUES (1, true), (NULL, NULL)) AS t(i, b)", binary=True)
+    assert nulls["i"].dtype == np.float64
+    assert pd.isna(nulls["i"].iloc[1])
+    assert nulls["b"].tolist() == [True, None]
+
+    chunks = list(pg.query_iter("SELECT g::float8 AS x FROM generate_series(1, 5) g", chunksize=2, binary=True))
+    assert pd.concat(chunks)["x"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_query_binary_nested_types():
+    """Test that arrays, ranges and records keep their element values with binary results."""
+    pg = PG()
+
+    sql = """
+        SELECT
+            g AS id,
+            ARRAY[g, g + 1, NULL] AS int_array,
+            ARRAY[g / 2.0::float8] AS float_array,
+            int4range(g, g + 10) AS int_range,
+            tsrange(TIMESTAMP '2024-01-01', TIMESTAMP '2024-01-02') AS ts_range,
+            ROW(g, 'x'::text, g % 2 = 0) AS rec
+        FROM generate_series(1, 5) g
+        ORDER BY g
+    """
+    expected = pg.query(sql)
+
+    result = pg.query(sql, binary=True)
+    assert result["int_array"].iloc[0] == [1, 2, None]
+    assert result["float_array"].iloc[0] == [0.5]
+    # Records are parsed into typed tuples only in binary format
+    assert result["rec"].iloc[0] == (1, "x", False)
+    for column in expected.columns.drop("rec"):
+        assert result[column].tolist() == expected[column].tolist(), column
+
+    chunks = list(pg.query_iter(sql, chunksize=2, binary=True))
+    assert pd.concat(chunks, ignore_index=True)["int_range"].tolist() == expected["int_range"].tolist()
+
+    many = pg.query_many([sql, sql], binary=True)
+    assert many[1]["rec"].tolist() == result["rec"].tolist()
+
+
+def test_query_params():
+    """Test parameterized queries and server-side prepared statement reuse."""
+    pg = PG(prepare_threshold=0)
+    df = pg.query("SELECT %s::int AS a, %s::text AS b", [1, "x"])
+    assert df.to_dict("records") == [{"a": 1, "b": "x"}]
+
+    # Values are never interpolated into the SQL text
+    value = "x'); DROP TABLE test_query_params; --"
+    df = pg.query("SELECT %(value)s::text AS v", {"value": value})
+    assert df.iloc[0, 0] == value
+
+    with pytest.raises(ValueError):
+        pg.query("SELECT 1; SELECT %s", [1])
+
+    # The same statement with different values is prepared once on the connection
+    sql = "SELECT relname::text AS name FROM pg_catalog.pg_class WHERE relname = %s"
+    for name in ["pg_class", "pg_type", "pg_attribute"]:
+        assert pg.query(sql, [name]).iloc[0, 0] == name
+    prepared = pg.conn.execute(
+        "SELECT count(*) FROM pg_prepared_statements WHERE statement LIKE %s", ["%relname = $1%"]
+    ).fetchone()[0]
+    assert prepared == 1
+
+    unprepared = PG(prepare_threshold=None)
+    for name in ["pg_class", "pg_type"]:
+        unprepared.query(sql, [name])
+    assert unprepared.conn.execute("SELECT count(*) FROM pg_prepared_statements").fetchone()[0] == 0
+
+    # Parameters are part of the result cache key
+    cached = PG(result_cache_ttl=60)
+    assert cached.query(sql, ["pg_class"]).iloc[0, 0] == "pg_class"
+    assert cached.query(sql, ["pg_type"]).iloc[0, 0] == "pg_type"
+    assert cached.result_cache.stats()["hits"] == 0
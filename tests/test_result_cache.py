@@ -0,0 +1,90 @@
+import time
+
+import pandas as pd
+
+from psql.catalog import MISSING
+from psql.pg import PG
+from psql.result_cache import ResultCache, is_cacheable, normalize_sql
+
+
+def test_result_cache_hits_and_invalidation():
+    """Test cached query results and invalidation by writes from the same instance."""
+    pg = PG(result_cache_ttl=60)
+    pg.query("""
+        DROP TABLE IF EXISTS test_result_cache;
+        DROP TABLE IF EXISTS test_result_cache_other;
+        CREATE TABLE test_result_cache (id int);
+        CREATE TABLE test_result_cache_other (id int);
+        INSERT INTO test_result_cache VALUES (1), (2);
+    """)
+    sql = "SELECT count(*) AS n FROM test_result_cache"
+
+    assert pg.query(sql).iloc[0, 0] == 2
+    # Whitespace and a trailing semicolon do not change the key
+    result = pg.query("SELECT count(*)  AS n\n  FROM test_result_cache;")
+    assert result.iloc[0, 0] == 2
+    assert pg.result_cache.stats()["hits"] == 1
+
+    # Callers get a copy, mutating it does not change the cached result
+    result.iloc[0, 0] = 100
+    assert pg.query(sql).iloc[0, 0] == 2
+
+    # A write to an unrelated table keeps the entry
+    pg.query("INSERT INTO test_result_cache_other VALUES (1)")
+    assert pg.query(sql).iloc[0, 0] == 2
+    assert pg.result_cache.stats()["hits"] == 3
+
+    # DML through query invalidates results that reference the table
+    pg.query("INSERT INTO test_result_cache VALUES (3)")
+    assert pg.query(sql).iloc[0, 0] == 3
+    pg.query("DELETE FROM test_result_cache WHERE id = 1")
+    assert pg.query(sql).iloc[0, 0] == 2
+
+    # So does insert_pg
+    pg.insert_pg(pd.DataFrame({"id": [7, 8, 9, 10]}), "public.test_result_cache", method="copy")
+    assert pg.query(sql).iloc[0, 0] == 4
+
+    stats = pg.result_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 4)
+
+    pg.query("DROP TABLE IF EXISTS test_result_cache; DROP TABLE IF EXISTS test_result_cache_other;")
+
+
+def test_result_cache_ttl_and_lru():
+    """Test TTL expiry and least-recently-used eviction by byte size."""
+    frame = pd.DataFrame({"x": range(1000)})
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+
+    cache = ResultCache(ttl=60, max_bytes=size * 2)
+    cache.set(("a",), frame, "SELECT x FROM a")
+    cache.set(("b",), frame, "SELECT x FROM b")
+    assert cache.get(("a",)) is not MISSING
+    cache.set(("c",), frame, "SELECT x FROM c")
+    # "b" was the least recently used entry
+    assert cache.get(("b",)) is MISSING
+    assert cache.get(("a",)) is not MISSING
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == size * 2
+
+    cache.invalidate_statements(["UPDATE c SET x = 1", "SET work_mem = '64MB'"])
+    assert cache.get(("c",)) is MISSING
+    assert cache.get(("a",)) is not MISSING
+    cache.invalidate_statements(["CALL refresh_everything()"])
+    assert cache.stats()["entries"] == 0
+
+    cache = ResultCache(ttl=0.05, max_bytes=size * 2)
+    cache.set(("a",), frame, "SELECT x FROM a")
+    time.sleep(0.1)
+    assert cache.get(("a",)) is MISSING
+
+
+def test_result_cache_statement_rules():
+    """Test which statements are cached and how SQL is normalized."""
+    assert is_cacheable("SELECT * FROM t")
+    assert is_cacheable("WITH x AS (SELECT 1) SELECT * FROM x")
+    assert is_cacheable("SELECT 'insert into' AS text")
+    assert not is_cacheable("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d")
+    assert not is_cacheable("SELECT * INTO t2 FROM t")
+    assert not is_cacheable("INSERT INTO t VALUES (1) RETURNING id")
+
+    assert normalize_sql("SELECT  a\n FROM t WHERE b = 'x   y' ;") == "SELECT a FROM t WHERE b = 'x   y'"
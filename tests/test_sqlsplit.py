@@ -0,0 +1,59 @@
+import pytest
+
+from psql.pg import PG
+from psql.sqlsplit import split_statements
+
+
+def test_split_statements():
+    """Test that semicolons inside literals, bodies and comments do not split statements."""
+    assert split_statements("SELECT 1; SELECT 2;") == ["SELECT 1", "SELECT 2"]
+    assert split_statements("SELECT 'a;b', \"c;d\" FROM t; SELECT 2") == ["SELECT 'a;b', \"c;d\" FROM t", "SELECT 2"]
+    assert split_statements("SELECT 'it''s;'; SELECT E'\\';'") == ["SELECT 'it''s;'", "SELECT E'\\';'"]
+    assert split_statements("DO $$ BEGIN PERFORM 1; END $$; SELECT $1") == ["DO $$ BEGIN PERFORM 1; END $$", "SELECT $1"]
+    assert split_statements("SELECT $tag$ $$; $tag$ AS body") == ["SELECT $tag$ $$; $tag$ AS body"]
+    assert split_statements("-- a; b\nSELECT 1 /* c; /* nested; */ ; */; -- only a comment") == [
+        "SELECT 1 /* c; /* nested; */ ; */"
+    ]
+    routine = (
+        "CREATE FUNCTION f(x int) RETURNS int LANGUAGE sql "
+        "BEGIN ATOMIC SELECT CASE WHEN x > 0 THEN 1 ELSE 0 END; END"
+    )
+    assert split_statements(f"{routine}; BEGIN; SELECT 1; END;") == [routine, "BEGIN", "SELECT 1", "END"]
+    assert split_statements(" ;; -- nothing\n") == []
+
+
+def test_query_multi_statement_scripts():
+    """Test multi-statement queries with quoted semicolons and the single round trip mode."""
+    pg = PG()
+    result = pg.query("""
+        DROP TABLE IF EXISTS test_sqlsplit;
+        CREATE TABLE test_sqlsplit (id int, note text);
+        INSERT INTO test_sqlsplit VALUES (1, 'a; b');  -- a comment; with a semicolon
+        DO $$ BEGIN INSERT INTO test_sqlsplit VALUES (2, 'from DO;'); END $$;
+        SELECT * FROM test_sqlsplit ORDER BY id;
+    """)
+    assert result["note"].tolist() == ["a; b", "from DO;"]
+
+    result = pg.query("""
+        INSERT INTO test_sqlsplit VALUES (3, 'x;y');
+        UPDATE test_sqlsplit SET note = note || ';' WHERE id = 3;
+        SELECT count(*) AS n, max(note) FILTER (WHERE id = 3) AS note FROM test_sqlsplit;
+    """, script=True)
+    assert result.to_dict("records") == [{"n": 3, "note": "x;y;"}]
+
+    # A failing script rolls back every statement in it
+    with pytest.raises(Exception):
+        pg.query("INSERT INTO test_sqlsplit VALUES (4, 'd'); SELECT 1 / 0;", script=True)
+    assert pg.query("SELECT count(*) AS n FROM test_sqlsplit").iloc[0, 0] == 3
+    assert pg.query("DELETE FROM test_sqlsplit; DELETE FROM test_sqlsplit", script=True) is None
+
+    with pytest.raises(ValueError):
+        pg.query("SELECT 1; SELECT 2", script=True, binary=True)
+
+    # Scripts are never prepared, even when every statement would be
+    prepared = PG(prepare_threshold=0)
+    result = prepared.query("INSERT INTO test_sqlsplit VALUES (5, 'e'); SELECT note FROM test_sqlsplit", script=True)
+    assert result["note"].tolist() == ["e"]
+    prepared.close()
+
+    pg.query("DROP TABLE IF EXISTS test_sqlsplit;")
@@ -0,0 +1,110 @@
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import psycopg
+import pytest
+
+from psql.pg import PG
+
+
+@pytest.mark.parametrize("pool", [False, True])
+def test_thread_safe_concurrent_queries(pool):
+    """Test that one thread-safe PG instance runs queries from many threads in parallel."""
+    pg = PG(thread_safe=True, pool=pool, pool_max_size=8)
+
+    def run(i: int) -> int:
+        result = pg.query(f"SELECT pg_backend_pid() AS pid, {i} AS i, pg_sleep(0.2)")
+        assert result["i"].iloc[0] == i
+        return result["pid"].iloc[0]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pids = list(executor.map(run, range(16)))
+    elapsed = time.perf_counter() - start
+
+    # 16 x 0.2 s would take 3.2 s on a single connection
+    assert len(set(pids)) > 1
+    assert elapsed < 1.6
+
+    pg.close()
+
+
+def test_thread_safe_transactions_isolated():
+    """Test that each thread's transaction stays on its own connection."""
+    pg = PG(thread_safe=True)
+    pg.query("DROP TABLE IF EXISTS test_thread_safe; CREATE TABLE test_thread_safe (id int);")
+
+    def load(i: int) -> None:
+        pg.insert_pg(
+            pd.DataFrame({"id": range(i * 100, (i + 1) * 100)}),
+            "test_thread_safe_" + str(i),
+            overwrite=True,
+            method="copy",
+        )
+        pg.query(f"INSERT INTO test_thread_safe SELECT id FROM test_thread_safe_{i}; DROP TABLE test_thread_safe_{i};")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(load, range(4)))
+
+    assert pg.query("SELECT count(DISTINCT id) AS n FROM test_thread_safe").iloc[0, 0] == 400
+
+    pg.query("DROP TABLE IF EXISTS test_thread_safe;")
+    pg.close()
+
+
+def test_thread_safe_connection_closed_when_thread_exits():
+    """Test that a finished thread's connection is closed instead of staying open until close()."""
+    pg = PG(thread_safe=True)
+    # Keep every thread alive until all four have connected, so no closed
+    # connection is pruned from the list before the assertion
+    barrier = threading.Barrier(4)
+
+    def run() -> None:
+        pg.query("SELECT 1")
+        barrier.wait()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+
+    assert len(pg._thread_conns) == 4
+    assert all(conn.closed for conn in pg._thread_conns)
+
+    pg.close()
+
+
+def test_thread_safe_transaction_does_not_suspend_other_threads():
+    """Test that insert_pg(transaction=True) leaves auto-commit on for other threads."""
+    pg = PG(thread_safe=True)
+    pg.query("DROP TABLE IF EXISTS test_thread_safe_commit; CREATE TABLE test_thread_safe_commit (id int);")
+    seen = {}
+    transfer = pg._transfer_dataframe
+
+    def other_thread() -> None:
+        seen["auto_commit"] = pg.auto_commit
+        pg.query("INSERT INTO test_thread_safe_commit VALUES (1)")
+        seen["status"] = pg.conn.info.transaction_status
+
+    def transfer_while_other_thread_queries(*args, **kwargs):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+        return transfer(*args, **kwargs)
+
+    pg._transfer_dataframe = transfer_while_other_thread_queries
+    pg.insert_pg(pd.DataFrame({"id": [1, 2]}), "test_thread_safe_load", overwrite=True, transaction=True)
+    del pg._transfer_dataframe
+
+    assert seen["auto_commit"] is True
+    assert seen["status"] == psycopg.pq.TransactionStatus.IDLE
+    assert pg.auto_commit is True
+    assert pg.query("SELECT count(*) AS n FROM test_thread_safe_load").iloc[0, 0] == 2
+
+    pg.query("DROP TABLE IF EXISTS test_thread_safe_commit; DROP TABLE IF EXISTS test_thread_safe_load;")
+    pg.close()